@@ -0,0 +1,522 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# 집계 차원과 측정값
+DIMENSIONS = ['투자성향', '연령대', '지역명', '자산규모']
+MEASURES = ['총평가금액', '안전자산비율']
+
+STAT_NAMES = ['count', 'sum', 'min', 'max', 'sumsq', 'm2']
+# 셀끼리 빼도 의미가 있는 통계 (기간 비교용)
+ADDITIVE_STATS = ['count', 'sum', 'sumsq']
+# 빈 셀의 초기값
+EMPTY_VALUES = {'min': np.inf, 'max': -np.inf}
+
+
+def category_codes(series):
+    # 범주 코드와 레이블 (결측은 마지막 칸으로 보냄)
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    labels = list(series.cat.categories)
+    codes = series.cat.codes.to_numpy().astype(np.int64)
+    codes[codes < 0] = len(labels)
+    return codes, labels
+
+
+class AggregateCube:
+    # 차원 조합별 행 수와 측정값 통계(count, sum, min, max, sumsq, m2)를 담은 큐브
+    # 각 차원의 마지막 칸은 결측 범주로, 조회 시에는 제외됨
+    # m2는 평균 편차 제곱합으로, 청크별 큐브를 병합할 때 Chan 공식으로 합침
+
+    def __init__(self, dims, labels, rows, stats):
+        self.dims = list(dims)
+        self.labels = labels
+        self.rows = rows
+        self.stats = stats
+        self._marginals = {}
+        # 단일 차원 및 모든 차원 쌍의 집계를 미리 계산
+        for size in (1, 2):
+            for key in combinations(self.dims, size):
+                self.marginal(key)
+
+    @property
+    def shape(self):
+        return self.rows.shape
+
+    def marginal(self, dims):
+        # 지정한 차원만 남기고 나머지 축을 합산한 (rows, stats)
+        key = tuple(dims)
+        if key in self._marginals:
+            return self._marginals[key]
+        keep = [self.dims.index(d) for d in key]
+        drop = tuple(i for i in range(len(self.dims)) if i not in keep)
+        order = np.argsort(np.argsort(keep))
+
+        def reduce(arr, how):
+            out = how.reduce(arr, axis=drop) if drop else arr
+            return np.transpose(out, order) if out.ndim > 1 else out
+
+        rows = reduce(self.rows, np.add)
+        stats = {}
+        for measure, values in self.stats.items():
+            count = reduce(values['count'], np.add)
+            total = reduce(values['sum'], np.add)
+            # 셀 평균과 합쳐진 평균의 차이만큼 m2를 보정
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.where(count > 0, total / count, 0.0)
+                cell_mean = np.where(values['count'] > 0, values['sum'] / values['count'], 0.0)
+            spread = values['count'] * (cell_mean - _broadcast(mean, keep, len(self.dims))) ** 2
+            stats[measure] = {
+                'count': count,
+                'sum': total,
+                'sumsq': reduce(values['sumsq'], np.add),
+                'min': reduce(values['min'], np.minimum),
+                'max': reduce(values['max'], np.maximum),
+                'm2': reduce(values['m2'] + spread, np.add),
+            }
+        self._marginals[key] = (rows, stats)
+        return rows, stats
+
+    def total_count(self):
+        return int(self.rows.sum())
+
+    def overall(self, measure):
+        # 전체 행 기준 측정값 요약
+        values = self.stats[measure]
+        count = values['count'].sum()
+        total = values['sum'].sum()
+        return {
+            'count': int(count),
+            'sum': float(total),
+            'mean': total / count if count else np.nan,
+            'min': float(values['min'].min()) if count else np.nan,
+            'max': float(values['max'].max()) if count else np.nan,
+        }
+
+    def _series(self, dim, values):
+        labels = self.labels[dim]
+        rows, _ = self.marginal((dim,))
+        observed = rows[:len(labels)] > 0
+        return pd.Series(values[:len(labels)][observed],
+                         index=pd.Index(np.asarray(labels, dtype=object)[observed], name=dim))
+
+    def counts(self, dim):
+        # value_counts()와 동일 (빈 범주 제외, 내림차순)
+        rows, _ = self.marginal((dim,))
+        counts = self._series(dim, rows).rename('count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def stat(self, dim, measure, name):
+        _, stats = self.marginal((dim,))
+        return self._series(dim, stats[measure][name].astype(float))
+
+    def mean(self, dim, measure):
+        # groupby(dim)[measure].mean()과 동일
+        _, stats = self.marginal((dim,))
+        values = stats[measure]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = values['sum'] / values['count']
+        return self._series(dim, mean).rename(measure)
+
+    def std(self, dim, measure):
+        # 표본 표준편차 (m2 기반이라 큰 금액에서도 상쇄 오차가 없음)
+        _, stats = self.marginal((dim,))
+        values = stats[measure]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = values['m2'] / (values['count'] - 1)
+        return self._series(dim, np.sqrt(np.clip(var, 0, None))).rename(measure)
+
+    def share(self, dim, label):
+        # 전체 행 중 해당 범주 비율
+        total = self.total_count()
+        counts = self.counts(dim)
+        return counts.get(label, 0) / total if total else np.nan
+
+    def reindex(self, labels):
+        # 레이블 목록을 확장한 큐브 (새 범주 칸은 빈 값으로 채움)
+        positions = []
+        for dim in self.dims:
+            index = {label: i for i, label in enumerate(labels[dim])}
+            positions.append([index[label] for label in self.labels[dim]] + [len(labels[dim])])
+        shape = tuple(len(labels[d]) + 1 for d in self.dims)
+        target = np.ix_(*positions)
+
+        def expand(arr, fill):
+            out = np.full(shape, fill, dtype=arr.dtype)
+            out[target] = arr
+            return out
+
+        rows = expand(self.rows, 0)
+        stats = {}
+        for measure, values in self.stats.items():
+            stats[measure] = {
+                name: expand(values[name], EMPTY_VALUES.get(name, 0)) for name in STAT_NAMES
+            }
+        return AggregateCube(self.dims, {d: list(labels[d]) for d in self.dims}, rows, stats)
+
+    def merge(self, other):
+        # 두 큐브를 합친 큐브 (범주 레이블은 합집합으로 정렬)
+        labels = {d: merge_labels(self.labels[d], other.labels[d]) for d in self.dims}
+        left = self if labels == self.labels else self.reindex(labels)
+        right = other if labels == other.labels else other.reindex(labels)
+        stats = {}
+        for measure in self.stats:
+            a, b = left.stats[measure], right.stats[measure]
+            count = a['count'] + b['count']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                delta = np.where(count > 0,
+                                 b['sum'] / np.maximum(b['count'], 1) - a['sum'] / np.maximum(a['count'], 1),
+                                 0.0)
+                m2 = a['m2'] + b['m2'] + np.where(
+                    count > 0, delta ** 2 * a['count'] * b['count'] / np.maximum(count, 1), 0.0)
+            stats[measure] = {
+                'count': count,
+                'sum': a['sum'] + b['sum'],
+                'sumsq': a['sumsq'] + b['sumsq'],
+                'min': np.minimum(a['min'], b['min']),
+                'max': np.maximum(a['max'], b['max']),
+                'm2': m2,
+            }
+        return AggregateCube(self.dims, labels, left.rows + right.rows, stats)
+
+    def select(self, selections):
+        # 범주 선택에 해당하는 칸만 남긴 큐브 (금액 범위 같은 행 조건은 큐브로 적용할 수 없음)
+        mask = np.ones(self.shape, dtype=bool)
+        for dim, chosen in selections.items():
+            if not chosen or dim not in self.dims:
+                continue
+            chosen = set(chosen)
+            keep = np.array([label in chosen for label in self.labels[dim]] + [False])
+            mask &= _broadcast(keep, [self.dims.index(dim)], len(self.dims))
+        stats = {
+            measure: {name: np.where(mask, values[name], EMPTY_VALUES.get(name, 0)) for name in STAT_NAMES}
+            for measure, values in self.stats.items()
+        }
+        return AggregateCube(self.dims, self.labels, np.where(mask, self.rows, 0), stats)
+
+    def subtract(self, other):
+        # 셀별 차이 큐브 (행 수와 count/sum/sumsq만 빼고, 최소/최대/m2는 정의되지 않아 NaN)
+        # 조회는 marginal()로 (counts()/mean() 등은 행 수가 양수인 범주만 남기므로 차이에는 맞지 않음)
+        labels = {d: merge_labels(self.labels[d], other.labels[d]) for d in self.dims}
+        left = self if labels == self.labels else self.reindex(labels)
+        right = other if labels == other.labels else other.reindex(labels)
+        stats = {}
+        for measure in self.stats:
+            a, b = left.stats[measure], right.stats[measure]
+            stats[measure] = {
+                name: a[name] - b[name] if name in ADDITIVE_STATS else np.full(left.shape, np.nan)
+                for name in STAT_NAMES
+            }
+        return AggregateCube(self.dims, labels, left.rows - right.rows, stats)
+
+    def to_arrays(self):
+        # 저장용 배열 (측정값 순서는 self.stats 순서)
+        arrays = {'rows': self.rows}
+        for i, values in enumerate(self.stats.values()):
+            for name in STAT_NAMES:
+                arrays[f'm{i}_{name}'] = values[name]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, dims, labels, measures, arrays):
+        stats = {
+            measure: {name: arrays[f'm{i}_{name}'] for name in STAT_NAMES}
+            for i, measure in enumerate(measures)
+        }
+        return cls(dims, labels, arrays['rows'], stats)
+
+    def _table(self, dims, measure=None, stat='count'):
+        # 차원 조합의 셀 값과 셀별 행 수 (결측 칸 제외, 축 순서는 dims 순서)
+        rows, stats = self.marginal(dims)
+        if measure is None:
+            table = rows.astype(float)
+        elif stat == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                table = stats[measure]['sum'] / stats[measure]['count']
+        else:
+            table = stats[measure][stat].astype(float)
+        trim = tuple(slice(0, len(self.labels[d])) for d in dims)
+        return table[trim], rows[trim]
+
+    def contingency(self, dims, measure=None, stat='count'):
+        # 임의 개수 차원의 분할표 (관측된 칸만, 긴 형식)
+        # pd.crosstab([df[d] for d in dims[:-1]], df[dims[-1]]).stack()과 같은 칸
+        dims = tuple(dims)
+        table, rows = self._table(dims, measure, stat)
+        cells = np.nonzero(rows > 0)
+        index = pd.MultiIndex.from_arrays(
+            [np.asarray(self.labels[d], dtype=object)[positions] for d, positions in zip(dims, cells)],
+            names=list(dims)
+        )
+        return pd.Series(table[cells], index=index, name=measure or 'count')
+
+    def crosstab(self, row, col, measure=None, stat='count'):
+        # pd.crosstab(df[row], df[col]).astype(float)과 동일
+        # measure를 지정하면 셀별 통계(sum, mean 등)를 반환
+        table, observed = self._table((row, col), measure, stat)
+        row_labels, col_labels = self.labels[row], self.labels[col]
+        keep_rows = observed.sum(axis=1) > 0
+        keep_cols = observed.sum(axis=0) > 0
+        return pd.DataFrame(
+            table[np.ix_(keep_rows, keep_cols)],
+            index=pd.Index(np.asarray(row_labels, dtype=object)[keep_rows], name=row),
+            columns=pd.Index(np.asarray(col_labels, dtype=object)[keep_cols], name=col),
+        )
+
+
+def compute_kpis(cube):
+    # KPI 카드 값 (모두 큐브 조회)
+    total_value_stats = cube.overall('총평가금액')
+    kpis = {
+        'total_customers': cube.total_count(),
+        'avg_total_value': total_value_stats['mean'],
+        'max_total_value': total_value_stats['max'],
+        'min_total_value': total_value_stats['min'],
+        'aggressive_investors_ratio': cube.share('투자성향', '5:공격투자형'),
+    }
+    # 투자성향/연령대/지역별 최다, 최소 범주
+    for dim, name in (('투자성향', 'investor_type'), ('연령대', 'age_group'), ('지역명', 'region')):
+        counts = cube.counts(dim)
+        kpis[f'max_{name}'] = counts.idxmax() if len(counts) else '-'
+        kpis[f'min_{name}'] = counts.idxmin() if len(counts) else '-'
+    return kpis
+
+
+def _broadcast(arr, keep, ndim):
+    # 남긴 축 순서의 배열을 원래 큐브 축에 맞게 브로드캐스트
+    if arr.ndim > 1:
+        arr = np.transpose(arr, np.argsort(keep))
+    kept = sorted(keep)
+    return arr.reshape([arr.shape[kept.index(i)] if i in kept else 1 for i in range(ndim)])
+
+
+def merge_labels(left, right):
+    if left == right:
+        return list(left)
+    combined = set(left) | set(right)
+    try:
+        return sorted(combined)
+    except TypeError:
+        return list(left) + [label for label in right if label not in set(left)]
+
+
+def build_cube(df, dims=DIMENSIONS, measures=MEASURES):
+    # 범주 코드를 한 번만 훑어 전체 차원 조합의 셀 통계를 계산
+    dims = [d for d in dims if d in df.columns]
+    measures = [m for m in measures if m in df.columns]
+    labels, codes = {}, []
+    for dim in dims:
+        dim_codes, labels[dim] = category_codes(df[dim])
+        codes.append(dim_codes)
+    shape = tuple(len(labels[d]) + 1 for d in dims)
+    size = int(np.prod(shape))
+    flat = np.ravel_multi_index(codes, shape) if codes else np.zeros(len(df), dtype=np.int64)
+
+    rows = np.bincount(flat, minlength=size)
+    stats = {}
+    for measure in measures:
+        values = df[measure].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        cells, values = flat[valid], values[valid]
+        minimum = np.full(size, np.inf)
+        maximum = np.full(size, -np.inf)
+        np.minimum.at(minimum, cells, values)
+        np.maximum.at(maximum, cells, values)
+        count = np.bincount(cells, minlength=size)
+        total = np.bincount(cells, weights=values, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, total / count, 0.0)
+        deviation = values - mean[cells]
+        stats[measure] = {
+            'count': count.reshape(shape),
+            'sum': total.reshape(shape),
+            'sumsq': np.bincount(cells, weights=values * values, minlength=size).reshape(shape),
+            'min': minimum.reshape(shape),
+            'max': maximum.reshape(shape),
+            'm2': np.bincount(cells, weights=deviation * deviation, minlength=size).reshape(shape),
+        }
+    return AggregateCube(dims, labels, rows.reshape(shape), stats)
+
+
+def box_stats(df, dim, measure, max_outliers=100, seed=0):
+    # 그룹별 사분위수, 수염, 이상치 표본 (그룹 코드 기준으로 벡터화)
+    codes, labels = category_codes(df[dim])
+    values = df[measure].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values) & (codes < len(labels))
+    codes, values = codes[valid], values[valid]
+
+    # 그룹 코드 → 값 순으로 정렬하면 각 그룹이 연속 구간이 됨
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    counts = np.bincount(codes, minlength=len(labels))
+    starts = np.cumsum(counts) - counts
+    present = counts > 0
+
+    def quantile(p):
+        pos = starts + p * np.maximum(counts - 1, 0)
+        lower = np.floor(pos).astype(np.int64)
+        upper = np.ceil(pos).astype(np.int64)
+        result = np.full(len(labels), np.nan)
+        lo, hi, frac = lower[present], upper[present], (pos - lower)[present]
+        result[present] = values[lo] + (values[hi] - values[lo]) * frac
+        return result
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    # 수염은 펜스 안쪽의 최솟값/최댓값
+    inside = (values >= low_fence[codes]) & (values <= high_fence[codes])
+    lower_whisker = np.full(len(labels), np.inf)
+    upper_whisker = np.full(len(labels), -np.inf)
+    np.minimum.at(lower_whisker, codes[inside], values[inside])
+    np.maximum.at(upper_whisker, codes[inside], values[inside])
+
+    # 이상치는 그룹별 최대 max_outliers개만 무작위 추출
+    outlier_idx = np.flatnonzero(~inside)
+    outlier_idx = outlier_idx[np.random.default_rng(seed).permutation(len(outlier_idx))]
+    outlier_idx = outlier_idx[np.argsort(codes[outlier_idx], kind='stable')]
+    outlier_codes = codes[outlier_idx]
+    first = np.searchsorted(outlier_codes, outlier_codes, side='left')
+    outlier_idx = outlier_idx[np.arange(len(outlier_idx)) - first < max_outliers]
+    outlier_codes = codes[outlier_idx]
+    outliers = np.split(values[outlier_idx],
+                        np.searchsorted(outlier_codes, np.arange(1, len(labels))))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=len(labels)) / counts
+    stats = pd.DataFrame({
+        'count': counts,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lower_whisker,
+        'upperfence': upper_whisker,
+        'mean': mean,
+        'outliers': outliers,
+    }, index=pd.Index(np.asarray(labels, dtype=object), name=dim))
+    return stats[present]
+
+
+# 스트리밍 박스플롯용 고정 구간 (측정값별)
+SKETCH_EDGES = {
+    '안전자산비율': np.linspace(0, 100, 1001),
+}
+
+
+class HistogramSketch:
+    # 그룹별 고정 구간 히스토그램 (덧셈으로 병합 가능한 분위수 스케치)
+    # 구간 밖의 값은 양 끝 구간에 넣고, 정확한 최솟값/최댓값은 따로 보관
+
+    def __init__(self, dim, measure, edges, labels, counts, sums, minimum, maximum):
+        self.dim = dim
+        self.measure = measure
+        self.edges = edges
+        self.labels = labels
+        self.counts = counts
+        self.sums = sums
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @classmethod
+    def from_frame(cls, df, dim, measure, edges=None):
+        edges = SKETCH_EDGES[measure] if edges is None else edges
+        codes, labels = category_codes(df[dim])
+        values = df[measure].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values) & (codes < len(labels))
+        codes, values = codes[valid], values[valid]
+        bins = len(edges) - 1
+        positions = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+        groups = len(labels)
+        counts = np.bincount(codes * bins + positions, minlength=groups * bins).reshape(groups, bins)
+        minimum = np.full(groups, np.inf)
+        maximum = np.full(groups, -np.inf)
+        np.minimum.at(minimum, codes, values)
+        np.maximum.at(maximum, codes, values)
+        sums = np.bincount(codes, weights=values, minlength=groups)
+        return cls(dim, measure, edges, labels, counts, sums, minimum, maximum)
+
+    def to_arrays(self, prefix=''):
+        # 저장용 배열 (레이블은 호출하는 쪽에서 따로 저장)
+        return {f'{prefix}{name}': getattr(self, name)
+                for name in ('edges', 'counts', 'sums', 'minimum', 'maximum')}
+
+    @classmethod
+    def from_arrays(cls, dim, measure, labels, arrays, prefix=''):
+        return cls(dim, measure, arrays[f'{prefix}edges'], list(labels), arrays[f'{prefix}counts'],
+                   arrays[f'{prefix}sums'], arrays[f'{prefix}minimum'], arrays[f'{prefix}maximum'])
+
+    def _align(self, labels):
+        index = [labels.index(label) for label in self.labels]
+        counts = np.zeros((len(labels), self.counts.shape[1]), dtype=self.counts.dtype)
+        sums = np.zeros(len(labels))
+        minimum = np.full(len(labels), np.inf)
+        maximum = np.full(len(labels), -np.inf)
+        counts[index], sums[index] = self.counts, self.sums
+        minimum[index], maximum[index] = self.minimum, self.maximum
+        return counts, sums, minimum, maximum
+
+    def merge(self, other):
+        labels = merge_labels(self.labels, other.labels)
+        a, b = self._align(labels), other._align(labels)
+        return HistogramSketch(
+            self.dim, self.measure, self.edges, labels,
+            a[0] + b[0], a[1] + b[1], np.minimum(a[2], b[2]), np.maximum(a[3], b[3])
+        )
+
+    def box_stats(self, max_outliers=100):
+        # box_stats()와 같은 형식의 근사 통계 (구간 폭 이내 오차)
+        counts = self.counts
+        total = counts.sum(axis=1)
+        present = total > 0
+        cumulative = counts.cumsum(axis=1)
+        lower_edges, upper_edges = self.edges[:-1], self.edges[1:]
+
+        def quantile(p):
+            rank = p * np.maximum(total - 1, 0)
+            position = np.minimum((cumulative <= rank[:, None]).sum(axis=1), counts.shape[1] - 1)
+            rows = np.arange(len(total))
+            before = cumulative[rows, position] - counts[rows, position]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                frac = (rank - before + 0.5) / counts[rows, position]
+            value = lower_edges[position] + np.clip(frac, 0, 1) * (upper_edges[position] - lower_edges[position])
+            return np.clip(value, self.minimum, self.maximum)
+
+        q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+        iqr = q3 - q1
+        low_fence, high_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+        # 펜스 안쪽 구간 중 가장 바깥 구간의 경계를 수염으로 사용
+        inside = (upper_edges[None, :] > low_fence[:, None]) & (lower_edges[None, :] <= high_fence[:, None])
+        occupied = (counts > 0) & inside
+        first = np.where(occupied.any(axis=1), occupied.argmax(axis=1), 0)
+        last = np.where(occupied.any(axis=1), counts.shape[1] - 1 - occupied[:, ::-1].argmax(axis=1), 0)
+        lower_whisker = np.where(self.minimum >= low_fence, self.minimum,
+                                 np.maximum(low_fence, lower_edges[first]))
+        upper_whisker = np.where(self.maximum <= high_fence, self.maximum,
+                                 np.minimum(high_fence, upper_edges[last]))
+
+        # 이상치는 펜스 밖 구간의 중앙값으로 표시 (바깥쪽부터 최대 max_outliers개)
+        centers = (lower_edges + upper_edges) / 2
+        outliers = []
+        for g in range(len(total)):
+            below = np.flatnonzero((counts[g] > 0) & (upper_edges <= low_fence[g]))
+            above = np.flatnonzero((counts[g] > 0) & (lower_edges > high_fence[g]))[::-1]
+            picked = np.concatenate([below, above])[:max_outliers]
+            points = np.clip(centers[np.sort(picked)], self.minimum[g], self.maximum[g])
+            outliers.append(points)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sums / total
+        stats = pd.DataFrame({
+            'count': total,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'lowerfence': lower_whisker,
+            'upperfence': upper_whisker,
+            'mean': mean,
+            'outliers': outliers,
+        }, index=pd.Index(np.asarray(self.labels, dtype=object), name=self.dim))
+        return stats[present]
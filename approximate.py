@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from aggregation import AggregateCube, HistogramSketch, build_cube, category_codes
+from streaming import BOX_DIMENSIONS, BOX_MEASURE
+
+# 점진적 근사 모드: 층화 표본으로 먼저 그리고, 정확한 집계는 백그라운드에서 계산
+STRATA = ['지역명', '연령대', '투자성향']
+SAMPLE_ROWS = int(os.environ.get('DASHBOARD_SAMPLE_ROWS', 50_000))
+# 작은 층도 분산을 추정할 수 있도록 최소 표본 수
+MIN_STRATUM_ROWS = 30
+# 이 행 수를 넘으면 근사 모드 (DASHBOARD_APPROXIMATE=1/0으로 강제)
+APPROXIMATE_THRESHOLD_ROWS = int(os.environ.get('DASHBOARD_APPROXIMATE_ROWS', 5_000_000))
+# 표본 추출용 난수 스트림 번호
+SAMPLE_STREAM = 0x5A17
+# 95% 신뢰구간
+Z_95 = 1.959963984540054
+
+# data: 표본 행, population: 층별 모집단 행 수 (STRATA 축 순서, 각 축의 마지막 칸은 결측)
+StratifiedSample = namedtuple('StratifiedSample', ['data', 'strata', 'population'])
+
+
+def use_approximate(rows):
+    flag = os.environ.get('DASHBOARD_APPROXIMATE')
+    if flag is not None:
+        return flag == '1'
+    return rows > APPROXIMATE_THRESHOLD_ROWS
+
+
+def stratum_index(df, strata=STRATA):
+    # 행별 층 번호와 층 격자 모양
+    codes, shape = [], []
+    for dim in strata:
+        dim_codes, labels = category_codes(df[dim])
+        codes.append(dim_codes)
+        shape.append(len(labels) + 1)
+    return np.ravel_multi_index(codes, shape), tuple(shape)
+
+
+def allocation_rates(population, rows=SAMPLE_ROWS, minimum=MIN_STRATUM_ROWS):
+    # 비례 배분 + 층별 최소 표본 수에 해당하는 추출 확률
+    population = np.asarray(population, dtype=np.float64)
+    total = population.sum()
+    target = np.maximum(rows * population / total if total else population, minimum)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(population > 0, np.minimum(target / population, 1.0), 0.0)
+
+
+def stratified_sample(df, rows=SAMPLE_ROWS, strata=STRATA, seed=0):
+    # 층별 확률로 한 번에 베르누이 추출 (정렬 없이 O(N))
+    flat, shape = stratum_index(df, strata)
+    population = np.bincount(flat, minlength=int(np.prod(shape)))
+    rates = allocation_rates(population, rows)
+    # 같은 시드로 만든 합성 데이터의 난수열과 겹치지 않도록 별도 스트림 사용
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(SAMPLE_STREAM,)))
+    keep = rng.random(len(flat)) < rates[flat]
+    return StratifiedSample(df[keep].reset_index(drop=True), list(strata), population.reshape(shape))
+
+
+def _weights(sample):
+    # 층별 가중치 (모집단 수 / 표본 수)와 표본 행별 층 번호
+    flat, _ = stratum_index(sample.data, sample.strata)
+    population = sample.population.ravel().astype(np.float64)
+    sampled = np.bincount(flat, minlength=len(population)).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weights = np.where(sampled > 0, population / sampled, 0.0)
+    return weights, flat, population, sampled
+
+
+def sample_cube(sample):
+    # 표본 큐브의 셀을 층 가중치로 키운 근사 큐브 (최소/최대는 표본 값)
+    cube = build_cube(sample.data)
+    weights, _, _, _ = _weights(sample)
+    grids = np.indices(cube.shape)
+    axes = [grids[cube.dims.index(dim)] for dim in sample.strata]
+    cell_weights = weights.reshape(sample.population.shape)[tuple(axes)]
+    stats = {
+        measure: {
+            name: values if name in ('min', 'max') else values * cell_weights
+            for name, values in measure_stats.items()
+        }
+        for measure, measure_stats in cube.stats.items()
+    }
+    # 행 수는 층 안에서 최대 나머지 방식으로 반올림 (층별 합계와 전체 고객 수가 정확히 맞음)
+    scaled = (cube.rows * cell_weights).ravel()
+    rows = np.floor(scaled).astype(np.int64)
+    remainder = scaled - rows
+    cell_strata = np.ravel_multi_index(axes, sample.population.shape).ravel()
+    deficit = sample.population.ravel() - np.bincount(cell_strata, weights=rows, minlength=sample.population.size)
+    order = np.lexsort((-remainder, cell_strata))
+    starts = np.searchsorted(cell_strata[order], cell_strata[order], side='left')
+    rank = np.arange(len(order)) - starts
+    rows[order[rank < np.rint(deficit[cell_strata[order]])]] += 1
+    return AggregateCube(cube.dims, cube.labels, rows.reshape(cube.shape), stats)
+
+
+def mean_intervals(sample, dim, measure):
+    # 그룹 평균의 층화 추정치와 95% 신뢰구간 반폭 (dim=None이면 전체)
+    # 그룹은 층을 가로지르는 영역(domain)으로 보고 선형화한 분산을 사용
+    weights, flat, population, sampled = _weights(sample)
+    values = sample.data[measure].to_numpy(dtype=np.float64)
+    if dim is None:
+        groups, labels = np.zeros(len(values), dtype=np.int64), ['전체']
+    else:
+        groups, labels = category_codes(sample.data[dim])
+    valid = ~np.isnan(values) & (groups < len(labels))
+    groups, values, strata = groups[valid], values[valid], flat[valid]
+    size, width = len(population), len(labels)
+
+    row_weights = weights[strata]
+    total_weight = np.bincount(groups, weights=row_weights, minlength=width)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(groups, weights=row_weights * values, minlength=width) / total_weight
+
+    # 층 h, 그룹 g별 z = 1[g](y - mean_g) 의 합과 제곱합 (층 안의 다른 그룹 행은 0)
+    cells = strata * width + groups
+    deviation = values - np.nan_to_num(means)[groups]
+    z_sum = np.bincount(cells, weights=deviation, minlength=size * width).reshape(size, width)
+    z_sq = np.bincount(cells, weights=deviation * deviation, minlength=size * width).reshape(size, width)
+    n = sampled[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_var = np.where(n > 1, (z_sq - z_sum * z_sum / n) / (n - 1), 0.0)
+        fpc = np.where(population > 0, 1.0 - sampled / population, 0.0)[:, None]
+        variance = (population[:, None] ** 2 * fpc * z_var / np.where(n > 0, n, 1)).sum(axis=0)
+        half_width = Z_95 * np.sqrt(np.clip(variance, 0, None)) / total_weight
+    observed = total_weight > 0
+    return pd.DataFrame(
+        {'mean': means[observed], 'half_width': half_width[observed]},
+        index=pd.Index(np.asarray(labels, dtype=object)[observed], name=dim)
+    )
+
+
+def sample_sketches(sample, dims=BOX_DIMENSIONS, measure=BOX_MEASURE):
+    # 박스플롯은 표본 분포로 근사 (비례 배분이라 거의 자기가중)
+    return {dim: HistogramSketch.from_frame(sample.data, dim, measure) for dim in dims if dim in sample.data.columns}
+
+
+# 정확한 집계의 백그라운드 계산 (캐시 키별 한 번만, 프로세스 전역)
+MAX_REFINEMENTS = 16
+_refinements = OrderedDict()
+_refine_lock = threading.Lock()
+_refine_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='refine')
+
+
+def refine(key, compute):
+    with _refine_lock:
+        future = _refinements.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _refinements[key] = _refine_pool.submit(compute)
+            while len(_refinements) > MAX_REFINEMENTS:
+                _refinements.popitem(last=False)
+        _refinements.move_to_end(key)
+        return future
@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+# 합성 데이터로 대시보드 각 단계의 시간과 차트 크기를 측정하고 JSON 기준값과 비교
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+WORKDIR = '.bench_data'
+BASELINE_PATH = 'bench_baseline.json'
+# 기준값 대비 이 비율 이상 느려지거나 커지면 회귀로 판단 (작은 값은 잡음이라 무시)
+REGRESSION_TOLERANCE = 0.2
+MIN_REGRESSION_SECONDS = 0.05
+PAGE_TIMEOUT_SECONDS = 600
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def prepare_dataset(rows, workdir, seed):
+    from synthetic import write_dataset
+
+    os.makedirs(workdir, exist_ok=True)
+    path = os.path.join(workdir, f'synthetic_{rows}_{seed}.csv')
+    if not os.path.exists(path):
+        write_dataset(path, rows, seed)
+    return path
+
+
+def bench_sections(path, cache_dir):
+    # 로드, KPI, 탭별 차트 생성/직렬화를 단계별로 측정
+    from aggregation import build_cube, compute_kpis
+    from data_store import dataset_fingerprint, load_dataset
+    from figures import FIGURE_WORKERS, render_charts, start_pool
+    from sections import TAB_SECTIONS, SectionContext
+    from stats_engine import correlation_table
+    from streaming import stream_aggregates
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    results = {}
+    _, results['load_csv_cold_s'] = timed(lambda: load_dataset(path, cache_dir))
+    data, results['load_snapshot_warm_s'] = timed(lambda: load_dataset(path, cache_dir))
+    _, results['load_streaming_s'] = timed(lambda: stream_aggregates(path))
+    cube, results['kpi_cube_s'] = timed(lambda: build_cube(data))
+    _, results['kpi_values_s'] = timed(lambda: compute_kpis(cube))
+
+    ctx = SectionContext(dataset_fingerprint(path, cache_dir), cube, data)
+    # 차트 생성/직렬화는 순차 실행과 작업자 풀 실행을 함께 측정 (풀은 미리 띄워 둠)
+    start_pool(wait=True)
+    for key, section in TAB_SECTIONS.items():
+        rows, results[f'tab_{key}_build_s'] = timed(lambda: section.builder(ctx, **section.params))
+        payloads, results[f'tab_{key}_serialize_s'] = timed(lambda: render_charts(rows, parallel=False))
+        if FIGURE_WORKERS > 1:
+            _, results[f'tab_{key}_parallel_s'] = timed(lambda: render_charts(rows))
+        results[f'tab_{key}_bytes'] = sum(len(payload.encode('utf-8')) for row in payloads for payload in row)
+
+    _, results['correlations_s'] = timed(lambda: correlation_table(data))
+    _, results['correlations_grouped_s'] = timed(lambda: correlation_table(data, '지역명'))
+    return results
+
+
+def bench_page(path, cache_dir):
+    # 스크립트 전체를 AppTest로 실행 (모듈 기본 경로가 바뀌도록 별도 프로세스에서)
+    env = dict(os.environ, DASHBOARD_DATA=os.path.abspath(path),
+               DASHBOARD_CACHE_DIR=os.path.abspath(cache_dir))
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--page-run'],
+        env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def run_page():
+    from streamlit.testing.v1 import AppTest
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+    results = {}
+    app = AppTest.from_file(script, default_timeout=PAGE_TIMEOUT_SECONDS)
+    _, results['page_first_run_s'] = timed(app.run)
+    _, results['page_rerun_s'] = timed(app.run)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    print(json.dumps(results))
+
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    # (크기, 지표, 기준값, 측정값) 회귀 목록
+    regressions = []
+    for size, metrics in results.items():
+        for name, value in metrics.items():
+            old = baseline.get(size, {}).get(name)
+            if old is None or value <= old * (1 + tolerance):
+                continue
+            if name.endswith('_s') and value - old < MIN_REGRESSION_SECONDS:
+                continue
+            regressions.append((size, name, old, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='대시보드 성능 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=WORKDIR)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update', action='store_true', help='측정 결과를 기준값으로 저장')
+    parser.add_argument('--no-page', action='store_true', help='AppTest 전체 페이지 실행 생략')
+    parser.add_argument('--page-run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.page_run:
+        run_page()
+        return 0
+
+    results = {}
+    for rows in args.sizes:
+        path = prepare_dataset(rows, args.workdir, args.seed)
+        cache_dir = os.path.join(args.workdir, f'cache_{rows}')
+        metrics = bench_sections(path, cache_dir)
+        if not args.no_page:
+            metrics.update(bench_page(path, cache_dir))
+        results[str(rows)] = metrics
+        print(f'[{rows:,} rows]')
+        for name, value in metrics.items():
+            print(f'  {name:32s} {value:,.4f}' if name.endswith('_s') else f'  {name:32s} {value:,}')
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'cpus': os.cpu_count(),
+                    'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                },
+                'results': baseline,
+            }, f, ensure_ascii=False, indent=2)
+        print(f'기준값 저장: {args.baseline}')
+        return 0
+
+    regressions = compare(results, baseline)
+    for size, name, old, value in regressions:
+        print(f'회귀 [{size} rows] {name}: {old:,.4f} → {value:,.4f}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
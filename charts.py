@@ -0,0 +1,225 @@
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# 공통 차트 스타일 설정
+CHART_THEME = 'seaborn'
+COLOR_PALETTE = px.colors.qualitative.Set3
+TEMPLATE = 'plotly_white'
+
+
+def get_chart_layout(title='', legend_position='default'):
+    layout = dict(
+        title=title,
+        template=TEMPLATE,
+        title_x=0.5,
+        font=dict(family="Malgun Gothic", size=12),
+        margin=dict(t=50, l=50, r=50, b=50),
+        height=500,  # 모든 차트의 높이를 500px로 통일
+        showlegend=True
+    )
+
+    if legend_position == 'default':
+        layout['legend'] = dict(
+            orientation="v",
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=1.02
+        )
+    elif legend_position == 'bottom':
+        layout['legend'] = dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.2,
+            xanchor="center",
+            x=0.5
+        )
+
+    return layout
+
+
+def prepare_box_figure(stats, x_col, y_col):
+    # 서버에서 계산한 사분위수/수염으로 박스플롯 생성 (그룹 수에 비례하는 크기)
+    fig = go.Figure()
+    for i, (label, row) in enumerate(stats.iterrows()):
+        color = COLOR_PALETTE[i % len(COLOR_PALETTE)]
+        fig.add_trace(go.Box(
+            x=[label],
+            q1=[row['q1']],
+            median=[row['median']],
+            q3=[row['q3']],
+            lowerfence=[row['lowerfence']],
+            upperfence=[row['upperfence']],
+            mean=[row['mean']],
+            name=str(label),
+            legendgroup=str(label),
+            marker_color=color,
+            boxpoints=False
+        ))
+        if len(row['outliers']):
+            fig.add_trace(go.Scatter(
+                x=[label] * len(row['outliers']),
+                y=row['outliers'],
+                mode='markers',
+                name=str(label),
+                legendgroup=str(label),
+                showlegend=False,
+                marker=dict(color=color, size=4)
+            ))
+    fig.update_xaxes(title_text=x_col, type='category')
+    fig.update_yaxes(title_text=y_col)
+    return fig
+
+
+def pie_chart(counts, title, legend_position='bottom', **trace_options):
+    # 범주별 고객 수 파이 차트
+    fig = px.pie(
+        values=counts.values,
+        names=counts.index,
+        color_discrete_sequence=COLOR_PALETTE,
+        title=title
+    )
+    fig.update_layout(**get_chart_layout(title, legend_position))
+    if trace_options:
+        fig.update_traces(**trace_options)
+    return fig
+
+
+def bar_chart(series, title, x_label, y_label, texttemplate, error=None):
+    # 범주별 값 막대 차트 (범주마다 다른 색, error는 범주별 오차 막대 크기)
+    fig = px.bar(
+        x=series.index,
+        y=series.values,
+        title=title,
+        labels={
+            'x': x_label,
+            'y': y_label
+        },
+        color=series.index,
+        color_discrete_sequence=COLOR_PALETTE
+    )
+    fig.update_layout(**get_chart_layout(title))
+    fig.update_traces(texttemplate=texttemplate, textposition='outside')
+    if error is not None:
+        # 범주마다 trace가 따로 생기므로 trace별로 지정
+        for trace in fig.data:
+            trace.error_y = dict(type='data', array=[error.get(label, 0) for label in trace.x], color='#555')
+    return fig
+
+
+def box_chart(stats, title, x_col, y_col):
+    fig = prepare_box_figure(stats, x_col, y_col)
+    fig.update_layout(**get_chart_layout(title))
+    return fig
+
+
+def heatmap_chart(table, title, x_label, y_label, color_label='고객 수', texttemplate=None):
+    # 크로스탭 히트맵 (기본은 셀마다 고객 수 표시, texttemplate을 주면 셀 값을 그 형식으로)
+    fig = px.imshow(
+        table.values,
+        x=table.columns,
+        y=table.index,
+        title=title,
+        labels=dict(x=x_label, y=y_label, color=color_label),
+        color_continuous_scale='YlOrRd',
+        aspect='auto'
+    )
+    fig.update_layout(**get_chart_layout(title))
+    if texttemplate is None:
+        fig.update_traces(text=table.values.astype(int),
+                          texttemplate='%{text}명')
+    else:
+        fig.update_traces(texttemplate=texttemplate)
+    return fig
+
+
+def segment_chart(summary, title):
+    # 군집 중심 산점도 (점 크기는 고객 수)
+    fig = px.scatter(
+        summary.reset_index(),
+        x='평균 안전자산비율',
+        y='평균 총평가금액',
+        size='고객 수',
+        color='군집',
+        text='군집',
+        color_discrete_sequence=COLOR_PALETTE,
+        title=title
+    )
+    fig.update_layout(**get_chart_layout(title))
+    fig.update_layout(yaxis=dict(tickformat=',.0f', tickprefix='₩'))
+    fig.update_traces(textposition='top center')
+    return fig
+
+
+# 기간 비교 차트 색 (증가/감소)
+INCREASE_COLOR = '#d62728'
+DECREASE_COLOR = '#1f77b4'
+
+
+def change_bar_chart(series, title, x_label, y_label, texttemplate):
+    # 범주별 증감 막대 차트 (증가는 빨강, 감소는 파랑)
+    colors = [INCREASE_COLOR if value >= 0 else DECREASE_COLOR for value in series.values]
+    fig = go.Figure(go.Bar(x=series.index, y=series.values, marker_color=colors,
+                           texttemplate=texttemplate, textposition='outside'))
+    fig.update_layout(**get_chart_layout(title))
+    fig.update_layout(showlegend=False)
+    fig.update_xaxes(title_text=x_label, type='category')
+    fig.update_yaxes(title_text=y_label, zeroline=True)
+    return fig
+
+
+def change_heatmap_chart(table, title, x_label, y_label, color_label='변화 (%p)'):
+    # 구성비 변화 히트맵 (0을 중심으로 한 발산형 색)
+    limit = max(float(abs(table.values).max()) if table.size else 0.0, 1e-9)
+    fig = px.imshow(
+        table.values,
+        x=table.columns,
+        y=table.index,
+        title=title,
+        labels=dict(x=x_label, y=y_label, color=color_label),
+        color_continuous_scale='RdBu_r',
+        zmin=-limit,
+        zmax=limit,
+        aspect='auto'
+    )
+    fig.update_layout(**get_chart_layout(title))
+    fig.update_traces(texttemplate='%{z:+.1f}%p')
+    return fig
+
+
+def density_chart(grid, title, x_label, y_label, max_marker_size=18):
+    # 서버에서 계산한 2차원 구간 밀도
+    # 그룹이 하나면 히트맵, 그룹별이면 구간 중심에 고객 수 크기의 점 (그룹 색)
+    x_edges, y_edges = grid.x_edges, grid.y_edges
+    # 전송 크기를 줄이려고 좌표는 원 단위, 비율은 소수 둘째 자리까지
+    x_centers = np.round(np.sqrt(x_edges[:-1] * x_edges[1:]) if grid.log_x else (x_edges[:-1] + x_edges[1:]) / 2)
+    y_centers = np.round((y_edges[:-1] + y_edges[1:]) / 2, 2)
+    fig = go.Figure()
+    if len(grid.groups) == 1:
+        counts = grid.counts[0].astype(float)
+        counts[counts == 0] = np.nan
+        fig.add_trace(go.Heatmap(
+            x=x_centers, y=y_centers, z=counts,
+            colorscale='YlOrRd', colorbar=dict(title='고객 수'),
+            hovertemplate=f'{x_label}: ₩%{{x:,.0f}}<br>{y_label}: %{{y:.1f}}%<br>고객 수: %{{z:,}}명<extra></extra>'
+        ))
+    else:
+        peak = max(int(grid.counts.max()), 1)
+        for i, label in enumerate(grid.groups):
+            y_pos, x_pos = np.nonzero(grid.counts[i])
+            counts = grid.counts[i][y_pos, x_pos]
+            fig.add_trace(go.Scatter(
+                x=x_centers[x_pos], y=y_centers[y_pos], mode='markers', name=str(label),
+                customdata=counts,
+                marker=dict(size=np.round(np.maximum(np.sqrt(counts / peak) * max_marker_size, 2), 1),
+                            color=COLOR_PALETTE[i % len(COLOR_PALETTE)], opacity=0.6,
+                            line=dict(width=0)),
+                hovertemplate=f'{x_label}: ₩%{{x:,.0f}}<br>{y_label}: %{{y:.1f}}%<br>'
+                              f'고객 수: %{{customdata:,}}명<extra>{label}</extra>'
+            ))
+    fig.update_layout(**get_chart_layout(title))
+    fig.update_xaxes(title_text=f'{x_label} (원)', type='log' if grid.log_x else 'linear',
+                     tickformat=',.0f', tickprefix='₩')
+    fig.update_yaxes(title_text=f'{y_label} (%)')
+    return fig
@@ -0,0 +1,175 @@
+import argparse
+import os
+import sys
+import time
+
+from data_store import CACHE_DIR, DATA_PATH
+
+# 대시보드 배치 명령 (python -m cli <명령>)
+
+
+def run_precompute(args):
+    from precompute import build_snapshot, save_snapshot
+
+    start = time.perf_counter()
+    snapshot = build_snapshot(args.data, args.cache_dir, figures=args.figures)
+    manifest = save_snapshot(snapshot, args.out)
+    print(f"{args.out}: {snapshot.cube.total_count():,} rows, "
+          f"탭 차트 {len(snapshot.figures)}개, {time.perf_counter() - start:.2f}s "
+          f"(지문 {manifest['fingerprint']})")
+    return 0
+
+
+def run_ingest(args):
+    from sources import ingest
+
+    start = time.perf_counter()
+    rows = ingest(args.data, args.db, args.chunk_rows)
+    print(f'{args.db}: {rows:,} rows, {time.perf_counter() - start:.2f}s')
+    return 0
+
+
+def run_period(args):
+    from history import build_period, display_date, list_periods, save_period
+
+    start = time.perf_counter()
+    period = build_period(args.date, args.data)
+    save_period(period, args.history_dir)
+    print(f"{display_date(period.date)}: {period.cube.total_count():,} rows, "
+          f"{time.perf_counter() - start:.2f}s (저장된 기준일 {len(list_periods(args.history_dir))}개)")
+    return 0
+
+
+def run_validate(args):
+    from data_store import quarantine_path, read_csv, write_quarantine
+    from schema import WARNING_REASONS
+
+    # 스키마 검증만 실행하고 격리 결과를 보고 (컬럼형 캐시는 건드리지 않음)
+    start = time.perf_counter()
+    validated = read_csv(args.data)
+    write_quarantine(validated.quarantined, args.data, args.cache_dir)
+    print(f'{args.data}: 정상 {len(validated.data):,}행, 격리 {len(validated.quarantined):,}행, '
+          f'{time.perf_counter() - start:.2f}s')
+    for (column, reason), count in sorted(validated.counts.items(), key=lambda item: -item[1]):
+        print(f"  {column}: {reason} {count:,}{' (경고, 분석에 포함)' if reason in WARNING_REASONS else ''}")
+    if len(validated.quarantined):
+        print(f'격리된 행: {quarantine_path(args.data, args.cache_dir)}')
+    return 0
+
+
+def run_memory(args):
+    import pandas as pd
+
+    from data_store import compact_frame, load_dataset, memory_report
+
+    # 변환 전: 기본 설정의 pd.read_csv (문자열은 object, 수치는 64비트)
+    before = pd.read_csv(args.data)
+    after = compact_frame(load_dataset(args.data, args.cache_dir))
+    report = memory_report(before, after)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(report.to_string(formatters={'변환 전 bytes': '{:,.0f}'.format, '변환 후 bytes': '{:,.0f}'.format,
+                                           '절감률': '{:.1%}'.format}))
+    return 0
+
+
+def run_serve(args):
+    from streamlit.web import bootstrap
+
+    from profiling import BOOT_ENV
+    from warmup import prewarm
+
+    # 서버를 이 프로세스에서 띄우고, 첫 접속 전에 데이터/집계 캐시를 백그라운드에서 예열
+    os.environ[BOOT_ENV] = str(time.time())
+    future = prewarm()
+    future.add_done_callback(lambda done: print(
+        f'예열 실패: {done.exception()}' if done.exception() is not None
+        else f'예열 완료: {done.result().seconds:.2f}s', flush=True))
+    flags = {'server_port': args.port, 'server_headless': args.headless}
+    bootstrap.load_config_options(flags)
+    bootstrap.run(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py'), False, [], flags)
+    return 0
+
+
+def run_report(args):
+    from figures import start_pool
+    from report import export_reports
+    from sources import CsvSource, SqliteSource
+
+    # 원본을 한 번 읽고 집계한 뒤 범주별 리포트 차트를 작업 프로세스 풀에서 함께 그림
+    start = time.perf_counter()
+    source = SqliteSource(args.db) if args.source == 'sqlite' else CsvSource(args.data, args.cache_dir)
+    if not source.supports_filters:
+        print('스트리밍 모드에서는 범주별 리포트를 만들 수 없습니다 (python -m cli ingest 후 --source sqlite)')
+        return 1
+    start_pool(wait=True, workers=args.workers)
+    written = export_reports(source, args.by, args.out, args.label)
+    for label, path, rows in written:
+        print(f'  {label}: {rows:,}명 → {path}')
+    print(f'{args.out}: {args.by}별 리포트 {len(written)}개, {time.perf_counter() - start:.2f}s')
+    return 0
+
+
+def build_parser():
+    from history import ANALYSIS_DATE, HISTORY_DIR, parse_date
+    from precompute import SNAPSHOT_DIR
+    from report import REPORT_DIMENSIONS, REPORT_DIR
+    from sources import SOURCE_KIND, SQLITE_PATH
+    from streaming import CHUNK_ROWS
+
+    parser = argparse.ArgumentParser(prog='python -m cli', description='고객 대시보드 배치 명령')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    precompute = commands.add_parser('precompute', help='대시보드 시작용 스냅샷 생성')
+    precompute.add_argument('--data', default=DATA_PATH, help='원본 CSV 경로')
+    precompute.add_argument('--cache-dir', default=CACHE_DIR, help='컬럼형 캐시 디렉터리')
+    precompute.add_argument('--out', default=SNAPSHOT_DIR, help='스냅샷 디렉터리')
+    precompute.add_argument('--figures', action='store_true', help='기본 인자 탭 차트 JSON도 저장')
+    precompute.set_defaults(func=run_precompute)
+
+    ingest = commands.add_parser('ingest', help='CSV를 인덱스가 있는 SQLite로 적재 (DASHBOARD_SOURCE=sqlite)')
+    ingest.add_argument('--data', default=DATA_PATH, help='원본 CSV 경로')
+    ingest.add_argument('--db', default=SQLITE_PATH, help='SQLite 파일 경로')
+    ingest.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    ingest.set_defaults(func=run_ingest)
+
+    validate = commands.add_parser('validate', help='스키마 검증 (형식/범위/범주 오류 행 수와 격리 파일)')
+    validate.add_argument('--data', default=DATA_PATH, help='원본 CSV 경로')
+    validate.add_argument('--cache-dir', default=CACHE_DIR, help='격리 파일을 둘 디렉터리')
+    validate.set_defaults(func=run_validate)
+
+    memory = commands.add_parser('memory', help='컬럼별 메모리 사용량 (기본 read_csv 대비 축소 결과)')
+    memory.add_argument('--data', default=DATA_PATH, help='원본 CSV 경로')
+    memory.add_argument('--cache-dir', default=CACHE_DIR, help='컬럼형 캐시 디렉터리')
+    memory.set_defaults(func=run_memory)
+
+    serve = commands.add_parser('serve', help='대시보드 서버 실행 (시작 시 데이터/집계 캐시 예열)')
+    serve.add_argument('--port', type=int, help='서버 포트 (기본 Streamlit 설정)')
+    serve.add_argument('--headless', action='store_true', default=None, help='브라우저를 열지 않음')
+    serve.set_defaults(func=run_serve)
+
+    period = commands.add_parser('period', help='기준일별 집계 큐브 저장 (기간 비교용)')
+    period.add_argument('--date', type=parse_date, default=ANALYSIS_DATE, help='기준일 (YYYY-MM-DD)')
+    period.add_argument('--data', default=DATA_PATH, help='해당 기준일의 CSV 추출본')
+    period.add_argument('--history-dir', default=HISTORY_DIR, help='기준일별 저장소 디렉터리')
+    period.set_defaults(func=run_period)
+
+    report = commands.add_parser('report', help='범주별 정적 HTML 리포트 (지점 배포용, 차트는 프로세스 풀에서 병렬 생성)')
+    report.add_argument('--by', choices=REPORT_DIMENSIONS, default=REPORT_DIMENSIONS[0], help='리포트를 나눌 차원')
+    report.add_argument('--label', action='append', help='이 범주만 생성 (여러 번 지정 가능, 기본 전체)')
+    report.add_argument('--out', default=REPORT_DIR, help='리포트 디렉터리')
+    report.add_argument('--source', choices=['csv', 'sqlite'], default=SOURCE_KIND, help='데이터 소스')
+    report.add_argument('--data', default=DATA_PATH, help='원본 CSV 경로')
+    report.add_argument('--cache-dir', default=CACHE_DIR, help='컬럼형 캐시 디렉터리')
+    report.add_argument('--db', default=SQLITE_PATH, help='SQLite 파일 경로 (--source sqlite)')
+    report.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='차트 작업 프로세스 수')
+    report.set_defaults(func=run_report)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
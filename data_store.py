@@ -0,0 +1,359 @@
+import glob
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from schema import CATEGORY_COLUMNS, counts_from_json, counts_to_json, merge_counts, validate
+from scoring import SCORE_VERSION
+
+# 원본 데이터 및 컬럼형 캐시 위치
+DATA_PATH = os.environ.get('DASHBOARD_DATA', 'random_dataset.csv')
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR', '.dashboard_cache')
+
+HASH_BLOCK_SIZE = 1 << 20
+# 뒤에 행만 추가됐는지 확인할 때 비교하는 이전 내용의 끝부분 크기
+TAIL_BYTES = 64 * 1024
+# 컬럼형 스냅샷 형식 (바뀌면 기존 스냅샷을 다시 만듦, 3부터 스키마 검증을 거친 행만 저장,
+# 4부터 코드표에 없는 범주도 격리하지 않고 저장, 5부터 금액/비율은 항상 실수)
+SNAPSHOT_FORMAT = 5
+
+
+def file_signature(path):
+    # 파일 크기와 수정 시각 (해시 계산 없이 빠르게 변경 여부 판단)
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_hash(path, size=None):
+    # 파일 내용 해시 (size가 있으면 앞 size 바이트만)
+    digest = hashlib.blake2b(digest_size=16)
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            block = f.read(HASH_BLOCK_SIZE if remaining is None else min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            if remaining is not None:
+                remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _read_tail(path, size):
+    # 파일 앞 size 바이트 중 마지막 TAIL_BYTES
+    with open(path, 'rb') as f:
+        f.seek(max(size - TAIL_BYTES, 0))
+        return f.read(min(size, TAIL_BYTES))
+
+
+def tail_hash(path, size):
+    return hashlib.blake2b(_read_tail(path, size), digest_size=16).hexdigest()
+
+
+def detect_change(path, meta):
+    # 마지막으로 읽은 시점(meta의 size, mtime_ns, tail_hash) 이후의 변경 종류
+    # 'same': 그대로, 'append': 이전 내용 뒤에 줄만 추가됨, 'rewrite': 그 밖의 변경 (전체를 다시 읽어야 함)
+    signature = file_signature(path)
+    if signature['size'] == meta['size']:
+        if signature['mtime_ns'] == meta['mtime_ns']:
+            return 'same'
+        # 크기는 같고 수정 시각만 바뀐 경우 (복사, touch 등) 내용 해시로 재확인
+        return 'same' if meta.get('content_hash') == file_hash(path) else 'rewrite'
+    if signature['size'] > meta['size'] and meta.get('tail_hash'):
+        tail = _read_tail(path, meta['size'])
+        # 이전 내용이 줄바꿈으로 끝나야 추가된 바이트가 새 행으로 시작함
+        if tail.endswith(b'\n') and hashlib.blake2b(tail, digest_size=16).hexdigest() == meta['tail_hash']:
+            return 'append'
+    return 'rewrite'
+
+
+def _meta_path(path, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}.json')
+
+
+def _read_meta(path, cache_dir):
+    try:
+        with open(_meta_path(path, cache_dir), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(meta, path, cache_dir, signature):
+    if meta is None or meta.get('size') != signature['size'] or meta.get('format') != SNAPSHOT_FORMAT:
+        return False
+    if not os.path.exists(os.path.join(cache_dir, meta['snapshot'])):
+        return False
+    if meta.get('mtime_ns') == signature['mtime_ns']:
+        return True
+    # 크기는 같고 수정 시각만 바뀐 경우 (복사, touch 등) 내용 해시로 재확인
+    return meta.get('content_hash') == file_hash(path)
+
+
+def dataset_meta(path=DATA_PATH, cache_dir=CACHE_DIR):
+    # 마지막으로 읽은 원본의 meta (크기, 지문, 격리 행 수 등, 없으면 None)
+    return _read_meta(path, cache_dir)
+
+
+def snapshot_path(path=DATA_PATH, cache_dir=CACHE_DIR):
+    meta = _read_meta(path, cache_dir)
+    if meta is None:
+        return None
+    return os.path.join(cache_dir, meta['snapshot'])
+
+
+def current_meta(path=DATA_PATH, cache_dir=CACHE_DIR):
+    # 지금 원본 파일을 설명하는 meta
+    # 캐시의 meta가 다른 시점의 파일(크기나 수정 시각이 다름)을 설명하면 크기와 수정 시각만으로 만든 meta
+    signature = file_signature(path)
+    meta = _read_meta(path, cache_dir)
+    if meta is not None and meta.get('size') == signature['size'] and meta.get('mtime_ns') == signature['mtime_ns']:
+        return meta
+    return dict(signature, hash=f"{signature['size']}-{signature['mtime_ns']}",
+                tail_hash=tail_hash(path, signature['size']))
+
+
+def dataset_fingerprint(path=DATA_PATH, cache_dir=CACHE_DIR):
+    # 원본 내용 해시 (캐시의 meta가 지금 파일과 다르면 크기와 수정 시각으로 대체)
+    return current_meta(path, cache_dir)['hash']
+
+
+def _downcast(series):
+    # 값이 그대로 보존되는 가장 작은 수치 타입 (정수는 범위로, 실수는 float32 왕복이 같을 때만)
+    if pd.api.types.is_integer_dtype(series.dtype):
+        if series.empty:
+            return series
+        return pd.to_numeric(series, downcast='unsigned' if series.min() >= 0 else 'integer')
+    if pd.api.types.is_float_dtype(series.dtype) and series.dtype != np.float32:
+        values = series.to_numpy()
+        narrow = values.astype(np.float32)
+        if np.array_equal(narrow.astype(values.dtype), values, equal_nan=True):
+            return pd.Series(narrow, index=series.index, name=series.name)
+    return series
+
+
+def compact_frame(df):
+    # 범주 컬럼은 작은 정수 코드 + 컬럼별 공유 사전(category), 수치 컬럼은 손실 없는 범위에서 축소
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORY_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        columns[col] = _downcast(series)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_report(before, after):
+    # 컬럼별 메모리 사용량 비교 (문자열 객체 크기 포함)
+    before_bytes = before.memory_usage(index=False, deep=True)
+    after_bytes = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        '변환 전 타입': before.dtypes.astype(str),
+        '변환 후 타입': after.dtypes.reindex(before.columns).astype(str),
+        '변환 전 bytes': before_bytes,
+        '변환 후 bytes': after_bytes.reindex(before.columns),
+    })
+    report.loc['합계'] = ['', '', before_bytes.sum(), after_bytes.sum()]
+    report['절감률'] = 1 - report['변환 후 bytes'] / report['변환 전 bytes']
+    report.index.name = '컬럼'
+    return report
+
+
+def read_csv(source):
+    # CSV 파싱 + 스키마 검증/정규화 (범주형 컬럼은 category dtype으로 읽고 수치 컬럼은 축소)
+    # 반환: schema.Validated (정상 행, 격리된 행, 사유별 행 수)
+    raw = pd.read_csv(source, dtype={col: 'category' for col in CATEGORY_COLUMNS})
+    validated = validate(raw)
+    return validated._replace(data=compact_frame(validated.data))
+
+
+def quarantine_path(path=DATA_PATH, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}-quarantine.csv')
+
+
+def write_quarantine(rows, path, cache_dir=CACHE_DIR, append=False):
+    # 격리된 원본 행을 사유와 함께 캐시 디렉터리에 보관 (전체를 다시 읽을 때는 새로 씀)
+    target = quarantine_path(path, cache_dir)
+    try:
+        if not append and os.path.exists(target):
+            os.remove(target)
+        if len(rows):
+            os.makedirs(cache_dir, exist_ok=True)
+            rows.to_csv(target, mode='a', header=not os.path.exists(target), index=False)
+    except OSError:
+        pass
+
+
+def read_appended(path, meta, cache_dir=CACHE_DIR):
+    # meta 시점 이후 추가된 완성된 행만 파싱/검증 (쓰는 중인 마지막 줄은 다음 확인 때 읽음)
+    # 반환: (새 행, 새 meta), 완성된 행이 없으면 (None, None)
+    signature = file_signature(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(meta['size'])
+        body = f.read(signature['size'] - meta['size'])
+    body = body[:body.rfind(b'\n') + 1]
+    if not body:
+        return None, None
+    size = meta['size'] + len(body)
+    # 지문은 이전 지문과 추가된 바이트의 해시를 이어서 계산 (이전 내용을 다시 파싱하지 않음)
+    base = meta.get('hash') or f"{meta['size']}-{meta['mtime_ns']}"
+    digest = hashlib.blake2b(base.encode('utf-8'), digest_size=16)
+    digest.update(body)
+    # 이어서 계산한 지문은 파일 해시와 다르므로, 수정 시각만 바뀐 경우를 확인할 실제 내용 해시를 따로 저장
+    # (해시는 파싱보다 훨씬 싸서 추가할 때마다 다시 계산)
+    content_hash = file_hash(path, size)
+    validated = read_csv(io.BytesIO(header + body))
+    write_quarantine(validated.quarantined, path, cache_dir, append=True)
+    counts = merge_counts(counts_from_json(meta.get('quarantine')), validated.counts)
+    new_meta = dict(meta, size=size, mtime_ns=signature['mtime_ns'], hash=digest.hexdigest(),
+                    content_hash=content_hash, tail_hash=tail_hash(path, size),
+                    rows=meta.get('rows', 0) + len(validated.data), quarantine=counts_to_json(counts))
+    return validated.data, new_meta
+
+
+def append_frame(df, rows):
+    # 기존 행 뒤에 새 행을 붙임 (범주 사전은 합집합을 정렬해 read_csv 결과와 같은 코드 순서 유지)
+    columns = {}
+    for col in df.columns:
+        old, new = df[col], rows[col]
+        if isinstance(old.dtype, pd.CategoricalDtype) or isinstance(new.dtype, pd.CategoricalDtype):
+            combined = pd.api.types.union_categoricals([old.astype('category'), new.astype('category')],
+                                                       sort_categories=True)
+            columns[col] = pd.Series(combined, name=col)
+        else:
+            columns[col] = pd.concat([old, new], ignore_index=True)
+    return compact_frame(pd.DataFrame(columns))
+
+
+def write_snapshot(df, path, cache_dir=CACHE_DIR, signature=None, digest=None, quarantine=None,
+                   content_hash=None):
+    # digest: 지문 (행이 추가된 뒤에는 이어서 계산한 값), content_hash: 파일 내용 해시
+    # 지문을 주지 않으면 둘 다 파일 내용 해시
+    os.makedirs(cache_dir, exist_ok=True)
+    signature = signature or file_signature(path)
+    if digest is None:
+        digest = content_hash = file_hash(path)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = f'{stem}-{digest}.arrow'
+    target = os.path.join(cache_dir, name)
+
+    # 무압축 Arrow IPC로 저장해야 이후 memory map으로 바로 읽을 수 있음
+    tmp = f'{target}.{os.getpid()}.tmp'
+    feather.write_feather(df, tmp, compression='uncompressed')
+    os.replace(tmp, target)
+
+    previous = _read_meta(path, cache_dir)
+    meta = dict(signature, hash=digest, content_hash=content_hash, snapshot=name, rows=len(df),
+                format=SNAPSHOT_FORMAT, tail_hash=tail_hash(path, signature['size']),
+                quarantine=counts_to_json(quarantine or {}))
+    meta_file = _meta_path(path, cache_dir)
+    with open(f'{meta_file}.{os.getpid()}.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(f'{meta_file}.{os.getpid()}.tmp', meta_file)
+
+    # 이전 스냅샷과 그 스냅샷의 고객별 점수 정리
+    if previous and previous.get('snapshot') != name:
+        for stale in (os.path.join(cache_dir, previous['snapshot']), scores_path(path, cache_dir, previous['hash'])):
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return meta
+
+
+def read_snapshot(snapshot):
+    table = feather.read_table(snapshot, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def scores_path(path, cache_dir, digest):
+    # 점수 정의 버전을 파일 이름에 넣어 이전 정의로 계산한 점수는 읽지 않음
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{stem}-{digest}-scores{SCORE_VERSION}.arrow')
+
+
+def read_scores(path, cache_dir, digest, rows):
+    # 같은 내용(digest)의 원본에서 계산해 둔 고객별 점수 (행 수가 다르거나 없으면 None)
+    try:
+        scores = read_snapshot(scores_path(path, cache_dir, digest))
+    except (OSError, ValueError):
+        return None
+    return scores if len(scores) == rows else None
+
+
+def write_scores(scores, path, cache_dir, digest):
+    # 스냅샷 옆에 무압축 Arrow로 저장 (원본이 바뀌어 스냅샷을 교체할 때 함께 지움)
+    target = scores_path(path, cache_dir, digest)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    try:
+        feather.write_feather(scores, tmp, compression='uncompressed')
+        os.replace(tmp, target)
+    except OSError:
+        return
+    # 같은 원본을 이전 점수 정의로 계산한 파일 정리
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for stale in glob.glob(os.path.join(glob.escape(cache_dir), f'{glob.escape(stem)}-{digest}-scores*.arrow')):
+        if stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def extend_dataset(df, path, cache_dir, meta):
+    # 뒤에 추가된 행만 파싱해 붙이고 스냅샷을 갱신
+    # 반환: (전체 행, 새 행, 새 meta), 완성된 새 행이 없으면 (df, None, meta)
+    rows, new_meta = read_appended(path, meta, cache_dir)
+    if rows is None:
+        return df, None, meta
+    combined = append_frame(df, rows)
+    try:
+        signature = {'size': new_meta['size'], 'mtime_ns': new_meta['mtime_ns']}
+        new_meta = write_snapshot(combined, path, cache_dir, signature, new_meta['hash'],
+                                  counts_from_json(new_meta['quarantine']), new_meta['content_hash'])
+    except OSError:
+        pass
+    return combined, rows, new_meta
+
+
+def open_dataset(path=DATA_PATH, cache_dir=CACHE_DIR):
+    # (원본 행, 읽은 시점의 meta)
+    # 컬럼형 스냅샷이 최신이면 CSV 파싱 없이 memory map으로 로드하고,
+    # 스냅샷 이후 뒤에 행만 추가됐으면 추가된 부분만 파싱해 붙임
+    signature = file_signature(path)
+    meta = _read_meta(path, cache_dir)
+    if _is_fresh(meta, path, cache_dir, signature):
+        if meta.get('mtime_ns') != signature['mtime_ns']:
+            meta = dict(meta, **signature)
+            with open(_meta_path(path, cache_dir), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+        return read_snapshot(os.path.join(cache_dir, meta['snapshot'])), meta
+    if (meta is not None and meta.get('format') == SNAPSHOT_FORMAT
+            and os.path.exists(os.path.join(cache_dir, meta['snapshot']))
+            and detect_change(path, meta) == 'append'):
+        df, _, meta = extend_dataset(read_snapshot(os.path.join(cache_dir, meta['snapshot'])), path, cache_dir,
+                                     meta)
+        return df, meta
+
+    validated = read_csv(path)
+    df = validated.data
+    write_quarantine(validated.quarantined, path, cache_dir)
+    try:
+        meta = write_snapshot(df, path, cache_dir, signature, quarantine=validated.counts)
+    except OSError:
+        # 캐시 디렉터리에 쓸 수 없으면 CSV 결과만 사용
+        meta = dict(signature, hash=None, rows=len(df), tail_hash=tail_hash(path, signature['size']),
+                    quarantine=counts_to_json(validated.counts))
+    return df, meta
+
+
+def load_dataset(path=DATA_PATH, cache_dir=CACHE_DIR):
+    return open_dataset(path, cache_dir)[0]
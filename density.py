@@ -0,0 +1,71 @@
+from collections import namedtuple
+
+import numpy as np
+
+from aggregation import category_codes
+
+# 총평가금액 × 안전자산비율 2차원 구간 밀도 (원본 점 대신 격자 크기의 결과만 브라우저로 보냄)
+DENSITY_X = '총평가금액'
+DENSITY_Y = '안전자산비율'
+DENSITY_GROUP = '투자성향'
+DENSITY_BINS = 60
+MAX_DENSITY_BINS = 200
+# 로그 축에서 0 이하 값 대신 쓰는 하한
+LOG_FLOOR = 1.0
+
+# counts: (그룹 수, y 구간 수, x 구간 수), 그룹을 나누지 않으면 '전체' 하나
+DensityGrid = namedtuple('DensityGrid', ['x_edges', 'y_edges', 'counts', 'groups', 'log_x'])
+
+
+def axis_scale(low, high, bins, log=False):
+    # 구간 번호 = floor((f(v) - start) / width), f는 로그 축이면 ln
+    # SQLite 소스도 같은 식으로 계산해 경계값이 같은 구간에 들어가도록 함
+    if log:
+        low = max(low, LOG_FLOOR)
+        high = max(high, low)
+        start, stop = np.log(low), np.log(high)
+    else:
+        start, stop = float(low), float(high)
+    width = (stop - start) / bins if stop > start else 1.0
+    return start, width, low, high
+
+
+def axis_edges(low, high, bins, log=False):
+    start, width, _, _ = axis_scale(low, high, bins, log)
+    edges = start + width * np.arange(bins + 1)
+    return np.exp(edges) if log else edges
+
+
+def bin_positions(values, low, high, bins, log=False):
+    # 범위 밖이거나 결측인 값은 -1
+    start, width, low, high = axis_scale(low, high, bins, log)
+    inside = (values >= low) & (values <= high)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scaled = np.log(values) if log else values
+        positions = np.floor((scaled - start) / width)
+    positions = np.minimum(np.where(inside, positions, -1), bins - 1)
+    return positions.astype(np.int64)
+
+
+def density_grid(df, x_range, y_range, bins=DENSITY_BINS, log_x=False, group=None):
+    # 벡터화된 구간 배정 후 (그룹, y, x) 결합 코드로 한 번에 bincount
+    x = df[DENSITY_X].to_numpy(dtype=np.float64)
+    y = df[DENSITY_Y].to_numpy(dtype=np.float64)
+    x_pos = bin_positions(x, *x_range, bins, log_x)
+    y_pos = bin_positions(y, *y_range, bins)
+    if group is None:
+        codes, groups = np.zeros(len(df), dtype=np.int64), ['전체']
+    else:
+        codes, groups = category_codes(df[group])
+    valid = (x_pos >= 0) & (y_pos >= 0) & (codes < len(groups))
+    cells = (codes[valid] * bins + y_pos[valid]) * bins + x_pos[valid]
+    counts = np.bincount(cells, minlength=len(groups) * bins * bins).reshape(len(groups), bins, bins)
+    return DensityGrid(axis_edges(*x_range, bins, log_x), axis_edges(*y_range, bins), counts, list(groups), log_x)
+
+
+def grid_from_cells(cells, x_range, y_range, bins, log_x, groups):
+    # (그룹 코드, y 구간, x 구간, 행 수) 집계 결과를 격자로 (SQL 소스용)
+    cells = np.asarray(cells, dtype=np.int64).reshape(-1, 4)
+    counts = np.zeros((len(groups), bins, bins), dtype=np.int64)
+    np.add.at(counts, (cells[:, 0], cells[:, 1], cells[:, 2]), cells[:, 3])
+    return DensityGrid(axis_edges(*x_range, bins, log_x), axis_edges(*y_range, bins), counts, list(groups), log_x)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# 고객 상세 조회 (서버에서 정렬/검색/페이지 분할 후 보이는 페이지만 전송)
+# extra는 원본과 같은 행 순서로 덧붙일 컬럼 (동료 집단 백분위/z-점수 등), 정렬 기준으로도 사용 가능
+SORT_COLUMNS = ['총평가금액', '안전자산비율']
+SEARCH_COLUMN = '고객번호'
+PAGE_ROWS = 50
+
+
+class DrillDownIndex:
+    # 정렬 컬럼별 오름차순/내림차순 순서를 한 번만 계산해 두고
+    # 조회 시에는 선택된 행만 그 순서에서 골라냄 (결측은 항상 마지막, 동순위는 정렬 방향의 행 순서)
+
+    def __init__(self, df, sort_columns=SORT_COLUMNS, search_column=SEARCH_COLUMN, extra=None):
+        self.rows = len(df)
+        self.search_column = search_column if search_column in df.columns else None
+        self.orders = {}
+        for col in sort_columns:
+            if col in df.columns:
+                values = df[col].to_numpy(dtype=np.float64)
+            elif extra is not None and col in extra.columns:
+                values = extra[col].to_numpy(dtype=np.float64)
+            else:
+                continue
+            order = np.argsort(values, kind='stable')
+            valid = int((~np.isnan(values)).sum())
+            self.orders[col] = (order, np.concatenate([order[:valid][::-1], order[valid:][::-1]]))
+
+    def _search(self, df, positions, search):
+        # 검색어가 들어간 고객번호만 남김 (후보 행만 문자열로 변환)
+        candidates = np.arange(self.rows) if positions is None else positions
+        keys = df[self.search_column].take(candidates).astype(str)
+        return candidates[keys.str.contains(search, regex=False).to_numpy()]
+
+    def page(self, df, positions=None, sort_by=SORT_COLUMNS[0], descending=True, search='',
+             page=0, page_rows=PAGE_ROWS, extra=None):
+        # (페이지 행, 전체 해당 행 수)
+        if search and self.search_column:
+            positions = self._search(df, positions, search)
+        order = self.orders[sort_by][1 if descending else 0]
+        if positions is not None:
+            mask = np.zeros(self.rows, dtype=bool)
+            mask[positions] = True
+            order = order[mask[order]]
+        start = page * page_rows
+        rows = order[start:start + page_rows]
+        if extra is None:
+            return df.take(rows), len(order)
+        return pd.concat([df.take(rows).reset_index(drop=True), extra.take(rows).reset_index(drop=True)],
+                         axis=1), len(order)
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# 차트 생성/직렬화 파이프라인
+# 탭 빌더는 집계 결과와 charts.py 빌더 함수만 담은 ChartSpec을 반환하고,
+# Plotly 객체 생성과 JSON 직렬화는 프로세스 풀에서 병렬로 실행 (GIL에 묶이는 작업이라 스레드 대신 프로세스)
+# DASHBOARD_FIGURE_WORKERS=0 또는 1이면 호출한 스레드에서 순서대로 실행
+FIGURE_WORKERS = int(os.environ.get('DASHBOARD_FIGURE_WORKERS', min(4, os.cpu_count() or 1)))
+
+ChartSpec = namedtuple('ChartSpec', ['builder', 'args', 'kwargs'])
+
+
+def chart(builder, *args, **kwargs):
+    # builder(*args, **kwargs)로 만들 차트 (builder는 모듈 최상위 함수, 인자는 pickle 가능한 집계 결과)
+    return ChartSpec(builder, args, kwargs)
+
+
+def render_chart(spec):
+    return spec.builder(*spec.args, **spec.kwargs).to_json()
+
+
+def _warm():
+    # 작업 프로세스에서 plotly를 import하고 템플릿/검증기를 한 번 읽어 둠
+    import pandas as pd
+
+    from charts import bar_chart
+
+    return bool(bar_chart(pd.Series([1], index=['-']), '', '', '', '%{y}').to_json())
+
+
+_pool = None
+_workers = FIGURE_WORKERS
+_warmup = []
+# 작업 프로세스를 띄울 수 없는 환경이면 이후로는 순차 실행
+_disabled = False
+_pool_lock = threading.Lock()
+
+
+def _figure_pool():
+    # 작업 프로세스가 모두 준비된 뒤에만 풀을 사용 (그 전에는 호출한 스레드에서 그림)
+    global _pool, _warmup, _disabled
+    if _workers < 2 or _disabled:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_workers, mp_context=multiprocessing.get_context('spawn'))
+            _warmup = [_pool.submit(_warm) for _ in range(_workers)]
+        if not all(future.done() for future in _warmup):
+            return None
+        if any(future.exception() is not None for future in _warmup):
+            _disabled = True
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        return _pool
+
+
+def start_pool(wait=False, workers=None):
+    # 작업 프로세스를 미리 띄움 (wait이면 준비될 때까지 기다림)
+    # workers는 풀을 처음 띄울 때만 적용 (배치 명령에서 CPU 수에 맞출 때)
+    global _workers
+    if workers is not None and _pool is None:
+        _workers = workers
+    _figure_pool()
+    if wait:
+        for future in list(_warmup):
+            future.exception()
+        _figure_pool()
+
+
+def _reset_pool(pool):
+    # 작업 중 프로세스가 죽은 풀은 버리고 다음 호출에서 새로 띄움
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_charts(rows, parallel=True):
+    # ChartSpec 행 목록 → 같은 모양의 JSON 행 목록 (결과는 항상 원래 순서)
+    specs = [spec for row in rows for spec in row]
+    pool = _figure_pool() if parallel and len(specs) > 1 else None
+    payloads = None
+    if pool is not None:
+        try:
+            payloads = list(pool.map(render_chart, specs))
+        except BrokenProcessPool:
+            _reset_pool(pool)
+    if payloads is None:
+        payloads = [render_chart(spec) for spec in specs]
+    result, start = [], 0
+    for row in rows:
+        result.append(payloads[start:start + len(row)])
+        start += len(row)
+    return result
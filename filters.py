@@ -0,0 +1,71 @@
+import hashlib
+
+import numpy as np
+
+from aggregation import DIMENSIONS, category_codes
+
+# 사이드바 필터용 인덱스
+# 범주마다 packbits로 압축한 비트맵, 총평가금액은 정렬 인덱스로 범위 조회
+RANGE_COLUMN = '총평가금액'
+
+
+class BitmapIndex:
+
+    def __init__(self, df, dims=DIMENSIONS, range_column=RANGE_COLUMN):
+        self.rows = len(df)
+        self.labels = {}
+        self.bitmaps = {}
+        for dim in dims:
+            if dim not in df.columns:
+                continue
+            codes, labels = category_codes(df[dim])
+            self.labels[dim] = labels
+            self.bitmaps[dim] = {
+                label: np.packbits(codes == code) for code, label in enumerate(labels)
+            }
+
+        # 결측값은 정렬 끝으로 가고 범위 조회에서 제외됨
+        values = df[range_column].to_numpy(dtype=np.float64)
+        self.range_column = range_column
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_values = values[self.order]
+        valid = self.sorted_values[~np.isnan(self.sorted_values)]
+        self.value_bounds = (float(valid[0]), float(valid[-1])) if len(valid) else (0.0, 0.0)
+
+    def category_bitmap(self, dim, selected):
+        # 선택한 범주들의 OR
+        bitmap = np.zeros((self.rows + 7) // 8, dtype=np.uint8)
+        for label in selected:
+            bitmap |= self.bitmaps[dim].get(label, 0)
+        return bitmap
+
+    def range_bitmap(self, low, high):
+        # 정렬 인덱스에서 이진 탐색으로 범위 행 위치를 찾음
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[self.order[start:stop]] = True
+        return np.packbits(mask)
+
+    def select(self, selections, value_range=None):
+        # 필터 조합을 비트 AND로 합쳐 선택된 행 위치 반환
+        bitmap = None
+        for dim, selected in selections.items():
+            if not selected:
+                continue
+            part = self.category_bitmap(dim, selected)
+            bitmap = part if bitmap is None else bitmap & part
+        if value_range is not None:
+            part = self.range_bitmap(*value_range)
+            bitmap = part if bitmap is None else bitmap & part
+        if bitmap is None:
+            return np.arange(self.rows)
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.rows))
+
+
+def filter_key(selections, value_range):
+    # 필터 조합의 짧은 식별자 (캐시 키에 사용)
+    items = [(dim, tuple(selected)) for dim, selected in sorted(selections.items()) if selected]
+    if not items and value_range is None:
+        return ''
+    return hashlib.blake2b(repr((items, value_range)).encode('utf-8'), digest_size=8).hexdigest()
@@ -0,0 +1,179 @@
+import datetime
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from aggregation import AggregateCube, HistogramSketch, compute_kpis
+from data_store import CACHE_DIR, DATA_PATH, file_hash
+from sections import SectionContext
+from streaming import stream_aggregates
+
+# 기준일별 집계 큐브 저장소 (월별 추출본을 원본 없이 비교)
+# HISTORY_DIR/<YYYY-MM-DD>/ 아래에 큐브와 박스플롯 스케치 배열, manifest를 저장
+HISTORY_DIR = os.environ.get('DASHBOARD_HISTORY_DIR', os.path.join(CACHE_DIR, 'history'))
+HISTORY_VERSION = 1
+# 현재 원본(DATA_PATH)의 기준일
+ANALYSIS_DATE = os.environ.get('DASHBOARD_ANALYSIS_DATE', '2024-09-30')
+# 전기 대비 증감을 표시할 KPI (비율은 %p)
+DELTA_KPIS = ['total_customers', 'avg_total_value', 'max_total_value', 'min_total_value',
+              'aggressive_investors_ratio']
+
+Period = namedtuple('Period', ['date', 'fingerprint', 'created_at', 'cube', 'sketches'])
+
+
+def parse_date(value):
+    # 'YYYY-MM-DD' 형식으로 정규화 (잘못된 날짜는 ValueError)
+    return datetime.date.fromisoformat(str(value)).isoformat()
+
+
+def display_date(date):
+    return date.replace('-', '/')
+
+
+def build_period(date, path=DATA_PATH):
+    # 추출본 하나를 청크 단위로 큐브와 스케치에 바로 집계
+    # 지난 추출본은 다시 열지 않으므로 원본 행 스냅샷을 캐시에 남기지 않음
+    aggregates = stream_aggregates(path)
+    return Period(parse_date(date), file_hash(path), time.strftime('%Y-%m-%dT%H:%M:%S'), aggregates.cube,
+                  aggregates.sketches)
+
+
+def period_dir(date, history_dir=HISTORY_DIR):
+    return os.path.join(history_dir, parse_date(date))
+
+
+def save_period(period, history_dir=HISTORY_DIR):
+    # 임시 디렉터리에 모두 쓴 뒤 교체 (같은 기준일은 덮어씀)
+    arrays = period.cube.to_arrays()
+    for index, sketch in enumerate(period.sketches.values()):
+        arrays.update(sketch.to_arrays(f'sketch{index}_'))
+    manifest = {
+        'version': HISTORY_VERSION,
+        'date': period.date,
+        'fingerprint': period.fingerprint,
+        'created_at': period.created_at,
+        'dims': period.cube.dims,
+        'labels': {dim: list(map(str, labels)) for dim, labels in period.cube.labels.items()},
+        'measures': list(period.cube.stats),
+        'sketches': [[dim, sketch.measure, list(map(str, sketch.labels))]
+                     for dim, sketch in period.sketches.items()],
+    }
+
+    target = period_dir(period.date, history_dir)
+    os.makedirs(history_dir, exist_ok=True)
+    tmp = f'{target}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.savez_compressed(os.path.join(tmp, 'arrays.npz'), **arrays)
+    # manifest는 마지막에 써서 완성 여부 표시로 사용
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    previous = f'{target}.{os.getpid()}.old'
+    if os.path.exists(target):
+        os.replace(target, previous)
+    os.replace(tmp, target)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == HISTORY_VERSION else None
+
+
+def list_periods(history_dir=HISTORY_DIR):
+    # 저장된 기준일 (오름차순, 쓰는 중인 임시 디렉터리는 제외)
+    try:
+        names = os.listdir(history_dir)
+    except OSError:
+        return []
+    dates = []
+    for name in names:
+        try:
+            date = parse_date(name)
+        except ValueError:
+            continue
+        if date == name and os.path.exists(os.path.join(history_dir, name, 'manifest.json')):
+            dates.append(date)
+    return sorted(dates)
+
+
+def history_stamp(history_dir=HISTORY_DIR):
+    # 캐시 키용 (기준일별 manifest 수정 시각)
+    stamps = []
+    for date in list_periods(history_dir):
+        try:
+            stamps.append((date, os.stat(os.path.join(history_dir, date, 'manifest.json')).st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(stamps)
+
+
+def load_period(date, history_dir=HISTORY_DIR):
+    # 저장된 기준일이 없거나 읽을 수 없으면 None
+    directory = period_dir(date, history_dir)
+    manifest = _read_manifest(directory)
+    if manifest is None:
+        return None
+    try:
+        with np.load(os.path.join(directory, 'arrays.npz')) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+    except (OSError, ValueError):
+        return None
+    cube = AggregateCube.from_arrays(manifest['dims'], manifest['labels'], manifest['measures'], arrays)
+    sketches = {dim: HistogramSketch.from_arrays(dim, measure, labels, arrays, f'sketch{index}_')
+                for index, (dim, measure, labels) in enumerate(manifest['sketches'])}
+    return Period(manifest['date'], manifest['fingerprint'], manifest['created_at'], cube, sketches)
+
+
+def period_context(period):
+    # 과거 기준일의 탭 렌더링 입력 (원본 행 없이 큐브와 스케치만)
+    return SectionContext(f'period-{period.date}:{period.fingerprint}', period.cube, sketches=period.sketches)
+
+
+def kpi_changes(current, previous):
+    # KPI별 (현재 값, 비교일 대비 증감)
+    now, before = compute_kpis(current), compute_kpis(previous)
+    return {name: (now[name], now[name] - before[name]) for name in DELTA_KPIS}
+
+
+def count_changes(current, previous, dim):
+    # 범주별 고객 수 증감 (셀별 차이 큐브를 dim으로 합산)
+    delta = current.subtract(previous)
+    rows, _ = delta.marginal((dim,))
+    labels = delta.labels[dim]
+    now = current.counts(dim).reindex(labels, fill_value=0)
+    before = previous.counts(dim).reindex(labels, fill_value=0)
+    table = pd.DataFrame({'현재': now.to_numpy(), '비교일': before.to_numpy(), '증감': rows[:len(labels)]},
+                         index=pd.Index(np.asarray(labels, dtype=object), name=dim))
+    return table[(table['현재'] > 0) | (table['비교일'] > 0)]
+
+
+def mean_changes(current, previous, dim, measure):
+    # 범주별 평균 증감 (두 기간 모두 값이 있는 범주만)
+    now, before = current.mean(dim, measure), previous.mean(dim, measure)
+    return (now - before).dropna().rename(measure)
+
+
+def share_changes(current, previous, row, col):
+    # row 범주 안에서 col 구성비의 변화 (%p, 한쪽 기간에만 있는 칸은 0%로 봄)
+    def shares(cube):
+        table = cube.crosstab(row, col)
+        return table.div(table.sum(axis=1), axis=0) * 100
+
+    now, before = shares(current), shares(previous)
+    index = now.index.union(before.index, sort=False)
+    columns = now.columns.union(before.columns, sort=False)
+    now = now.reindex(index=index, columns=columns, fill_value=0)
+    before = before.reindex(index=index, columns=columns, fill_value=0)
+    return now - before
@@ -0,0 +1,170 @@
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from aggregation import AggregateCube, compute_kpis
+from data_store import CACHE_DIR, DATA_PATH, file_hash, file_signature
+from sections import CORRELATION_GROUPS, TAB_SECTIONS, SectionContext, render_section, source_context
+from sources import CsvSource
+from streaming import BOX_DIMENSIONS, BOX_MEASURE
+
+# 대시보드 시작에 필요한 결과를 미리 계산해 두는 오프라인 스냅샷
+# (KPI, 집계 큐브, 박스플롯 통계, 상관관계, 선택적으로 탭 차트 JSON)
+SNAPSHOT_DIR = os.environ.get('DASHBOARD_SNAPSHOT_DIR', os.path.join(CACHE_DIR, 'snapshot'))
+# 2: 스키마 검증을 거친 행으로 계산, 3: 상관관계에서 식별자 컬럼 제외, 4: 범주를 데이터에서 가져옴
+SNAPSHOT_VERSION = 4
+BOX_COLUMNS = ['count', 'q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean']
+
+Snapshot = namedtuple('Snapshot', ['fingerprint', 'source', 'created_at', 'kpis',
+                                   'cube', 'box_stats', 'correlations', 'figures'])
+
+
+def _json_value(value):
+    # numpy 스칼라를 JSON으로 저장 가능한 값으로
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _box_arrays(index, stats):
+    # 그룹별 이상치 배열은 이어 붙이고 시작 위치만 저장
+    arrays = {f'box{index}_{col}': stats[col].to_numpy(dtype=np.float64) for col in BOX_COLUMNS}
+    lengths = [len(values) for values in stats['outliers']]
+    arrays[f'box{index}_offsets'] = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    arrays[f'box{index}_outliers'] = (np.concatenate([np.asarray(v, dtype=np.float64) for v in stats['outliers']])
+                                      if lengths else np.zeros(0))
+    return arrays
+
+
+def _box_frame(index, labels, arrays):
+    stats = pd.DataFrame({col: arrays[f'box{index}_{col}'] for col in BOX_COLUMNS},
+                         index=pd.Index(labels, dtype=object))
+    stats['count'] = stats['count'].astype(np.int64)
+    offsets, outliers = arrays[f'box{index}_offsets'], arrays[f'box{index}_outliers']
+    stats['outliers'] = [outliers[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    return stats
+
+
+def build_snapshot(path=DATA_PATH, cache_dir=CACHE_DIR, figures=False):
+    # 스트리밍 대상 파일은 청크 집계만 사용 (상관관계와 원본이 필요한 탭은 제외)
+    ctx = source_context(CsvSource(path, cache_dir))
+    box = {dim: ctx.box_stats(dim, BOX_MEASURE) for dim in BOX_DIMENSIONS if dim in ctx.cube.dims}
+    correlations = {group: ctx.correlations(group) for group in CORRELATION_GROUPS} if ctx.has_rows else {}
+    payloads = {}
+    if figures:
+        payloads = {key: render_section(ctx, key) for key, section in TAB_SECTIONS.items()
+                    if not section.requires_rows}
+    return Snapshot(
+        fingerprint=ctx.fingerprint,
+        source=dict(file_signature(path), path=os.path.abspath(path), hash=file_hash(path)),
+        created_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        kpis={name: _json_value(value) for name, value in compute_kpis(ctx.cube).items()},
+        cube=ctx.cube,
+        box_stats=box,
+        correlations=correlations,
+        figures=payloads,
+    )
+
+
+def save_snapshot(snapshot, snapshot_dir=SNAPSHOT_DIR):
+    # 임시 디렉터리에 모두 쓴 뒤 교체 (읽는 쪽이 반쯤 쓰인 스냅샷을 보지 않도록)
+    arrays = snapshot.cube.to_arrays()
+    for index, stats in enumerate(snapshot.box_stats.values()):
+        arrays.update(_box_arrays(index, stats))
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'fingerprint': snapshot.fingerprint,
+        'source': snapshot.source,
+        'created_at': snapshot.created_at,
+        'kpis': snapshot.kpis,
+        'dims': snapshot.cube.dims,
+        'labels': {dim: list(map(str, labels)) for dim, labels in snapshot.cube.labels.items()},
+        'measures': list(snapshot.cube.stats),
+        'box_stats': [[dim, list(map(str, stats.index))] for dim, stats in snapshot.box_stats.items()],
+        'correlations': [[group, table.to_dict('list')] for group, table in snapshot.correlations.items()],
+    }
+
+    parent = os.path.dirname(os.path.abspath(snapshot_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp = f'{os.path.abspath(snapshot_dir)}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.savez_compressed(os.path.join(tmp, 'arrays.npz'), **arrays)
+    with open(os.path.join(tmp, 'figures.json'), 'w', encoding='utf-8') as f:
+        json.dump(snapshot.figures, f, ensure_ascii=False)
+    # manifest는 마지막에 써서 완성 여부 표시로 사용
+    with open(os.path.join(tmp, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    previous = f'{os.path.abspath(snapshot_dir)}.{os.getpid()}.old'
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, previous)
+    os.replace(tmp, snapshot_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == SNAPSHOT_VERSION else None
+
+
+def is_fresh(manifest, path=DATA_PATH):
+    # 원본이 없는 배포 환경에서는 스냅샷만으로 동작
+    if manifest is None:
+        return False
+    if not os.path.exists(path):
+        return True
+    source = manifest['source']
+    signature = file_signature(path)
+    if source['size'] != signature['size']:
+        return False
+    return source['mtime_ns'] == signature['mtime_ns'] or source['hash'] == file_hash(path)
+
+
+def snapshot_stamp(snapshot_dir=SNAPSHOT_DIR, path=DATA_PATH):
+    # 캐시 키용 (manifest와 원본의 수정 시각, 둘 중 하나라도 바뀌면 다시 확인)
+    try:
+        stamp = os.stat(os.path.join(snapshot_dir, 'manifest.json')).st_mtime_ns
+    except OSError:
+        return None
+    if os.path.exists(path):
+        signature = file_signature(path)
+        return stamp, signature['size'], signature['mtime_ns']
+    return stamp, None, None
+
+
+def load_snapshot(snapshot_dir=SNAPSHOT_DIR, path=DATA_PATH):
+    # 최신 스냅샷이 없으면 None (호출하는 쪽에서 실시간 계산으로 대체)
+    manifest = read_manifest(snapshot_dir)
+    if not is_fresh(manifest, path):
+        return None
+    try:
+        with np.load(os.path.join(snapshot_dir, 'arrays.npz')) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+        with open(os.path.join(snapshot_dir, 'figures.json'), encoding='utf-8') as f:
+            figures = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    cube = AggregateCube.from_arrays(manifest['dims'], manifest['labels'], manifest['measures'], arrays)
+    box = {dim: _box_frame(index, labels, arrays)
+           for index, (dim, labels) in enumerate(manifest['box_stats'])}
+    correlations = {group: pd.DataFrame(table) for group, table in manifest['correlations']}
+    return Snapshot(manifest['fingerprint'], manifest['source'], manifest['created_at'],
+                    manifest['kpis'], cube, box, correlations, figures)
+
+
+def snapshot_context(snapshot, data_loader=None):
+    # 스냅샷 결과를 미리 채운 탭 렌더링 입력
+    ctx = SectionContext(snapshot.fingerprint, snapshot.cube, data_loader=data_loader)
+    ctx.preload({(dim, BOX_MEASURE): stats for dim, stats in snapshot.box_stats.items()},
+                snapshot.correlations)
+    return ctx
@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from data_store import CACHE_DIR
+
+# 섹션/차트별 실행 시간 계측 (쿼리 파라미터 ?profile=1 또는 DASHBOARD_PROFILE=1일 때만)
+PROFILE_ENV = 'DASHBOARD_PROFILE'
+PROFILE_LOG = os.environ.get('DASHBOARD_PROFILE_LOG', os.path.join(CACHE_DIR, 'profile.jsonl'))
+# 서버 시작 시각 (time.time(), python -m cli serve가 설정)
+BOOT_ENV = 'DASHBOARD_BOOT_TIME'
+# 섹션별 최대 메모리 계측 (tracemalloc)은 환경 변수로만 켬
+# 한 번 켜면 프로세스의 모든 세션이 할당 추적 비용을 내고(같은 작업 기준 약 3배 느려짐),
+# 최대값 초기화도 프로세스 전역이라 동시에 계측하는 세션끼리 값이 섞이므로 측정 전용 서버에서만 사용
+MEMORY_ENV = 'DASHBOARD_PROFILE_MEMORY'
+
+_log_lock = threading.Lock()
+# 프로세스의 첫 화면을 이미 기록했는지 (콜드 스타트는 한 번만)
+_first_paint_done = False
+
+
+def profiling_enabled(query_value=None):
+    if os.environ.get(PROFILE_ENV) == '1':
+        return True
+    return str(query_value).lower() in ('1', 'true', 'yes')
+
+
+def memory_profiling_enabled():
+    return os.environ.get(MEMORY_ENV) == '1'
+
+
+class Profiler:
+    # 한 번의 스크립트 실행(rerun) 동안의 계측 결과
+    # 중첩 섹션의 최대 메모리는 자식 섹션의 최대값까지 포함 (메모리 계측을 켠 경우만, 아니면 None)
+
+    def __init__(self, enabled=False, log_path=PROFILE_LOG, started=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex[:12]
+        # 실행 시작 시각 (perf_counter, 스크립트 맨 위에서 잰 값을 넘기면 import 시간까지 포함)
+        self.started = time.perf_counter() if started is None else started
+        self.records = []
+        self._stack = []
+        self._started = 0
+        self.track_memory = enabled and memory_profiling_enabled()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def section(self, name, payload_bytes=None):
+        if not self.enabled:
+            yield
+            return
+        frame = {'child_peak': 0, 'order': self._started}
+        self._started += 1
+        self._stack.append(frame)
+        current = 0
+        if self.track_memory:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            self._stack.pop()
+            peak_mem = None
+            if self.track_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, frame['child_peak'])
+                if self._stack:
+                    self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+                tracemalloc.reset_peak()
+                peak_mem = max(peak - current, 0)
+            self.records.append({
+                'order': frame['order'],
+                'section': name,
+                'depth': len(self._stack),
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'peak_mem_bytes': peak_mem,
+                'payload_bytes': payload_bytes,
+            })
+
+    def mark(self, name, wall=None):
+        # 구간이 아닌 이정표: 실행 시작부터 지금까지 걸린 시간
+        if not self.enabled:
+            return
+        self.records.append({
+            'order': self._started,
+            'section': name,
+            'depth': len(self._stack),
+            'wall_s': time.perf_counter() - self.started if wall is None else wall,
+            'cpu_s': None,
+            'peak_mem_bytes': None,
+            'payload_bytes': None,
+        })
+        self._started += 1
+
+    def first_paint(self):
+        # 첫 화면(KPI와 선택한 탭 차트)까지의 시간
+        # 프로세스의 첫 실행이면 서버 시작부터의 시간(콜드 스타트)도 함께 기록
+        global _first_paint_done
+        cold = not _first_paint_done
+        _first_paint_done = True
+        if not self.enabled:
+            return
+        self.mark('첫 화면 (콜드 스타트)' if cold else '첫 화면')
+        boot = os.environ.get(BOOT_ENV)
+        if cold and boot:
+            self.mark('첫 화면 (서버 시작부터)', time.time() - float(boot))
+
+    def frame(self):
+        # 시작 순서대로 정렬한 결과 표 (중첩 섹션은 들여쓰기)
+        records = pd.DataFrame(self.records)
+        if records.empty:
+            return records
+        records = records.sort_values('order')
+        records['section'] = ['  ' * depth + name for depth, name in zip(records['depth'], records['section'])]
+        return records.drop(columns=['order', 'depth']).reset_index(drop=True)
+
+    def flush(self):
+        # 분석용 JSONL 로그에 이번 실행 결과를 한 줄씩 추가
+        if not self.enabled or not self.records:
+            return
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+        lines = ''.join(
+            json.dumps(dict(record, run_id=self.run_id, timestamp=timestamp), ensure_ascii=False) + '\n'
+            for record in self.records
+        )
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+            with _log_lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError:
+            pass
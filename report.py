@@ -0,0 +1,159 @@
+import html
+import os
+import re
+import time
+from collections import namedtuple
+
+from aggregation import compute_kpis
+from figures import render_charts
+from filters import filter_key
+from history import ANALYSIS_DATE, display_date
+from scoring import PEER_DIMENSIONS, SCORE_COLUMN, SCORE_COLUMNS, TOP_OUTLIERS
+from sections import TAB_SECTIONS, SectionContext
+
+# 지점 배포용 정적 HTML 리포트 (python -m cli report)
+# 원본은 한 번만 읽고 전체 큐브도 한 번만 집계한 뒤, 범주별 큐브는 그 큐브에서 칸 선택으로 만듦
+# 탭 빌더가 만든 모든 리포트의 ChartSpec을 한 번에 figures.render_charts로 넘겨 작업 프로세스에 나눠 그림
+# (작업 프로세스는 집계 결과만 받으므로 원본 행을 복사하지 않음)
+# 리포트는 plotly.js를 파일 안에 넣어 인터넷 없이 열림
+REPORT_DIMENSIONS = ['지역명', '투자성향']
+REPORT_DIR = os.environ.get('DASHBOARD_REPORT_DIR', 'reports')
+
+# sections: [(탭 제목, ChartSpec 행 목록)], outliers: 이상치 상위 고객 (점수가 없으면 None)
+ReportPlan = namedtuple('ReportPlan', ['dim', 'label', 'kpis', 'sections', 'outliers'])
+
+KPI_CARDS = [
+    ('👥', '총 고객 수', 'total_customers', '{:,}'),
+    ('💰', '평균 총평가금액', 'avg_total_value', '₩{:,.0f}'),
+    ('📈', '최대 총평가금액', 'max_total_value', '₩{:,.0f}'),
+    ('📉', '최소 총평가금액', 'min_total_value', '₩{:,.0f}'),
+    ('📊', '최다 투자성향', 'max_investor_type', '{}'),
+    ('🧓', '최다 연령대', 'max_age_group', '{}'),
+    ('📍', '최다 거주지역', 'max_region', '{}'),
+]
+
+STYLE = """
+body { font-family: 'Malgun Gothic', sans-serif; margin: 2rem; color: #2c3e50; }
+.kpi-container { display: flex; flex-wrap: wrap; margin: 1rem 0; }
+.kpi-card { border-radius: 10px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1); padding: 20px; margin: 10px;
+            flex: 1; min-width: 200px; text-align: center; }
+.kpi-title { font-size: 18px; color: #333; margin-bottom: 10px; }
+.kpi-value { font-size: 28px; font-weight: bold; }
+.kpi-icon { font-size: 24px; margin-bottom: 10px; }
+.chart-row { display: flex; }
+.chart-row > div { flex: 1; min-width: 0; }
+table.outliers { border-collapse: collapse; font-size: 14px; }
+table.outliers th, table.outliers td { border: 1px solid #ddd; padding: 6px 10px; text-align: right; }
+table.outliers th { background-color: #f0f2f6; }
+"""
+
+
+def report_labels(cube, dim):
+    # 고객이 있는 범주 (범주 사전 순서)
+    counts = cube.counts(dim)
+    return [label for label in cube.labels[dim] if counts.get(label, 0) > 0]
+
+
+def group_context(source, cube, fingerprint, selections):
+    # 한 범주로 제한한 탭 입력 (큐브는 칸 선택, 박스플롯은 원본 행 또는 소스의 스케치)
+    key = filter_key(selections, None)
+    if source.has_rows:
+        return SectionContext(f'{fingerprint}:{key}', cube.select(selections), source.rows(selections))
+    return SectionContext(f'{fingerprint}:{key}', cube.select(selections),
+                          sketches=source.sketches(selections=selections))
+
+
+def plan_report(source, cube, fingerprint, dim, label):
+    selections = {dim: (label,)}
+    ctx = group_context(source, cube, fingerprint, selections)
+    # 원본 행 전체가 필요한 탭(세분화)은 리포트에서 제외
+    sections = [(section.title, section.builder(ctx, **section.params))
+                for section in TAB_SECTIONS.values() if not section.requires_rows]
+    outliers = None
+    if source.has_scores:
+        outliers, _ = source.page(selections, sort_by=SCORE_COLUMN, page_rows=TOP_OUTLIERS, outliers_only=True)
+    return ReportPlan(dim, label, compute_kpis(ctx.cube), sections, outliers)
+
+
+def report_filename(dim, label):
+    # '1:안정형' 같은 레이블도 파일 이름으로 쓸 수 있게 기호를 '_'로
+    return f"{dim}-{re.sub(r'[^0-9A-Za-z가-힣]+', '_', str(label)).strip('_')}.html"
+
+
+def _chart_html(payload, chart_id):
+    # 직렬화된 Figure JSON을 그대로 Plotly.newPlot에 넘김 (</script> 조기 종료 방지)
+    spec = payload.replace('</', '<\\/')
+    return (f'<div id="{chart_id}"></div>'
+            f'<script>(function () {{ var fig = {spec}; '
+            f'Plotly.newPlot("{chart_id}", fig.data, fig.layout, {{responsive: true}}); }})();</script>')
+
+
+def _kpi_html(kpis):
+    cards = ''.join(
+        f'<div class="kpi-card"><div class="kpi-icon">{icon}</div><div class="kpi-title">{title}</div>'
+        f'<div class="kpi-value">{html.escape(fmt.format(kpis[name]))}</div></div>'
+        for icon, title, name, fmt in KPI_CARDS
+    )
+    return f'<div class="kpi-container">{cards}</div>'
+
+
+def _outlier_html(outliers):
+    formatters = {col: ('{:.1f}' if col.endswith('백분위') else '{:.2f}').format for col in SCORE_COLUMNS}
+    table = outliers.drop(columns=['이상치'], errors='ignore').to_html(
+        index=False, classes='outliers', border=0, na_rep='-', formatters=formatters)
+    return (f"<h2>동료 집단({' × '.join(PEER_DIMENSIONS)}) 대비 이상치 상위 {TOP_OUTLIERS}명</h2>"
+            + (table if len(outliers) else '<p>이상치가 없습니다.</p>'))
+
+
+def report_html(plan, payload_sections, plotlyjs):
+    title = f'{plan.dim} {plan.label} 고객 리포트'
+    parts = [f'<h1>{html.escape(title)}</h1>',
+             f'<p>분석일자 : {display_date(ANALYSIS_DATE)} · 생성 {time.strftime("%Y-%m-%d %H:%M")}</p>',
+             _kpi_html(plan.kpis)]
+    for s, ((section_title, _), rows) in enumerate(zip(plan.sections, payload_sections)):
+        parts.append(f'<h2>{html.escape(section_title)}</h2>')
+        for r, row in enumerate(rows):
+            charts = ''.join(f'<div>{_chart_html(payload, f"chart-{s}-{r}-{c}")}</div>'
+                             for c, payload in enumerate(row))
+            parts.append(f'<div class="chart-row">{charts}</div>')
+    if plan.outliers is not None:
+        parts.append(_outlier_html(plan.outliers))
+    return (f'<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{STYLE}</style><script>{plotlyjs}</script></head>'
+            f'<body>{"".join(parts)}</body></html>')
+
+
+def _index_html(dim, written):
+    links = ''.join(f'<li><a href="{html.escape(name)}">{html.escape(str(label))}</a> ({rows:,}명)</li>'
+                    for label, name, rows in written)
+    return (f'<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>{dim}별 고객 리포트</title>'
+            f'<style>{STYLE}</style></head><body><h1>{dim}별 고객 리포트</h1><ul>{links}</ul></body></html>')
+
+
+def export_reports(source, dim, out_dir=REPORT_DIR, labels=None):
+    # 범주별 리포트를 쓰고 [(레이블, 파일 경로, 고객 수)] 반환 (index.html에 목록)
+    from plotly.offline import get_plotlyjs
+
+    cube, fingerprint = source.cube(), source.fingerprint()
+    if dim not in cube.dims:
+        raise ValueError(f'리포트를 나눌 수 없는 차원: {dim}')
+    available = report_labels(cube, dim)
+    labels = available if labels is None else [label for label in labels if label in available]
+    plans = [plan_report(source, cube, fingerprint, dim, label) for label in labels]
+
+    # 모든 리포트의 차트를 한 번에 그려 작업 프로세스가 리포트 경계 없이 나눠 맡음
+    rows = [row for plan in plans for _, section_rows in plan.sections for row in section_rows]
+    payloads = iter(render_charts(rows))
+
+    os.makedirs(out_dir, exist_ok=True)
+    plotlyjs = get_plotlyjs()
+    written = []
+    for plan in plans:
+        payload_sections = [[next(payloads) for _ in section_rows] for _, section_rows in plan.sections]
+        name = report_filename(dim, plan.label)
+        with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
+            f.write(report_html(plan, payload_sections, plotlyjs))
+        written.append((plan.label, name, plan.kpis['total_customers']))
+    with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(_index_html(dim, written))
+    return [(label, os.path.join(out_dir, name), count) for label, name, count in written]
@@ -0,0 +1,194 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# 원본 컬럼 스키마와 로드 단계의 검증/정규화 (로드할 때 한 번, 컬럼 단위 벡터 연산)
+# 정규화 후 범주 컬럼은 정규 레이블의 category, 수치 컬럼은 숫자 dtype이라
+# 집계/차트 코드는 문자열 파싱이나 errors='coerce' 변환 없이 그대로 사용
+# 빈 값은 결측으로 남기고, 값이 있는데 해석할 수 없거나 범위를 벗어난 행은 격리
+# 범주는 데이터에 있는 값을 그대로 쓰고, 정해진 코드표가 있는 컬럼에서 표에 없는 값은 경고로만 집계
+
+# 투자성향 코드표 (KPI가 '5:공격투자형'을 기준으로 계산)
+INVESTOR_TYPES = ['1:안정형', '2:안정추구형', '3:위험중립형', '4:적극투자형', '5:공격투자형']
+
+# 같은 범주로 보는 다른 표기 (비교할 때는 공백을 모두 지움)
+# 투자성향은 '5', '공격투자형'처럼 번호나 이름만 와도 인정
+INVESTOR_ALIASES = {alias: label for label in INVESTOR_TYPES for alias in label.split(':')}
+REGION_ALIASES = {
+    '서울특별시': '서울', '서울시': '서울', '부산광역시': '부산', '대구광역시': '대구', '인천광역시': '인천',
+    '광주광역시': '광주', '대전광역시': '대전', '울산광역시': '울산', '세종특별자치시': '세종', '세종시': '세종',
+    '경기도': '경기', '강원도': '강원', '강원특별자치도': '강원', '충청북도': '충북', '충청남도': '충남',
+    '전라북도': '전북', '전북특별자치도': '전북', '전라남도': '전남', '경상북도': '경북', '경상남도': '경남',
+    '제주도': '제주', '제주특별자치도': '제주',
+}
+
+# kind: identifier(정수 식별자, 분석 대상 아님), integer(정수), category(범주, labels는 코드표이며 없으면 None),
+#       currency(통화 기호/쉼표/'원' 허용), percent('%' 허용)
+Column = namedtuple('Column', ['name', 'kind', 'labels', 'aliases', 'low', 'high'])
+
+SCHEMA = {
+    column.name: column for column in [
+        Column('고객번호', 'identifier', None, None, 1, None),
+        Column('투자성향', 'category', INVESTOR_TYPES, INVESTOR_ALIASES, None, None),
+        Column('연령대', 'category', None, {}, None, None),
+        Column('지역명', 'category', None, REGION_ALIASES, None, None),
+        Column('자산규모', 'category', None, {}, None, None),
+        Column('총평가금액', 'currency', None, None, 0, None),
+        Column('안전자산비율', 'percent', None, None, 0, 100),
+    ]
+}
+CATEGORY_COLUMNS = [name for name, column in SCHEMA.items() if column.kind == 'category']
+# 정수만 허용하는 kind (나머지 수치 kind는 실수 측정값)
+INTEGRAL_KINDS = ('identifier', 'integer')
+IDENTIFIER_COLUMNS = [name for name, column in SCHEMA.items() if column.kind == 'identifier']
+
+# 수치 문자열에서 지울 문자
+STRIP_PATTERNS = {
+    'identifier': r'[\s,]',
+    'integer': r'[\s,]',
+    'currency': r'[\s,₩원]|^\\',
+    'percent': r'[\s%]',
+}
+
+FORMAT_ERROR = '형식 오류'
+RANGE_ERROR = '범위 벗어남'
+UNKNOWN_LABEL = '코드표에 없는 범주'
+# 행을 격리하지 않고 건수만 보고하는 사유
+WARNING_REASONS = {UNKNOWN_LABEL}
+REASON_COLUMN = '격리 사유'
+
+# data: 정규화된 행, quarantined: 격리된 원본 행(+ 사유), counts: {(컬럼, 사유): 행 수} (경고 포함)
+Validated = namedtuple('Validated', ['data', 'quarantined', 'counts'])
+
+
+def _key(value):
+    return re.sub(r'\s+', '', str(value))
+
+
+def _lookup(column):
+    lookup = {_key(label): label for label in column.labels or []}
+    lookup.update((_key(alias), label) for alias, label in column.aliases.items())
+    return lookup
+
+
+def _category(series, column):
+    # 고유값(범주)만 파이썬에서 레이블로 바꾸고 행은 코드 배열로 한 번에 변환
+    # 별칭은 정규 레이블로, 나머지는 앞뒤 공백을 지운 값 그대로 (공백만 다른 표기는 처음 나온 표기로 합침)
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    lookup = _lookup(column)
+    keys = [_key(value) for value in series.cat.categories]
+    spelling = {}
+    canonical = [None if key == '' else lookup.get(key) or spelling.setdefault(key, str(value).strip())
+                 for key, value in zip(keys, series.cat.categories)]
+    labels = sorted({label for label in canonical if label is not None})
+    position = {label: i for i, label in enumerate(labels)}
+    # 빈 문자열은 결측(-1)
+    remap = np.array([position[label] if label is not None else -1 for label in canonical] + [-1],
+                     dtype=np.int64)
+    raw_codes = series.cat.codes.to_numpy()
+    values = pd.Categorical.from_codes(remap[raw_codes], categories=labels)
+    if column.labels is None:
+        return pd.Series(values, index=series.index, name=series.name), {}
+    # 코드표가 있는 컬럼은 표에 없는 값을 경고로 집계 (행은 그대로 둠)
+    unlisted = np.array([key != '' and key not in lookup for key in keys] + [False])
+    return pd.Series(values, index=series.index, name=series.name), {UNKNOWN_LABEL: unlisted[raw_codes]}
+
+
+def _numeric(series, column):
+    # 문자열이면 허용 기호를 지운 뒤 한 번에 숫자로 변환 (이 단계에서만 coerce)
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        values = series
+        malformed = np.zeros(len(series), dtype=bool)
+    else:
+        text = series.astype(object).where(series.isna(), series.astype(str))
+        cleaned = text.str.replace(STRIP_PATTERNS[column.kind], '', regex=True)
+        values = pd.to_numeric(cleaned.replace('', np.nan), errors='coerce')
+        malformed = (values.isna() & cleaned.notna() & (cleaned != '')).to_numpy()
+    numbers = values.to_numpy(dtype=np.float64)
+    if column.kind in INTEGRAL_KINDS:
+        with np.errstate(invalid='ignore'):
+            malformed |= ~np.isnan(numbers) & (numbers != np.floor(numbers))
+    outside = np.zeros(len(series), dtype=bool)
+    with np.errstate(invalid='ignore'):
+        if column.low is not None:
+            outside |= numbers < column.low
+        if column.high is not None:
+            outside |= numbers > column.high
+    return values, {FORMAT_ERROR: malformed, RANGE_ERROR: outside & ~malformed}
+
+
+def validate(df, schema=SCHEMA):
+    # 스키마에 있는 컬럼만 검사 (없는 컬럼은 건너뛰고, 스키마 밖의 컬럼은 그대로 둠)
+    columns, problems = {}, {}
+    bad = np.zeros(len(df), dtype=bool)
+    for name in df.columns:
+        column = schema.get(name)
+        if column is None:
+            columns[name] = df[name]
+            continue
+        parse = _category if column.kind == 'category' else _numeric
+        columns[name], masks = parse(df[name], column)
+        for reason, mask in masks.items():
+            if mask.any():
+                problems[(name, reason)] = mask
+                if reason not in WARNING_REASONS:
+                    bad |= mask
+
+    normalized = pd.DataFrame(columns, index=df.index)
+    if bad.any():
+        normalized = normalized[~bad]
+    normalized = normalized.reset_index(drop=True)
+    for name in normalized.columns:
+        if name not in schema:
+            continue
+        series = normalized[name]
+        if schema[name].kind == 'category':
+            normalized[name] = series.cat.remove_unused_categories()
+        elif schema[name].kind in INTEGRAL_KINDS:
+            # 격리된 행 때문에 실수로 읽힌 정수 컬럼은 정상 파일을 읽은 것과 같은 정수 타입으로
+            # (정수가 아닌 값은 이미 격리됨, 결측이 있으면 실수로 둠)
+            if pd.api.types.is_float_dtype(series.dtype) and not series.isna().any():
+                normalized[name] = series.astype(np.int64)
+        else:
+            # 금액/비율 측정값은 값이 모두 정수여도 항상 float64 (청크나 파일마다 dtype이 달라지지 않게)
+            normalized[name] = series.astype(np.float64)
+
+    quarantined = df[bad].reset_index(drop=True)
+    if len(quarantined):
+        # 한 행의 여러 사유는 '컬럼: 사유'를 '; '로 이어 붙임
+        reasons = pd.Series('', index=quarantined.index)
+        for (name, reason), mask in problems.items():
+            if reason in WARNING_REASONS:
+                continue
+            hit = mask[bad]
+            reasons = reasons.where(~hit, reasons + np.where(reasons == '', '', '; ') + f'{name}: {reason}')
+        quarantined[REASON_COLUMN] = reasons
+    counts = {key: int(mask.sum()) for key, mask in problems.items()}
+    return Validated(normalized, quarantined, counts)
+
+
+def merge_counts(*counts):
+    merged = {}
+    for part in counts:
+        for key, count in part.items():
+            merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+def counts_to_json(counts):
+    return [[name, reason, count] for (name, reason), count in counts.items()]
+
+
+def counts_from_json(items):
+    return {(name, reason): count for name, reason, count in items or []}
+
+
+def quarantine_report(counts):
+    # 컬럼/사유별 행 수와 조치(격리/경고) (한 행이 여러 사유에 걸리면 각각 집계)
+    report = pd.DataFrame([(name, reason, '경고' if reason in WARNING_REASONS else '격리', count)
+                           for (name, reason), count in counts.items()],
+                          columns=['컬럼', '사유', '조치', '행 수'])
+    return report.sort_values('행 수', ascending=False, kind='stable').reset_index(drop=True)
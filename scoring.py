@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import category_codes
+
+# 고객별 동료 집단(연령대 × 투자성향) 내 백분위와 강건 z-점수 (중앙값/MAD)
+# 측정값마다 (집단 코드, 값)으로 한 번 정렬하고, 집단 경계와 동순위 구간은 정렬된 배열에서 벡터로 계산
+# 결측값이나 집단이 결측인 행은 점수도 결측
+PEER_DIMENSIONS = ['연령대', '투자성향']
+SCORE_MEASURES = ['총평가금액', '안전자산비율']
+# 오른쪽 꼬리가 긴 금액은 원 단위로 z를 구하면 상위 고객 상당수가 이상치가 되므로 log(1 + 값) 척도에서 계산
+# (백분위는 순서가 같아 변하지 않음)
+LOG_MEASURES = ['총평가금액']
+# 점수 정의 버전 (바뀌면 저장해 둔 점수를 다시 계산), 2: 금액을 로그 척도로
+SCORE_VERSION = 2
+# 정규분포에서 MAD ≈ 0.6745σ (Iglewicz–Hoaglin 수정 z-점수)
+MAD_SCALE = 0.6745
+OUTLIER_Z = 3.5
+# 동료 수가 이보다 적은 집단은 z-점수를 계산하지 않음
+MIN_PEERS = 10
+TOP_OUTLIERS = 20
+
+SCORE_COLUMN = '이상치 점수'
+OUTLIER_COLUMN = '이상치'
+
+
+def percentile_column(measure):
+    return f'{measure} 백분위'
+
+
+def z_column(measure):
+    return f'{measure} z'
+
+
+# 상세 조회에 붙는 점수 컬럼 (정렬 기준으로도 사용)
+SCORE_COLUMNS = ([column for measure in SCORE_MEASURES for column in (percentile_column(measure), z_column(measure))]
+                 + [SCORE_COLUMN])
+
+
+def peer_codes(df, dims=PEER_DIMENSIONS):
+    # 차원 조합 코드 (어느 차원이든 결측이면 -1)
+    codes = np.zeros(len(df), dtype=np.int64)
+    missing = np.zeros(len(df), dtype=bool)
+    for dim in dims:
+        dim_codes, labels = category_codes(df[dim])
+        missing |= dim_codes == len(labels)
+        codes = codes * (len(labels) + 1) + dim_codes
+    codes[missing] = -1
+    return codes
+
+
+def _group_median(sorted_values, starts, sizes):
+    return (sorted_values[starts + (sizes - 1) // 2] + sorted_values[starts + sizes // 2]) / 2
+
+
+def group_scores(codes, values, min_peers=MIN_PEERS):
+    # (백분위, 강건 z) 배열, 백분위는 평균 순위 / 집단 크기 × 100 (pandas rank(pct=True)와 같은 정의)
+    percentile = np.full(len(values), np.nan)
+    z = np.full(len(values), np.nan)
+    rows = np.flatnonzero((codes >= 0) & ~np.isnan(values))
+    if not len(rows):
+        return percentile, z
+    order = rows[np.lexsort((values[rows], codes[rows]))]
+    group, value = codes[order], values[order]
+
+    boundary = np.r_[True, group[1:] != group[:-1]]
+    starts = np.flatnonzero(boundary)
+    sizes = np.diff(np.r_[starts, len(order)])
+    group_id = np.cumsum(boundary) - 1
+
+    # 같은 집단에서 값이 같은 행은 구간의 첫/마지막 위치 평균을 순위로
+    run = boundary | np.r_[True, value[1:] != value[:-1]]
+    run_first = np.flatnonzero(run)
+    run_last = np.r_[run_first[1:], len(order)] - 1
+    run_id = np.cumsum(run) - 1
+    rank = (run_first + run_last)[run_id] / 2 - starts[group_id] + 1
+    percentile[order] = rank / sizes[group_id] * 100
+
+    # 중앙값은 정렬된 값에서 바로, MAD는 편차를 집단 안에서 다시 정렬해 구함 (집단 경계는 같음)
+    median = _group_median(value, starts, sizes)
+    deviation = value - median[group_id]
+    spread = np.abs(deviation)
+    mad = _group_median(spread[np.lexsort((spread, group_id))], starts, sizes)
+    # MAD가 0이면(절반 이상이 같은 값) 척도를 정할 수 없어 결측
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scale = np.where((mad > 0) & (sizes >= min_peers), mad, np.nan)
+        z[order] = MAD_SCALE * deviation / scale[group_id]
+    return percentile, z
+
+
+def peer_scores(df, dims=PEER_DIMENSIONS, measures=SCORE_MEASURES, threshold=OUTLIER_Z):
+    # 원본 행과 같은 순서의 점수 프레임 (측정값별 백분위, z, 최대 |z|, 이상치 여부)
+    dims = [dim for dim in dims if dim in df.columns]
+    codes = peer_codes(df, dims) if dims else np.zeros(len(df), dtype=np.int64)
+    columns = {}
+    magnitude = np.full(len(df), np.nan)
+    for measure in measures:
+        if measure not in df.columns:
+            continue
+        values = df[measure].to_numpy(dtype=np.float64)
+        if measure in LOG_MEASURES:
+            values = np.log1p(values)
+        percentile, z = group_scores(codes, values)
+        columns[percentile_column(measure)] = percentile.astype(np.float32)
+        columns[z_column(measure)] = z.astype(np.float32)
+        magnitude = np.fmax(magnitude, np.abs(z))
+    columns[SCORE_COLUMN] = magnitude.astype(np.float32)
+    with np.errstate(invalid='ignore'):
+        columns[OUTLIER_COLUMN] = magnitude >= threshold
+    return pd.DataFrame(columns)
+
+
+def outlier_positions(scores):
+    return np.flatnonzero(scores[OUTLIER_COLUMN].to_numpy())
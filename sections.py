@@ -0,0 +1,304 @@
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+import plotly.io as pio
+
+from aggregation import box_stats, build_cube
+from approximate import mean_intervals
+from charts import bar_chart, box_chart, heatmap_chart, pie_chart, segment_chart
+from figures import chart, render_charts
+from filters import filter_key
+from segmentation import segment, segment_summary
+from stats_engine import correlation_table
+from streaming import BOX_DIMENSIONS, BOX_MEASURE
+
+# 탭 단위 렌더링 구성 요소
+# 각 탭은 SectionContext를 받아 차트 행(row) 목록을 반환하는 순수 함수로 등록됨
+# 행의 각 항목은 집계 결과로 만든 ChartSpec이고, Plotly 객체 생성/직렬화는 figures.render_charts에서 병렬로
+# params는 빌더 인자의 기본값, requires_rows는 원본 행이 필요한지 여부 (스트리밍 모드 제외)
+# prefetch가 False인 탭은 무거운 분석 라이브러리를 읽으므로 선택했을 때만 계산
+TabSection = namedtuple('TabSection', ['key', 'label', 'title', 'builder', 'params', 'requires_rows', 'prefetch'])
+
+TAB_SECTIONS = {}
+# 상관관계를 미리 계산해 두는 그룹 (None은 전체)
+CORRELATION_GROUPS = [None, '투자성향', '연령대', '지역명']
+
+
+def tab_section(key, label, title, params=None, requires_rows=False, prefetch=True):
+    def register(builder):
+        TAB_SECTIONS[key] = TabSection(key, label, title, builder, dict(params or {}), requires_rows, prefetch)
+        return builder
+    return register
+
+
+class SectionContext:
+    # 탭 빌더 입력 (데이터 지문, 집계 큐브, 원본 데이터)
+    # 스트리밍 모드에서는 원본 대신 박스플롯 스케치만 받음
+    # 사전 계산 스냅샷에서 만든 경우 원본은 data_loader로 처음 필요할 때만 읽음
+    # 근사 모드에서는 층화 표본(sample)으로 평균의 신뢰구간을 함께 제공
+
+    def __init__(self, fingerprint, cube, data=None, sketches=None, data_loader=None, sample=None):
+        self.fingerprint = fingerprint
+        self.cube = cube
+        self.sketches = sketches or {}
+        self.sample = sample
+        self._data = data
+        self._data_loader = data_loader
+        self._box_stats = {}
+        self._correlations = {}
+        self._lock = threading.RLock()
+
+    @property
+    def data(self):
+        with self._lock:
+            if self._data is None and self._data_loader is not None:
+                self._data = self._data_loader()
+            return self._data
+
+    @property
+    def has_rows(self):
+        return self._data is not None or self._data_loader is not None
+
+    def preload(self, box_stats=None, correlations=None):
+        # 스냅샷에 저장된 결과를 미리 채움 (원본 없이 조회 가능)
+        with self._lock:
+            self._box_stats.update(box_stats or {})
+            self._correlations.update(correlations or {})
+
+    def box_stats(self, dim, measure='안전자산비율'):
+        key = (dim, measure)
+        with self._lock:
+            if key not in self._box_stats:
+                if dim in self.sketches:
+                    self._box_stats[key] = self.sketches[dim].box_stats()
+                else:
+                    self._box_stats[key] = box_stats(self.data, dim, measure)
+            return self._box_stats[key]
+
+    def mean_interval(self, dim, measure):
+        # 그룹 평균의 95% 신뢰구간 반폭 (정확한 집계면 None)
+        if self.sample is None:
+            return None
+        return mean_intervals(self.sample, dim, measure)['half_width']
+
+    def has_correlations(self):
+        return self.has_rows or None in self._correlations
+
+    def correlations(self, group_dim=None):
+        with self._lock:
+            if group_dim not in self._correlations:
+                self._correlations[group_dim] = correlation_table(self.data, group_dim)
+            return self._correlations[group_dim]
+
+
+def source_context(source, selections=None, value_range=None):
+    # 데이터 소스에서 탭 입력 생성 (원본 행이 없는 소스는 집계 큐브와 박스플롯 스케치만)
+    key = filter_key(selections or {}, value_range)
+    if source.has_rows:
+        # 필터가 없으면 소스가 보관하는 전체 큐브 (원본에 행이 추가되면 추가분만 병합된 큐브)
+        data = source.rows(selections, value_range)
+        cube, sketches = build_cube(data) if key else source.cube(), None
+    else:
+        data = None
+        cube = source.cube(selections=selections, value_range=value_range)
+        sketches = source.sketches(selections=selections, value_range=value_range)
+    # 지문은 원본을 읽은 뒤에 조회 (첫 로드에서 내용 해시가 기록됨)
+    fingerprint = f'{source.fingerprint()}:{key}' if key else source.fingerprint()
+    return SectionContext(fingerprint, cube, data, sketches)
+
+
+def exact_context(source):
+    # 근사 모드에서 백그라운드로 계산하는 정확한 탭 입력
+    # 큐브만이 아니라 무거운 박스플롯 통계(그룹별 정렬)와 상관관계까지 채운 뒤 완료되어,
+    # 교체 후 다시 실행할 때 스크립트 스레드에서 원본을 다시 훑지 않음
+    ctx = source_context(source)
+    for dim in BOX_DIMENSIONS:
+        if dim in ctx.cube.dims:
+            ctx.box_stats(dim, BOX_MEASURE)
+    if ctx.has_correlations():
+        for group in CORRELATION_GROUPS:
+            ctx.correlations(group)
+    return ctx
+
+
+# 데이터 지문별 직렬화된 차트 JSON 캐시 (프로세스 전역, 오래된 항목부터 제거)
+MAX_CACHED_SECTIONS = 64
+_figure_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='tab-prefetch')
+
+
+def _params(key, params):
+    return tuple(sorted(dict(TAB_SECTIONS[key].params, **params).items()))
+
+
+def _claim(ctx, key, params):
+    # 캐시 항목을 찾거나, 없으면 새로 만들어 계산 담당 여부와 함께 반환
+    cache_key = (ctx.fingerprint, key, params)
+    with _cache_lock:
+        future = _figure_cache.get(cache_key)
+        if future is not None:
+            _figure_cache.move_to_end(cache_key)
+            return future, False
+        future = _figure_cache[cache_key] = Future()
+        while len(_figure_cache) > MAX_CACHED_SECTIONS:
+            _figure_cache.popitem(last=False)
+        return future, True
+
+
+def render_section(ctx, key, **params):
+    # 탭의 차트를 JSON 행 목록으로 생성 (캐시 없음)
+    rows = TAB_SECTIONS[key].builder(ctx, **dict(TAB_SECTIONS[key].params, **params))
+    return render_charts(rows)
+
+
+def _build(ctx, key, params, future):
+    try:
+        future.set_result(render_section(ctx, key, **dict(params)))
+    except BaseException as exc:
+        with _cache_lock:
+            _figure_cache.pop((ctx.fingerprint, key, params), None)
+        future.set_exception(exc)
+
+
+def section_payload(ctx, key, **params):
+    # 탭의 차트 JSON을 반환 (캐시에 없으면 현재 스레드에서 계산)
+    params = _params(key, params)
+    future, owner = _claim(ctx, key, params)
+    if owner:
+        _build(ctx, key, params, future)
+    return future.result()
+
+
+def prefetch_sections(ctx, keys):
+    # 보이지 않는 탭은 기본 인자로 백그라운드에서 미리 계산
+    for key in keys:
+        if not TAB_SECTIONS[key].prefetch:
+            continue
+        params = _params(key, {})
+        future, owner = _claim(ctx, key, params)
+        if owner:
+            _prefetch_pool.submit(_build, ctx, key, params, future)
+
+
+def seed_sections(ctx, payloads):
+    # 미리 직렬화된 기본 인자 차트 JSON을 캐시에 채움
+    for key, rows in payloads.items():
+        if key not in TAB_SECTIONS:
+            continue
+        future, owner = _claim(ctx, key, _params(key, {}))
+        if owner:
+            future.set_result(rows)
+
+
+def load_figure(payload):
+    return pio.from_json(payload)
+
+
+@tab_section('style', '💰투자성향 분석', '투자성향 분석')
+def build_style_tab(ctx):
+    cube = ctx.cube
+    # 투자성향 분포 (파이 차트)
+    fig_style = chart(pie_chart, cube.counts('투자성향'), '투자성향 분포')
+    # 투자성향별 안전자산 비율 분포
+    fig_style_safe = chart(box_chart, ctx.box_stats('투자성향'), '투자성향별 안전자산 비율 분포',
+                           '투자성향', '안전자산비율')
+    # 투자성향별 평균 자산
+    style_asset_avg = cube.mean('투자성향', '총평가금액').sort_values(ascending=False)
+    fig_style_asset = chart(bar_chart, style_asset_avg, '투자성향별 평균 자산',
+                            '투자성향', '평균 총평가금액 (원)', '₩%{y:,.0f}',
+                            error=ctx.mean_interval('투자성향', '총평가금액'))
+    return [[fig_style, fig_style_safe], [fig_style_asset]]
+
+
+@tab_section('age', '👨연령대 분석', '연령대 분석')
+def build_age_tab(ctx):
+    cube = ctx.cube
+    # 연령대별 평균 자산 규모
+    age_asset_avg = cube.mean('연령대', '총평가금액').sort_values(ascending=False)
+    fig_age_asset = chart(bar_chart, age_asset_avg, '연령대별 평균 자산',
+                          '연령대', '평균 총평가금액 (원)', '₩%{y:,.0f}',
+                          error=ctx.mean_interval('연령대', '총평가금액'))
+    # 연령대별 안전자산 비율 분포
+    fig_age_safe = chart(box_chart, ctx.box_stats('연령대'), '연령대별 안전자산 비율 분포',
+                         '연령대', '안전자산비율')
+    # 연령대별 투자성향 분포 (히트맵)
+    age_style_dist = cube.crosstab('연령대', '투자성향')
+    fig_age_style = chart(heatmap_chart, age_style_dist, '연령대별 투자성향 분포', '투자성향', '연령대')
+    return [[fig_age_asset, fig_age_safe], [fig_age_style]]
+
+
+@tab_section('region', '🏙️지역 분석', '지역별 분석')
+def build_region_tab(ctx):
+    cube = ctx.cube
+    # 지역별 투자자 수
+    fig_region = chart(bar_chart, cube.counts('지역명'), '지역별 투자자 분포',
+                       '지역명', '투자자 수 (명)', '%{y:,}명')
+    # 지역별 평균 자산
+    region_asset_avg = cube.mean('지역명', '총평가금액').sort_values(ascending=False)
+    fig_region_asset = chart(bar_chart, region_asset_avg, '지역별 평균 자산',
+                             '지역명', '평균 총평가금액 (원)', '₩%{y:,.0f}',
+                             error=ctx.mean_interval('지역명', '총평가금액'))
+    # 지역별 연령대/투자성향 분포 (히트맵)
+    region_age = cube.crosstab('지역명', '연령대')
+    fig_region_age = chart(heatmap_chart, region_age, '지역별 연령대 분포', '연령대', '지역명')
+    region_style = cube.crosstab('지역명', '투자성향')
+    fig_region_style = chart(heatmap_chart, region_style, '지역별 투자성향 분포', '투자성향', '지역명')
+    return [[fig_region, fig_region_asset], [fig_region_age], [fig_region_style]]
+
+
+@tab_section('asset', '💵자산 분석', '자산 규모별 분석')
+def build_asset_tab(ctx):
+    cube = ctx.cube
+    # 자산규모별 투자자 분포
+    fig_asset = chart(
+        pie_chart,
+        cube.counts('자산규모'), '자산규모별 투자자 분포',
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='%{label}<br>고객 수: %{value:,}명<br>비율: %{percent}'
+    )
+    # 자산규모별 안전자산 비율 분포
+    fig_asset_safe = chart(box_chart, ctx.box_stats('자산규모'), '자산규모별 안전자산 비율 분포',
+                           '자산규모', '안전자산비율')
+    # 자산규모별 투자성향 분포 (히트맵)
+    asset_style = cube.crosstab('자산규모', '투자성향')
+    fig_asset_style = chart(heatmap_chart, asset_style, '자산규모별 투자성향 분포', '투자성향', '자산규모')
+    return [[fig_asset, fig_asset_safe], [fig_asset_style]]
+
+
+# 교차 분석 셀 값: 이름 → (측정값, 통계, 색 범례, 셀 표시 형식)
+CROSSTAB_VALUES = {
+    '고객 수': (None, 'count', '고객 수', '%{z:,.0f}명'),
+    '총평가금액 합계': ('총평가금액', 'sum', '총평가금액 합계 (원)', '₩%{z:,.0f}'),
+    '평균 총평가금액': ('총평가금액', 'mean', '평균 총평가금액 (원)', '₩%{z:,.0f}'),
+    '평균 안전자산비율': ('안전자산비율', 'mean', '평균 안전자산비율 (%)', '%{z:.1f}%'),
+}
+
+
+@tab_section('crosstab', '🔀교차 분석', '차원 교차 분석',
+             params={'row': '연령대', 'col': '투자성향', 'value': '고객 수'})
+def build_crosstab_tab(ctx, row, col, value):
+    # 고른 두 차원의 히트맵 (차원 쌍 집계는 큐브에 미리 계산되어 있어 조회만 함)
+    measure, stat, color_label, texttemplate = CROSSTAB_VALUES[value]
+    table = ctx.cube.crosstab(row, col, measure, stat)
+    title = f'{row} × {col} {value}'
+    return [[chart(heatmap_chart, table, title, col, row, color_label, texttemplate)]]
+
+
+@tab_section('segment', '🧩고객 세분화', '고객 세분화 (MiniBatchKMeans)', params={'k': 4}, requires_rows=True,
+             prefetch=False)
+def build_segment_tab(ctx, k):
+    model, assigned = segment(ctx.fingerprint, ctx.data, k)
+    summary = segment_summary(ctx.data, assigned, k)
+    # 군집별 고객 수
+    fig_segment_size = chart(bar_chart, summary['고객 수'], '군집별 고객 수', '군집', '고객 수 (명)', '%{y:,}명')
+    # 군집 중심 (평균 안전자산비율 × 평균 총평가금액, 크기는 고객 수)
+    fig_segment_profile = chart(segment_chart, summary, '군집별 평균 자산과 안전자산 비율')
+    # 군집별 투자성향 분포 (히트맵)
+    segmented = ctx.data[['투자성향']].assign(군집=pd.Categorical.from_codes(assigned, summary.index))
+    segment_style = build_cube(segmented, dims=['군집', '투자성향'], measures=[]).crosstab('군집', '투자성향')
+    fig_segment_style = chart(heatmap_chart, segment_style, '군집별 투자성향 분포', '투자성향', '군집')
+    return [[fig_segment_size, fig_segment_profile], [fig_segment_style]]
@@ -0,0 +1,207 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from aggregation import DIMENSIONS, category_codes
+
+# 고객 세분화 (총평가금액, 안전자산비율 + 범주 one-hot)
+# sklearn은 import가 무거워 학습할 때 읽음 (세분화 탭을 열지 않으면 서버에 올라오지 않음)
+NUMERIC_FEATURES = ['총평가금액', '안전자산비율']
+# 학습은 표본으로, 배정은 전체 행을 배치 단위로
+SAMPLE_ROWS = 100_000
+ASSIGN_BATCH_ROWS = 200_000
+SILHOUETTE_SAMPLE_ROWS = 10_000
+SWEEP_KS = tuple(range(2, 11))
+
+
+class SegmentModel:
+    # 표준화 파라미터와 범주 목록을 함께 보관해 학습/배정 특징을 일치시킴
+
+    def __init__(self, k, center, scale, labels, kmeans):
+        self.k = k
+        self.center = center
+        self.scale = scale
+        self.labels = labels
+        self.kmeans = kmeans
+
+    def features(self, df):
+        return build_features(df, self.center, self.scale, self.labels)
+
+    def predict(self, df, batch_rows=ASSIGN_BATCH_ROWS):
+        # 배치 단위 벡터화 배정 (특징 행렬 전체를 한 번에 만들지 않음)
+        assigned = np.empty(len(df), dtype=np.int16)
+        for start in range(0, len(df), batch_rows):
+            batch = df.iloc[start:start + batch_rows]
+            assigned[start:start + len(batch)] = self.kmeans.predict(self.features(batch))
+        return assigned
+
+
+def _numeric(df):
+    values = np.column_stack([
+        df[col].to_numpy(dtype=np.float64) for col in NUMERIC_FEATURES
+    ])
+    # 금액은 로그 스케일
+    values[:, 0] = np.log1p(np.clip(values[:, 0], 0, None))
+    return values
+
+
+def build_features(df, center, scale, labels):
+    numeric = (_numeric(df) - center) / scale
+    numeric = np.nan_to_num(numeric, nan=0.0)
+    blocks = [numeric.astype(np.float32)]
+    for dim, dim_labels in labels.items():
+        codes, own_labels = category_codes(df[dim])
+        # 학습 시점의 범주 순서로 코드 변환 (처음 보는 범주는 모두 0)
+        lookup = np.array([dim_labels.index(label) if label in dim_labels else -1
+                           for label in own_labels] + [-1])
+        codes = lookup[codes]
+        onehot = np.zeros((len(df), len(dim_labels)), dtype=np.float32)
+        known = codes >= 0
+        onehot[np.flatnonzero(known), codes[known]] = 1.0
+        blocks.append(onehot)
+    return np.hstack(blocks)
+
+
+def sample_rows(df, size=SAMPLE_ROWS, seed=0):
+    if len(df) <= size:
+        return df
+    picked = np.random.default_rng(seed).choice(len(df), size=size, replace=False)
+    return df.take(np.sort(picked))
+
+
+def feature_space(df, sample):
+    # 표본 기준 표준화 파라미터와 전체 데이터의 범주 목록
+    numeric = _numeric(sample)
+    center = np.nanmean(numeric, axis=0)
+    scale = np.nanstd(numeric, axis=0)
+    scale[~(scale > 0)] = 1.0
+    labels = {dim: list(category_codes(df[dim])[1]) for dim in DIMENSIONS if dim in df.columns}
+    return center, scale, labels
+
+
+def fit_model(df, k, seed=0):
+    from sklearn.cluster import MiniBatchKMeans
+
+    sample = sample_rows(df, seed=seed)
+    center, scale, labels = feature_space(df, sample)
+    features = build_features(sample, center, scale, labels)
+    kmeans = MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=seed)
+    kmeans.fit(features)
+    return SegmentModel(k, center, scale, labels, kmeans)
+
+
+# 데이터 지문과 k별 모델/배정 결과 future 캐시 (프로세스 전역, 오래된 항목부터 제거)
+# 잠금은 항목을 찾거나 만드는 동안만 잡고, 학습은 항목을 만든 세션이 잠금 밖에서 실행
+# (같은 키를 요청한 다른 세션은 그 future를 기다리고, 다른 키의 학습은 막지 않음)
+MAX_CACHED_MODELS = 8
+_models = OrderedDict()
+_models_lock = threading.Lock()
+
+
+def segment(fingerprint, df, k):
+    # (모델, 전체 행의 군집 번호)
+    key = (fingerprint, k)
+    with _models_lock:
+        future = _models.get(key)
+        owner = future is None or (future.done() and future.exception() is not None)
+        if owner:
+            future = _models[key] = Future()
+            while len(_models) > MAX_CACHED_MODELS:
+                _models.popitem(last=False)
+        _models.move_to_end(key)
+    if owner:
+        try:
+            model = fit_model(df, k)
+            future.set_result((model, model.predict(df)))
+        except BaseException as exc:
+            future.set_exception(exc)
+    return future.result()
+
+
+def segment_summary(df, assigned, k):
+    # 군집별 고객 수, 평균 총평가금액/안전자산비율
+    counts = np.bincount(assigned, minlength=k)
+    summary = {'고객 수': counts}
+    for col in NUMERIC_FEATURES:
+        values = df[col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary[f'평균 {col}'] = (np.bincount(assigned[valid], weights=values[valid], minlength=k)
+                                     / np.bincount(assigned[valid], minlength=k))
+    return pd.DataFrame(summary, index=pd.Index([f'군집 {i + 1}' for i in range(k)], name='군집'))
+
+
+def _score_k(features, k, seed=0):
+    # 프로세스 풀 작업: k 하나에 대한 관성(inertia)과 실루엣 점수
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.metrics import silhouette_score
+
+    kmeans = MiniBatchKMeans(n_clusters=k, batch_size=4096, n_init=3, random_state=seed)
+    assigned = kmeans.fit_predict(features)
+    silhouette = silhouette_score(features, assigned,
+                                  sample_size=min(SILHOUETTE_SAMPLE_ROWS, len(features)),
+                                  random_state=seed)
+    return k, float(kmeans.inertia_), float(silhouette)
+
+
+# 필터 조합(데이터 지문)별 탐색 (오래된 항목부터 제거하고 아직 시작하지 않은 작업은 취소)
+# 항목: (특징 행렬, k별 future 목록, k별 재제출 횟수), 목록은 제자리에서 바꿔 이미 받아 간 세션도 새 future를 봄
+MAX_SWEEPS = 8
+# 실패한 k는 다음 조회 때 이 횟수까지 다시 제출 (그 뒤에도 실패하면 sweep_results가 실패로 보고)
+SWEEP_RETRIES = 2
+_sweep_pool = None
+_sweeps = OrderedDict()
+_sweeps_lock = threading.Lock()
+
+
+def _failed(future):
+    return future.done() and not future.cancelled() and future.exception() is not None
+
+
+def _submit_sweep(features, k, workers):
+    # 작업 프로세스가 죽어 풀이 깨졌으면 새 풀을 만들어 제출 (_sweeps_lock 안에서 호출)
+    global _sweep_pool
+    if _sweep_pool is not None:
+        try:
+            return _sweep_pool.submit(_score_k, features, k)
+        except BrokenProcessPool:
+            _sweep_pool.shutdown(wait=False, cancel_futures=True)
+    _sweep_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _sweep_pool.submit(_score_k, features, k)
+
+
+def start_sweep(fingerprint, df, ks=SWEEP_KS):
+    # 엘보/실루엣 탐색을 프로세스 풀에서 시작하고 future 목록을 반환 (UI는 기다리지 않음)
+    key = (fingerprint, tuple(ks))
+    workers = min(len(ks), multiprocessing.cpu_count())
+    with _sweeps_lock:
+        if key in _sweeps:
+            _sweeps.move_to_end(key)
+            features, futures, attempts = _sweeps[key]
+            for i, future in enumerate(futures):
+                if _failed(future) and attempts[i] < SWEEP_RETRIES:
+                    futures[i] = _submit_sweep(features, ks[i], workers)
+                    attempts[i] += 1
+            return futures
+        sample = sample_rows(df, size=min(SAMPLE_ROWS, 50_000))
+        features = build_features(sample, *feature_space(df, sample))
+        futures = [_submit_sweep(features, k, workers) for k in ks]
+        _sweeps[key] = (features, futures, [0] * len(ks))
+        while len(_sweeps) > MAX_SWEEPS:
+            _, (_, evicted, _) = _sweeps.popitem(last=False)
+            for future in evicted:
+                future.cancel()
+        return futures
+
+
+def sweep_results(futures, ks=SWEEP_KS):
+    # (끝난 k의 점수 DataFrame, 재제출 후에도 실패한 k 목록)
+    # 진행 중이면 일부만, 제거되며 취소된 future는 다음 start_sweep이 다시 만듦
+    done = [f.result() for f in futures if f.done() and not f.cancelled() and f.exception() is None]
+    failed = [k for k, f in zip(ks, futures) if _failed(f)]
+    return pd.DataFrame(done, columns=['k', 'inertia', 'silhouette']).sort_values('k'), failed
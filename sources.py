@@ -0,0 +1,611 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from approximate import SAMPLE_ROWS, STRATA, StratifiedSample, allocation_rates, stratified_sample
+from aggregation import DIMENSIONS, MEASURES, STAT_NAMES, AggregateCube, HistogramSketch, SKETCH_EDGES, build_cube
+from drilldown import PAGE_ROWS, SEARCH_COLUMN, SORT_COLUMNS, DrillDownIndex
+from data_store import (CACHE_DIR, DATA_PATH, compact_frame, current_meta, dataset_fingerprint, dataset_meta,
+                        detect_change, extend_dataset, file_hash, file_signature, open_dataset, read_appended,
+                        read_scores, tail_hash, write_quarantine, write_scores)
+from density import DENSITY_BINS, DENSITY_X, DENSITY_Y, axis_scale, density_grid, grid_from_cells
+from filters import RANGE_COLUMN, BitmapIndex, filter_key
+from schema import CATEGORY_COLUMNS, counts_from_json, counts_to_json, merge_counts, quarantine_report, validate
+from scoring import (OUTLIER_COLUMN, PEER_DIMENSIONS, SCORE_COLUMNS, SCORE_MEASURES, SCORE_VERSION, outlier_positions,
+                     peer_scores)
+from streaming import BOX_DIMENSIONS, BOX_MEASURE, CHUNK_ROWS, fold_chunk, stream_aggregates, use_streaming
+
+# 데이터 소스 계층
+# 대시보드는 집계 큐브(group-by), 크로스탭, 박스플롯 스케치 단위로 데이터를 요청함
+# csv: 원본 행을 메모리에 올려 계산 (큰 파일은 청크 스트리밍)
+# sqlite: python -m cli ingest로 만든 인덱스 DB에 GROUP BY로 위임해 작은 결과만 가져옴
+SOURCE_KIND = os.environ.get('DASHBOARD_SOURCE', 'csv')
+SQLITE_PATH = os.environ.get('DASHBOARD_SQLITE', os.path.join(CACHE_DIR, 'dataset.sqlite'))
+
+TABLE = 'customers'
+LABEL_TABLE = 'dimension_labels'
+META_TABLE = 'dataset_meta'
+# 고객별 동료 집단 점수 (row_id = customers의 rowid)
+SCORE_TABLE = 'peer_scores'
+# 결측 범주 코드 (조회 시 마지막 칸으로 보냄)
+MISSING_CODE = -1
+# 스케치 구간 배정 전 값 반올림 자릿수 (구간 폭 0.1보다 충분히 작게)
+SKETCH_DECIMALS = 3
+
+
+class CsvSource:
+    # 원본 CSV (컬럼형 스냅샷 캐시 사용)
+    # 한 객체는 한 시점의 원본만 나타내고, 원본이 바뀌면 refreshed()가 새 객체를 만듦
+
+    kind = 'csv'
+
+    def __init__(self, path=DATA_PATH, cache_dir=CACHE_DIR):
+        self.path = path
+        self.cache_dir = cache_dir
+        self._data = None
+        # 읽은 시점의 원본 크기, 수정 시각, 끝부분 해시, 지문
+        # 읽기 전에는 만든 시점의 파일 상태로 고정해, 사전 계산 스냅샷으로 시작해 원본을 읽지 않아도
+        # refreshed()가 변경을 감지하고 지문이 이전 파일의 캐시 meta를 가리키지 않게 함
+        self._meta = current_meta(path, cache_dir) if os.path.exists(path) else None
+        self._cube = None
+        self._index = None
+        self._drilldown = None
+        self._scores = None
+        self._aggregates = None
+        self._lock = threading.Lock()
+
+    def fingerprint(self):
+        if self._meta is not None and self._meta.get('hash'):
+            return self._meta['hash']
+        return dataset_fingerprint(self.path, self.cache_dir)
+
+    def refreshed(self):
+        # 원본이 그대로면 self
+        # 뒤에 행만 추가됐으면 새 행만 파싱해 원본 행과 전체 집계 큐브(또는 스트리밍 집계)에 합친 새 소스
+        # 앞부분이 바뀌었으면 처음부터 다시 읽는 새 소스
+        with self._lock:
+            meta, data, cube, aggregates = self._meta, self._data, self._cube, self._aggregates
+        if meta is None or not os.path.exists(self.path):
+            return self
+        change = detect_change(self.path, meta)
+        if change == 'same':
+            return self
+        source = CsvSource(self.path, self.cache_dir)
+        # 아직 읽지 않았거나 모드가 바뀐 소스는 합칠 대상이 없으므로 새 소스가 처음부터 읽음
+        if change != 'append' or (data if source.has_rows else aggregates) is None:
+            return source
+        if data is not None:
+            combined, rows, new_meta = extend_dataset(data, self.path, self.cache_dir, meta)
+            if rows is None:
+                return self
+            source._data, source._meta = combined, new_meta
+            source._cube = cube.merge(build_cube(rows)) if cube is not None else None
+        else:
+            rows, new_meta = read_appended(self.path, meta, self.cache_dir)
+            if rows is None:
+                return self
+            source._aggregates, source._meta = fold_chunk(aggregates, rows), new_meta
+        return source
+
+    @property
+    def has_rows(self):
+        return os.path.exists(self.path) and not use_streaming(self.path)
+
+    @property
+    def supports_filters(self):
+        return self.has_rows
+
+    @property
+    def supports_sampling(self):
+        return self.has_rows
+
+    @property
+    def has_scores(self):
+        return self.has_rows
+
+    def row_count(self):
+        return len(self.load())
+
+    def sample(self, rows=SAMPLE_ROWS, strata=STRATA, seed=0):
+        return stratified_sample(self.load(), rows, strata, seed)
+
+    def load(self):
+        # 프로세스당 한 번만 읽어 모든 세션이 같은 객체를 읽기 전용으로 공유 (세션별 복사 없음)
+        with self._lock:
+            if self._data is None:
+                self._data, self._meta = open_dataset(self.path, self.cache_dir)
+            return self._data
+
+    def bitmap_index(self):
+        data = self.load()
+        with self._lock:
+            if self._index is None:
+                self._index = BitmapIndex(data)
+            return self._index
+
+    def peer_scores(self):
+        # 고객별 동료 집단 백분위/z-점수 (원본 행과 같은 순서, 같은 내용이면 스냅샷 옆에 저장된 결과를 읽음)
+        # 행이 추가되면 집단의 순위가 모두 바뀌므로 refreshed()가 만든 새 소스에서 다시 계산
+        data = self.load()
+        with self._lock:
+            if self._scores is None:
+                digest = self._meta.get('hash')
+                scores = read_scores(self.path, self.cache_dir, digest, len(data)) if digest else None
+                if scores is None:
+                    scores = peer_scores(data)
+                    if digest:
+                        write_scores(scores, self.path, self.cache_dir, digest)
+                self._scores = scores
+            return self._scores
+
+    def drilldown_index(self):
+        data, scores = self.load(), self.peer_scores()
+        with self._lock:
+            if self._drilldown is None:
+                self._drilldown = DrillDownIndex(data, SORT_COLUMNS + SCORE_COLUMNS, extra=scores)
+            return self._drilldown
+
+    def rows(self, selections=None, value_range=None):
+        # 필터에 해당하는 행 (비트맵 인덱스로 선택)
+        if not filter_key(selections or {}, value_range):
+            return self.load()
+        return self.load().take(self.bitmap_index().select(selections or {}, value_range))
+
+    def page(self, selections=None, value_range=None, sort_by=SORT_COLUMNS[0], descending=True, search='',
+             page=0, page_rows=PAGE_ROWS, outliers_only=False):
+        # 고객 상세 조회 한 페이지 (미리 계산한 정렬 순서 사용, 동료 집단 점수 컬럼 포함)
+        positions = None
+        if filter_key(selections or {}, value_range):
+            positions = self.bitmap_index().select(selections or {}, value_range)
+        scores = self.peer_scores()
+        if outliers_only:
+            outliers = outlier_positions(scores)
+            positions = outliers if positions is None else np.intersect1d(positions, outliers, assume_unique=True)
+        return self.drilldown_index().page(self.load(), positions, sort_by, descending, search, page, page_rows,
+                                           extra=scores)
+
+    def _streaming(self):
+        with self._lock:
+            if self._aggregates is None:
+                signature = file_signature(self.path)
+                self._aggregates = stream_aggregates(self.path)
+                self._meta = dict(signature, hash=dataset_fingerprint(self.path, self.cache_dir),
+                                  tail_hash=tail_hash(self.path, signature['size']),
+                                  quarantine=counts_to_json(self._aggregates.quarantine))
+            return self._aggregates
+
+    def quarantine(self):
+        # 스키마 검증에서 격리된 행 수 (컬럼/사유별, 격리된 원본 행은 data_store.quarantine_path)
+        meta = self._meta if self._meta is not None else dataset_meta(self.path, self.cache_dir)
+        return quarantine_report(counts_from_json((meta or {}).get('quarantine')))
+
+    def _full_cube(self):
+        # 필터 없는 전체 큐브 (추가된 행은 refreshed()에서 병합)
+        data = self.load()
+        with self._lock:
+            if self._cube is None:
+                self._cube = build_cube(data)
+            return self._cube
+
+    def _check_filters(self, selections, value_range):
+        if filter_key(selections or {}, value_range) and not self.has_rows:
+            raise ValueError('스트리밍 모드에서는 필터를 사용할 수 없습니다.')
+
+    def cube(self, dims=DIMENSIONS, measures=MEASURES, selections=None, value_range=None):
+        self._check_filters(selections, value_range)
+        if self.has_rows:
+            full = (list(dims), list(measures)) == (DIMENSIONS, MEASURES)
+            if full and not filter_key(selections or {}, value_range):
+                return self._full_cube()
+            return build_cube(self.rows(selections, value_range), dims, measures)
+        return self._streaming().cube
+
+    def crosstab(self, row, col, measure=None, stat='count', selections=None, value_range=None):
+        return self.cube([row, col], [measure] if measure else [], selections, value_range).crosstab(
+            row, col, measure, stat)
+
+    def sketches(self, dims=BOX_DIMENSIONS, measure=BOX_MEASURE, selections=None, value_range=None):
+        self._check_filters(selections, value_range)
+        if self.has_rows:
+            data = self.rows(selections, value_range)
+            return {dim: HistogramSketch.from_frame(data, dim, measure) for dim in dims if dim in data.columns}
+        return {dim: sketch for dim, sketch in self._streaming().sketches.items() if dim in dims}
+
+    def density(self, x_range, y_range, bins=DENSITY_BINS, log_x=False, group=None, selections=None,
+                value_range=None):
+        # 총평가금액 × 안전자산비율 구간 밀도 (원본 행이 있을 때만)
+        if not self.has_rows:
+            raise ValueError('스트리밍 모드에서는 밀도 분석을 사용할 수 없습니다.')
+        return density_grid(self.rows(selections, value_range), x_range, y_range, bins, log_x, group)
+
+
+def _has_math_functions():
+    try:
+        sqlite3.connect(':memory:').execute('SELECT ln(1)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+# 수학 함수 없이 빌드된 SQLite에서는 밀도 분석의 로그 축용 ln을 파이썬 함수로 등록
+HAS_MATH_FUNCTIONS = _has_math_functions()
+
+
+def _ln(value):
+    return math.log(value) if value is not None and value > 0 else None
+
+
+def _connect(db_path, readonly=True):
+    if readonly:
+        conn = sqlite3.connect(f'file:{os.path.abspath(db_path)}?mode=ro', uri=True, check_same_thread=False)
+        if not HAS_MATH_FUNCTIONS:
+            conn.create_function('ln', 1, _ln, deterministic=True)
+        return conn
+    return sqlite3.connect(db_path)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteSource:
+    # 범주는 정수 코드로 저장하고 라벨 사전은 별도 테이블에 둠
+    # 모든 요청은 GROUP BY 결과(셀 수만큼의 행)만 파이썬으로 가져옴
+
+    kind = 'sqlite'
+    has_rows = False
+    supports_filters = True
+    supports_sampling = True
+
+    def __init__(self, db_path=SQLITE_PATH):
+        self.db_path = db_path
+        self.signature = file_signature(db_path)
+        with _connect(db_path) as conn:
+            self.meta = dict(conn.execute(f'SELECT key, value FROM {META_TABLE}'))
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info({TABLE})')]
+            stored = {}
+            for dim, code, label in conn.execute(f'SELECT dimension, code, label FROM {LABEL_TABLE}'):
+                stored.setdefault(dim, {})[code] = label
+            # 점수 테이블이 없거나 이전 점수 정의로 적재한 DB는 다시 적재할 때까지 점수 없이 조회
+            self.has_scores = (conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                            (SCORE_TABLE,)).fetchone() is not None
+                               and self.meta.get('score_version') == str(SCORE_VERSION))
+        self.columns = columns
+        self.dims = [dim for dim in DIMENSIONS if dim in columns]
+        self.measures = [measure for measure in MEASURES if measure in columns]
+        # 라벨은 CSV 경로(category dtype)와 같은 정렬 순서로 노출하고 저장 코드를 그 순서로 변환
+        self.labels, self._remap = {}, {}
+        for dim in self.dims:
+            codes = stored.get(dim, {})
+            labels = sorted(codes.values())
+            position = {label: i for i, label in enumerate(labels)}
+            remap = np.full(max(codes, default=-1) + 2, len(labels), dtype=np.int64)
+            for code, label in codes.items():
+                remap[code] = position[label]
+            self.labels[dim], self._remap[dim] = labels, remap
+
+    def fingerprint(self):
+        return f"sqlite-{self.meta['hash']}"
+
+    def quarantine(self):
+        # ingest 때 격리된 행 수
+        return quarantine_report(counts_from_json(json.loads(self.meta.get('quarantine', '[]'))))
+
+    def refreshed(self):
+        # DB는 ingest가 통째로 교체하므로 파일이 바뀌었으면 새 소스 (집계는 매번 DB에서 조회)
+        return self if file_signature(self.db_path) == self.signature else SqliteSource(self.db_path)
+
+    def row_count(self):
+        return int(self.meta['rows'])
+
+    def _query(self, sql, params=()):
+        with _connect(self.db_path) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _where(self, selections, value_range, prefix=''):
+        clauses, params = [], []
+        for dim, selected in (selections or {}).items():
+            if not selected:
+                continue
+            selected = set(selected)
+            codes = [code for code, position in enumerate(self._remap[dim][:-1])
+                     if position < len(self.labels[dim]) and self.labels[dim][position] in selected]
+            clauses.append(f'{prefix}{_quote(dim)} IN ({",".join("?" * len(codes)) or "NULL"})')
+            params.extend(codes)
+        if value_range is not None:
+            clauses.append(f'{prefix}{_quote(RANGE_COLUMN)} BETWEEN ? AND ?')
+            params.extend(value_range)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _codes(self, dim, stored):
+        return self._remap[dim][np.asarray(stored, dtype=np.int64)]
+
+    def cube(self, dims=DIMENSIONS, measures=MEASURES, selections=None, value_range=None):
+        # 셀별 count/sum/min/max/sumsq는 GROUP BY로,
+        # m2는 셀 평균(c)과 조인해 같은 쿼리에서 계산 (build_cube와 같은 정의)
+        dims = [d for d in dims if d in self.dims]
+        measures = [m for m in measures if m in self.measures]
+        inner_where, params = self._where(selections, value_range)
+        outer_where, _ = self._where(selections, value_range, 't.')
+
+        keys = [f't.{_quote(d)}' for d in dims]
+        means = [_quote(d) for d in dims] + [f'AVG({_quote(m)}) AS {_quote("mean_" + m)}' for m in measures]
+        select = keys + ['COUNT(*)']
+        for m in measures:
+            q, mean = f't.{_quote(m)}', f'c.{_quote("mean_" + m)}'
+            select += [f'COUNT({q})', f'TOTAL({q})', f'MIN({q})', f'MAX({q})', f'TOTAL({q} * {q})',
+                       f'TOTAL(({q} - {mean}) * ({q} - {mean}))']
+        join = ' AND '.join(f't.{_quote(d)} = c.{_quote(d)}' for d in dims) or '1'
+        group = ' GROUP BY ' + ', '.join(_quote(d) for d in dims) if dims else ''
+        sql = (f'WITH c AS (SELECT {", ".join(means) or "1"} FROM {TABLE}{inner_where}{group}) '
+               f'SELECT {", ".join(select)} FROM {TABLE} AS t JOIN c ON {join}{outer_where}'
+               f'{" GROUP BY " + ", ".join(keys) if dims else ""}')
+        result = self._query(sql, params * 2)
+
+        labels = {d: self.labels[d] for d in dims}
+        shape = tuple(len(labels[d]) + 1 for d in dims)
+        size = int(np.prod(shape))
+        values = np.array(result, dtype=np.float64).reshape(len(result), len(dims) + 1 + 6 * len(measures))
+        codes = [self._codes(d, values[:, i].astype(np.int64)) for i, d in enumerate(dims)]
+        cells = np.ravel_multi_index(codes, shape) if dims else np.zeros(len(values), dtype=np.int64)
+
+        def scatter(column, fill=0.0, how=np.add):
+            out = np.full(size, fill)
+            how.at(out, cells, np.nan_to_num(values[:, column], nan=fill))
+            return out.reshape(shape)
+
+        rows = scatter(len(dims)).astype(np.int64)
+        stats = {}
+        for i, m in enumerate(measures):
+            base = len(dims) + 1 + 6 * i
+            stats[m] = {
+                'count': scatter(base).astype(np.int64),
+                'sum': scatter(base + 1),
+                'min': scatter(base + 2, np.inf, np.minimum),
+                'max': scatter(base + 3, -np.inf, np.maximum),
+                'sumsq': scatter(base + 4),
+                'm2': scatter(base + 5),
+            }
+        return AggregateCube(dims, labels, rows, {m: {n: stats[m][n] for n in STAT_NAMES} for m in measures})
+
+    def crosstab(self, row, col, measure=None, stat='count', selections=None, value_range=None):
+        return self.cube([row, col], [measure] if measure else [], selections, value_range).crosstab(
+            row, col, measure, stat)
+
+    def sketches(self, dims=BOX_DIMENSIONS, measure=BOX_MEASURE, selections=None, value_range=None):
+        # 그룹 × 반올림 값 단위 GROUP BY 결과를 고정 구간에 배정
+        edges = SKETCH_EDGES[measure]
+        bins = len(edges) - 1
+        where, params = self._where(selections, value_range)
+        q = _quote(measure)
+        valid = f'{q} IS NOT NULL'
+        where = f'{where} AND {valid}' if where else f' WHERE {valid}'
+        sketches = {}
+        for dim in dims:
+            if dim not in self.dims:
+                continue
+            d = _quote(dim)
+            groups = len(self.labels[dim])
+            counts = np.zeros((groups, bins), dtype=np.int64)
+            sums = np.zeros(groups)
+            minimum = np.full(groups, np.inf)
+            maximum = np.full(groups, -np.inf)
+            binned = self._query(
+                f'SELECT {d}, ROUND({q}, {SKETCH_DECIMALS}), COUNT(*) FROM {TABLE}{where} GROUP BY 1, 2', params)
+            if binned:
+                binned = np.array(binned, dtype=np.float64)
+                codes = self._codes(dim, binned[:, 0].astype(np.int64))
+                keep = codes < groups
+                positions = np.clip(np.searchsorted(edges, binned[keep, 1], side='right') - 1, 0, bins - 1)
+                np.add.at(counts, (codes[keep], positions), binned[keep, 2].astype(np.int64))
+            totals = self._query(f'SELECT {d}, TOTAL({q}), MIN({q}), MAX({q}) FROM {TABLE}{where} GROUP BY 1',
+                                 params)
+            if totals:
+                totals = np.array(totals, dtype=np.float64)
+                codes = self._codes(dim, totals[:, 0].astype(np.int64))
+                keep = codes < groups
+                sums[codes[keep]], minimum[codes[keep]], maximum[codes[keep]] = totals[keep, 1:].T
+            sketches[dim] = HistogramSketch(dim, measure, edges, list(self.labels[dim]), counts, sums, minimum, maximum)
+        return sketches
+
+    def density(self, x_range, y_range, bins=DENSITY_BINS, log_x=False, group=None, selections=None,
+                value_range=None):
+        # 구간 번호 계산과 집계를 SQL로 (가져오는 행은 격자 칸 수 이하)
+        x, y = _quote(DENSITY_X), _quote(DENSITY_Y)
+        x_start, x_width, x_low, x_high = axis_scale(*x_range, bins, log_x)
+        y_start, y_width, y_low, y_high = axis_scale(*y_range, bins)
+        where, params = self._where(selections, value_range)
+        bounds = f'{x} BETWEEN ? AND ? AND {y} BETWEEN ? AND ?'
+        where = f'{where} AND {bounds}' if where else f' WHERE {bounds}'
+        scaled = f'ln({x})' if log_x else x
+        key = _quote(group) if group else '0'
+        sql = (f'SELECT {key}, MIN(CAST(({y} - ?) / ? AS INTEGER), {bins - 1}), '
+               f'MIN(CAST(({scaled} - ?) / ? AS INTEGER), {bins - 1}), COUNT(*) '
+               f'FROM {TABLE}{where} GROUP BY 1, 2, 3')
+        cells = np.array(self._query(sql, [y_start, y_width, x_start, x_width] + params
+                                     + [x_low, x_high, y_low, y_high]), dtype=np.int64).reshape(-1, 4)
+        groups = ['전체']
+        if group is not None:
+            groups = self.labels[group]
+            cells[:, 0] = self._codes(group, cells[:, 0])
+            cells = cells[cells[:, 0] < len(groups)]
+        return grid_from_cells(cells, x_range, y_range, bins, log_x, groups)
+
+    def _decode(self, data):
+        # 저장 코드를 category dtype으로 복원
+        for dim in self.dims:
+            codes = self._codes(dim, data[dim].to_numpy(dtype=np.int64))
+            codes[codes == len(self.labels[dim])] = -1
+            data[dim] = pd.Categorical.from_codes(codes, self.labels[dim])
+        return data
+
+    def page(self, selections=None, value_range=None, sort_by=SORT_COLUMNS[0], descending=True, search='',
+             page=0, page_rows=PAGE_ROWS, outliers_only=False):
+        # 정렬 컬럼 인덱스를 따라 LIMIT/OFFSET으로 한 페이지만 읽음
+        # 동순위는 행 순서(rowid)로, 결측은 마지막 (CSV 소스와 같은 순서)
+        # 점수 테이블이 있으면 rowid로 조인해 점수 컬럼을 붙이고 점수로도 정렬/이상치 선택
+        where, params = self._where(selections, value_range, 't.')
+        clauses = []
+        if search and SEARCH_COLUMN in self.columns:
+            pattern = '%' + search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append(f"CAST(t.{_quote(SEARCH_COLUMN)} AS TEXT) LIKE ? ESCAPE '\\'")
+            params = params + [pattern]
+        source, select = f'{TABLE} AS t', 't.*'
+        if self.has_scores:
+            source += f' LEFT JOIN {SCORE_TABLE} AS s ON s.row_id = t.rowid'
+            select += ''.join(f', s.{_quote(col)}' for col in SCORE_COLUMNS + [OUTLIER_COLUMN])
+            if outliers_only:
+                clauses.append(f's.{_quote(OUTLIER_COLUMN)} = 1')
+        for clause in clauses:
+            where = f'{where} AND {clause}' if where else f' WHERE {clause}'
+        direction = 'DESC' if descending else 'ASC'
+        order = f's.{_quote(sort_by)}' if sort_by in SCORE_COLUMNS and self.has_scores else f't.{_quote(sort_by)}'
+        sql = (f'SELECT {select} FROM {source}{where} '
+               f'ORDER BY {order} {direction} NULLS LAST, t.rowid {direction} LIMIT ? OFFSET ?')
+        with _connect(self.db_path) as conn:
+            total = conn.execute(f'SELECT COUNT(*) FROM {source}{where}', params).fetchone()[0]
+            data = pd.read_sql_query(sql, conn, params=params + [page_rows, page * page_rows])
+        if OUTLIER_COLUMN in data.columns:
+            data[OUTLIER_COLUMN] = data[OUTLIER_COLUMN].fillna(0).astype(bool)
+        return self._decode(data), total
+
+    def sample(self, rows=SAMPLE_ROWS, strata=STRATA, seed=0):
+        # 층별 모집단 수는 인덱스 GROUP BY로, 표본은 층별 확률로 한 번 스캔해 추출
+        # 난수 대신 rowid의 곱셈 해시를 써서 시드별로 재현 가능
+        strata = [dim for dim in strata if dim in self.dims]
+        keys = ', '.join(_quote(dim) for dim in strata)
+        groups = np.array(self._query(f'SELECT {keys}, COUNT(*) FROM {TABLE} GROUP BY {keys}'),
+                          dtype=np.int64).reshape(-1, len(strata) + 1)
+        shape = tuple(len(self.labels[dim]) + 1 for dim in strata)
+        flat = np.ravel_multi_index([self._codes(dim, groups[:, i]) for i, dim in enumerate(strata)], shape)
+        population = np.zeros(int(np.prod(shape)), dtype=np.int64)
+        np.add.at(population, flat, groups[:, -1])
+        rates = allocation_rates(population, rows)[flat]
+
+        columns = ', '.join(f'k{i}' for i in range(len(strata)))
+        values = ', '.join(['(' + ', '.join('?' * (len(strata) + 1)) + ')'] * len(groups))
+        join = ' AND '.join(f't.{_quote(dim)} = r.k{i}' for i, dim in enumerate(strata))
+        params = [value for row, rate in zip(groups[:, :-1].tolist(), rates.tolist()) for value in row + [rate]]
+        sql = (f'WITH r({columns}, rate) AS (VALUES {values}) '
+               f'SELECT t.* FROM {TABLE} AS t JOIN r ON {join} '
+               f'WHERE ((t.rowid * 2654435761 + ?) % 4294967296) / 4294967296.0 < r.rate')
+        with _connect(self.db_path) as conn:
+            data = pd.read_sql_query(sql, conn, params=params + [seed])
+        return StratifiedSample(self._decode(data), strata, population.reshape(shape))
+
+    def load(self):
+        # 전체 행 (메모리에 들어가는 크기에서만 사용, CSV 소스와 같은 축소 타입)
+        with _connect(self.db_path) as conn:
+            return compact_frame(self._decode(pd.read_sql_query(f'SELECT * FROM {TABLE}', conn)))
+
+
+def _write_scores(conn):
+    # 동료 집단 점수는 전체 행의 순위가 필요해 적재가 끝난 뒤 집단/측정값 컬럼만 읽어 한 번에 계산
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_info({TABLE})')]
+    needed = [col for col in PEER_DIMENSIONS + SCORE_MEASURES if col in columns]
+    frame = pd.read_sql_query(f'SELECT rowid AS row_id, {", ".join(map(_quote, needed))} FROM {TABLE}', conn)
+    for dim in PEER_DIMENSIONS:
+        if dim in frame.columns:
+            frame[dim] = frame[dim].where(frame[dim] != MISSING_CODE).astype('category')
+    scores = peer_scores(frame)
+    scores.insert(0, 'row_id', frame['row_id'])
+    definitions = ', '.join(f'{_quote(col)} REAL' for col in SCORE_COLUMNS)
+    conn.execute(f'CREATE TABLE {SCORE_TABLE} (row_id INTEGER PRIMARY KEY, {definitions}, '
+                 f'{_quote(OUTLIER_COLUMN)} INTEGER)')
+    scores.to_sql(SCORE_TABLE, conn, if_exists='append', index=False)
+    for i, col in enumerate(SCORE_COLUMNS + [OUTLIER_COLUMN]):
+        conn.execute(f'CREATE INDEX idx_score_{i} ON {SCORE_TABLE} ({_quote(col)})')
+
+
+def ingest(csv_path=DATA_PATH, db_path=SQLITE_PATH, chunksize=CHUNK_ROWS):
+    # CSV를 청크 단위로 읽어 SQLite에 적재 (임시 파일에 쓴 뒤 교체)
+    signature, digest = file_signature(csv_path), file_hash(csv_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    tmp = f'{db_path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    dictionaries = {}
+    rows, quarantine = 0, {}
+    conn = _connect(tmp, readonly=False)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        # 청크마다 스키마 검증 (격리된 행은 DB와 같은 디렉터리에 보관)
+        for index, raw in enumerate(pd.read_csv(csv_path, chunksize=chunksize,
+                                                dtype={col: 'category' for col in CATEGORY_COLUMNS})):
+            validated = validate(raw)
+            chunk = validated.data
+            quarantine = merge_counts(quarantine, validated.counts)
+            write_quarantine(validated.quarantined, csv_path, os.path.dirname(os.path.abspath(db_path)),
+                             append=index > 0)
+            for dim in DIMENSIONS:
+                if dim not in chunk.columns:
+                    continue
+                # 처음 나온 순서대로 코드 부여 (청크 사이에 사전 공유)
+                known = dictionaries.setdefault(dim, {})
+                for label in chunk[dim].dropna().unique():
+                    known.setdefault(label, len(known))
+                chunk[dim] = chunk[dim].astype(object).map(known).fillna(MISSING_CODE).astype(np.int64)
+            chunk.to_sql(TABLE, conn, if_exists='append' if rows else 'replace', index=False)
+            rows += len(chunk)
+
+        _write_scores(conn)
+        conn.execute(f'CREATE TABLE {LABEL_TABLE} (dimension TEXT, code INTEGER, label TEXT)')
+        conn.executemany(f'INSERT INTO {LABEL_TABLE} VALUES (?, ?, ?)', [
+            (dim, code, str(label)) for dim, known in dictionaries.items() for label, code in known.items()
+        ])
+        conn.execute(f'CREATE TABLE {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)')
+        conn.executemany(f'INSERT INTO {META_TABLE} VALUES (?, ?)', [
+            ('hash', digest), ('size', str(signature['size'])), ('mtime_ns', str(signature['mtime_ns'])),
+            ('rows', str(rows)), ('source', os.path.abspath(csv_path)),
+            ('quarantine', json.dumps(counts_to_json(quarantine), ensure_ascii=False)),
+            ('score_version', str(SCORE_VERSION)),
+            ('created_at', time.strftime('%Y-%m-%dT%H:%M:%S')),
+        ])
+
+        # 차원별 인덱스와 전체 큐브 GROUP BY용 커버링 인덱스
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({TABLE})')]
+        dims = [dim for dim in DIMENSIONS if dim in columns]
+        for i, dim in enumerate(dims):
+            conn.execute(f'CREATE INDEX idx_dim_{i} ON {TABLE} ({_quote(dim)})')
+        # 범위 필터와 상세 조회 정렬용 인덱스
+        for i, col in enumerate(dict.fromkeys([RANGE_COLUMN] + SORT_COLUMNS)):
+            if col in columns:
+                conn.execute(f'CREATE INDEX idx_sort_{i} ON {TABLE} ({_quote(col)})')
+        covering = dims + [m for m in MEASURES if m in columns]
+        conn.execute(f'CREATE INDEX idx_cube ON {TABLE} ({", ".join(map(_quote, covering))})')
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, db_path)
+    return rows
+
+
+def open_source(kind=SOURCE_KIND):
+    if kind == 'sqlite':
+        return SqliteSource(SQLITE_PATH)
+    if kind == 'csv':
+        return CsvSource(DATA_PATH, CACHE_DIR)
+    raise ValueError(f'알 수 없는 데이터 소스: {kind}')
+
+
+# 프로세스가 공유하는 최신 소스 (종류별 하나)
+_current = {}
+_current_lock = threading.Lock()
+
+
+def current_source(kind=SOURCE_KIND):
+    # 호출할 때마다 원본 변경을 확인 (크기/수정 시각 비교라 변경이 없으면 stat 한 번)
+    # 바뀌었으면 refreshed()로 만든 새 소스로 교체하고, 이전 소스를 쓰던 실행은 그대로 끝까지 진행
+    with _current_lock:
+        source = _current.get(kind)
+        _current[kind] = source = open_source(kind) if source is None else source.refreshed()
+        return source
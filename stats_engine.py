@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from aggregation import category_codes
+from schema import IDENTIFIER_COLUMNS
+
+# 상관관계 해석 기준 (|r| 기준)
+STRONG_CORRELATION = 0.5
+MODERATE_CORRELATION = 0.3
+BATCH_ROWS = 1_000_000
+
+
+def numeric_frame(df):
+    # 수치형 컬럼 (비율/금액 문자열은 로드 단계의 스키마 검증에서 이미 숫자로 변환됨)
+    # 고객번호 같은 식별자는 숫자여도 측정값이 아니므로 제외
+    columns = {col: df[col].astype(np.float64) for col in df.columns
+               if pd.api.types.is_numeric_dtype(df[col]) and col not in IDENTIFIER_COLUMNS}
+    return pd.DataFrame(columns, index=df.index)
+
+
+def pairwise_correlations(values, names, codes=None, group_labels=None):
+    # 모든 변수 쌍 × 모든 그룹의 피어슨 상관계수와 p-value를 한 번에 계산
+    # 결측은 쌍별로 제외 (pearsonr에 dropna한 데이터를 넣은 것과 동일)
+    values = np.asarray(values, dtype=np.float64)
+    rows, width = values.shape
+    if codes is None:
+        codes, group_labels = np.zeros(rows, dtype=np.int64), ['전체']
+    groups = len(group_labels)
+    in_group = codes < groups
+    codes, values = codes[in_group], values[in_group]
+
+    # 전체 평균으로 중심화해 큰 금액의 상쇄 오차를 줄임
+    means = np.nanmean(values, axis=0) if rows else np.zeros(width)
+    first, second = np.triu_indices(width, k=1)
+    pairs = len(first)
+    size = groups * pairs
+
+    # (그룹, 변수쌍) 셀별 모멘트를 행 배치마다 bincount로 누적
+    moments = np.zeros((6, size))
+    for start in range(0, len(values), BATCH_ROWS):
+        batch = values[start:start + BATCH_ROWS]
+        valid = ~np.isnan(batch)
+        centered = np.where(valid, batch - means, 0.0)
+        both = valid[:, first] & valid[:, second]
+        x = np.where(both, centered[:, first], 0.0)
+        y = np.where(both, centered[:, second], 0.0)
+        cells = (codes[start:start + BATCH_ROWS, None] * pairs + np.arange(pairs)[None, :]).ravel()
+        for i, weights in enumerate((both, x, y, x * x, y * y, x * y)):
+            moments[i] += np.bincount(cells, weights=weights.ravel().astype(np.float64), minlength=size)
+    n, sx, sy, sxx, syy, sxy = moments.reshape(6, groups, pairs)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+        dof = n - 2
+        t = r * np.sqrt(dof / np.maximum(1.0 - r * r, 1e-300))
+    # scipy는 import가 무거워 상관관계를 처음 계산할 때 읽음
+    from scipy import stats
+
+    p = np.where(dof > 0, 2 * stats.t.sf(np.abs(t), np.maximum(dof, 1)), np.nan)
+    p = np.where(np.abs(r) == 1.0, 0.0, p)
+
+    names = np.asarray(names, dtype=object)
+    result = pd.DataFrame({
+        '그룹': np.repeat(np.asarray(group_labels, dtype=object), pairs),
+        '변수1': np.tile(names[first], groups),
+        '변수2': np.tile(names[second], groups),
+        '상관계수': r.ravel(),
+        'P-value': p.ravel(),
+        '데이터 수': n.ravel().astype(np.int64),
+    })
+    return result[result['데이터 수'] > 2].reset_index(drop=True)
+
+
+def correlation_table(df, group_dim=None):
+    # 수치형 측정값 컬럼의 쌍별 상관관계 (group_dim을 주면 그룹별로)
+    numeric = numeric_frame(df)
+    codes, labels = (None, None) if group_dim is None else category_codes(df[group_dim])
+    result = pairwise_correlations(numeric.to_numpy(), list(numeric.columns), codes, labels)
+    strength = np.abs(result['상관계수'].to_numpy())
+    result['분석 항목'] = result['변수1'] + '와(과) ' + result['변수2']
+    result['해석'] = np.select(
+        [strength > STRONG_CORRELATION, strength > MODERATE_CORRELATION],
+        ['강한 상관관계', '중간 상관관계'],
+        '약한 상관관계'
+    )
+    return result
+
+
+def correlation_html(result, show_group=False):
+    # 행 반복 없이 컬럼 단위 문자열 연산으로 HTML 테이블 생성
+    columns = (['그룹'] if show_group else []) + ['분석 항목', '상관계수', 'P-value', '해석', '데이터 수']
+    cells = {
+        '그룹': result['그룹'].astype(str),
+        '분석 항목': result['분석 항목'].astype(str),
+        '상관계수': result['상관계수'].round(4).astype(str),
+        'P-value': result['P-value'].round(4).astype(str),
+        '해석': result['해석'].astype(str),
+        '데이터 수': result['데이터 수'].map('{:,}'.format),
+    }
+    body = pd.Series('<tr>', index=result.index)
+    for col in columns:
+        body = body + '<td>' + cells[col] + '</td>'
+    header = ''.join(f'<th>{col}</th>' for col in columns)
+    return f"<table class='correlation-table'><tr>{header}</tr>{''.join(body + '</tr>')}</table>"
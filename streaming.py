@@ -0,0 +1,68 @@
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from aggregation import DIMENSIONS, MEASURES, HistogramSketch, build_cube
+from data_store import DATA_PATH
+from schema import merge_counts, validate
+
+# 청크 단위로 읽어 병합 가능한 집계만 유지하는 스트리밍 로더
+CHUNK_ROWS = int(os.environ.get('DASHBOARD_CHUNK_ROWS', 500_000))
+# 이 크기를 넘는 파일은 원본 행을 메모리에 올리지 않음
+STREAMING_THRESHOLD_BYTES = int(os.environ.get('DASHBOARD_STREAMING_BYTES', 2 * 1024 ** 3))
+
+# 박스플롯 스케치를 유지할 차원과 측정값
+BOX_DIMENSIONS = ['투자성향', '연령대', '자산규모']
+BOX_MEASURE = '안전자산비율'
+
+# quarantine: 스키마 검증에서 격리된 (컬럼, 사유)별 행 수
+StreamingAggregates = namedtuple('StreamingAggregates', ['cube', 'sketches', 'rows', 'quarantine'])
+
+
+def use_streaming(path=DATA_PATH):
+    # DASHBOARD_STREAMING=1 이거나 파일이 임계값보다 크면 스트리밍 모드
+    flag = os.environ.get('DASHBOARD_STREAMING')
+    if flag is not None:
+        return flag == '1'
+    return os.path.getsize(path) > STREAMING_THRESHOLD_BYTES
+
+
+def iter_chunks(path=DATA_PATH, chunksize=CHUNK_ROWS):
+    # 집계에 필요한 컬럼만 범주형으로 읽고 청크마다 스키마 검증 (schema.Validated)
+    needed = set(DIMENSIONS) | set(MEASURES)
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = {col: 'category' for col in DIMENSIONS if col in header}
+    for chunk in pd.read_csv(path, usecols=[c for c in header if c in needed], dtype=dtype, chunksize=chunksize):
+        yield validate(chunk)
+
+
+def fold_chunk(aggregates, chunk, box_dims=BOX_DIMENSIONS, box_measure=BOX_MEASURE, quarantine=None):
+    # 검증을 거친 청크 하나를 누적 집계에 병합
+    quarantine = quarantine or {}
+    cube = build_cube(chunk)
+    sketches = {}
+    if box_measure in chunk.columns:
+        sketches = {dim: HistogramSketch.from_frame(chunk, dim, box_measure)
+                    for dim in box_dims if dim in chunk.columns}
+    if aggregates is None:
+        return StreamingAggregates(cube, sketches, len(chunk), quarantine)
+    return StreamingAggregates(
+        aggregates.cube.merge(cube),
+        {dim: aggregates.sketches[dim].merge(sketch) for dim, sketch in sketches.items()},
+        aggregates.rows + len(chunk),
+        merge_counts(aggregates.quarantine, quarantine),
+    )
+
+
+def stream_aggregates(path=DATA_PATH, chunksize=CHUNK_ROWS):
+    # 파일 크기와 무관하게 청크 하나 + 집계 크기의 메모리만 사용
+    aggregates = None
+    for validated in iter_chunks(path, chunksize):
+        aggregates = fold_chunk(aggregates, validated.data, quarantine=validated.counts)
+    if aggregates is None:
+        # 헤더만 있는 파일
+        header = pd.read_csv(path, nrows=0).columns
+        dtype = {col: 'category' for col in DIMENSIONS if col in header}
+        aggregates = fold_chunk(None, validate(pd.read_csv(path, nrows=0, dtype=dtype)).data)
+    return aggregates
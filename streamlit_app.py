@@ -1,10 +1,32 @@
+import time
+
+# 스크립트 시작 시각 (첫 실행의 모듈 import 시간까지 계측)
+SCRIPT_STARTED = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.cluster import KMeans
-from scipy import stats
+
+from aggregation import compute_kpis
+from approximate import refine, sample_cube, sample_sketches, use_approximate
+from charts import change_bar_chart, change_heatmap_chart, density_chart, get_chart_layout
+from density import DENSITY_BINS, DENSITY_GROUP, DENSITY_X, DENSITY_Y, MAX_DENSITY_BINS
+from drilldown import PAGE_ROWS, SORT_COLUMNS
+from figures import start_pool
+from filters import filter_key
+from history import (ANALYSIS_DATE, count_changes, display_date, history_stamp, kpi_changes, load_period,
+                     mean_changes, period_context, share_changes)
+from precompute import load_snapshot, snapshot_context, snapshot_stamp
+from profiling import Profiler, profiling_enabled
+from scoring import LOG_MEASURES, MAD_SCALE, OUTLIER_Z, PEER_DIMENSIONS, SCORE_COLUMN, SCORE_COLUMNS, TOP_OUTLIERS
+from sections import (CORRELATION_GROUPS, CROSSTAB_VALUES, TAB_SECTIONS, SectionContext, exact_context, load_figure,
+                      prefetch_sections, section_payload, seed_sections, source_context)
+from segmentation import start_sweep, sweep_results
+from sources import SOURCE_KIND, current_source
+from stats_engine import correlation_html
+from warmup import warm_context, warm_snapshot
 
 # 페이지 설정
 st.set_page_config(
@@ -32,58 +54,157 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
-# 공통 차트 스타일 설정
-CHART_THEME = 'seaborn'
-COLOR_PALETTE = px.colors.qualitative.Set3
-TEMPLATE = 'plotly_white'
-
-def prepare_heatmap_data(df, row_col, col_col):
-    # 크로스탭 생성
-    cross_tab = pd.crosstab(df[row_col], df[col_col])
-    # 값을 float 타입으로 변환
-    cross_tab = cross_tab.astype(float)
-    return cross_tab
-
-def get_chart_layout(title='', legend_position='default'):
-    layout = dict(
-        title=title,
-        template=TEMPLATE,
-        title_x=0.5,
-        font=dict(family="Malgun Gothic", size=12),
-        margin=dict(t=50, l=50, r=50, b=50),
-        height=500,  # 모든 차트의 높이를 500px로 통일
-        showlegend=True
-    )
-    
-    if legend_position == 'default':
-        layout['legend'] = dict(
-            orientation="v",
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=1.02
+# 사전 계산 스냅샷 (python -m cli precompute, 원본이 바뀌면 None)
+@st.cache_resource(max_entries=1)
+def load_precomputed(stamp):
+    if stamp is None:
+        return None
+    return warm_snapshot(stamp) or load_snapshot()
+
+# 탭 렌더링 입력 (데이터 지문과 필터 조합별로 프로세스 전체가 공유)
+@st.cache_resource(max_entries=16)
+def load_section_context(fingerprint, selections=(), value_range=None, _source=None, _snapshot=None):
+    if not filter_key(dict(selections), value_range):
+        warmed_ctx = warm_context(fingerprint)
+        if warmed_ctx is not None:
+            return warmed_ctx
+    if _snapshot is not None and not filter_key(dict(selections), value_range):
+        # 스냅샷으로 바로 그리고, 원본 행은 필요한 탭에서만 읽음
+        ctx = snapshot_context(_snapshot, _source.load if _source.has_rows else None)
+        seed_sections(ctx, _snapshot.figures)
+        return ctx
+    return source_context(_source, dict(selections), value_range)
+
+# 근사 모드의 첫 화면 (층화 표본을 가중치로 키운 큐브와 박스플롯 스케치)
+@st.cache_resource(max_entries=2)
+def load_approximate_context(fingerprint, _source=None):
+    sample = _source.sample()
+    return SectionContext(f'{fingerprint}:approx', sample_cube(sample),
+                          sketches=sample_sketches(sample), sample=sample)
+
+# 저장된 과거 기준일의 탭 렌더링 입력 (python -m cli period, 저장소가 바뀌면 다시 읽음)
+@st.cache_resource(max_entries=8)
+def load_period_context(date, stamp):
+    period = load_period(date)
+    return period_context(period) if period is not None else None
+
+# 고급 분석 밀도 차트 JSON (필터와 확대 범위, 구간 설정별로 프로세스 전체가 공유)
+@st.cache_resource(max_entries=32)
+def load_density_figure(fingerprint, selections, value_range, x_range, y_range, bins, log_x, group, _source=None):
+    grid = _source.density(x_range, y_range, bins, log_x, group, dict(selections), value_range)
+    return density_chart(grid, '안전자산비율과 총평가금액의 관계', DENSITY_X, DENSITY_Y).to_json()
+
+# 성능 계측 (?profile=1 또는 DASHBOARD_PROFILE=1, 섹션별 메모리는 DASHBOARD_PROFILE_MEMORY=1일 때만)
+profiler = Profiler(profiling_enabled(st.query_params.get('profile')), started=SCRIPT_STARTED)
+profiler.mark('모듈 import / 페이지 설정')
+# 차트 작업자 프로세스는 첫 실행에서 띄우고, 준비되기 전까지는 스크립트 스레드에서 그림
+start_pool()
+
+with profiler.section('데이터 로드 / 필터'):
+    # 데이터 소스 (DASHBOARD_SOURCE=sqlite이면 python -m cli ingest로 만든 DB에 집계를 위임)
+    # 실행마다 원본 변경을 확인해, 뒤에 행만 추가됐으면 추가분만 읽어 병합한 소스로 교체
+    data_source = current_source(SOURCE_KIND)
+    # 최신 스냅샷이 있으면 원본을 읽지 않고 시작 (CSV 소스만)
+    snapshot = load_precomputed(snapshot_stamp()) if data_source.kind == 'csv' else None
+    fingerprint = snapshot.fingerprint if snapshot is not None else data_source.fingerprint()
+    selections, value_range = (), None
+
+    # 분석일자와 비교일 (현재 원본은 ANALYSIS_DATE, 나머지는 저장된 기준일별 큐브)
+    periods = history_stamp()
+    period_dates = sorted({ANALYSIS_DATE} | {date for date, _ in periods}, reverse=True)
+    analysis_date, compare_date = ANALYSIS_DATE, None
+    if len(period_dates) > 1:
+        st.sidebar.header('분석일자')
+        date_labels = {display_date(date): date for date in period_dates}
+        analysis_date = date_labels[st.sidebar.selectbox(
+            '분석일자', list(date_labels), period_dates.index(ANALYSIS_DATE), key='analysis_date')]
+        compare_labels = {'비교 안 함': None}
+        compare_labels.update((label, date) for label, date in date_labels.items() if date != analysis_date)
+        earlier = [label for label, date in compare_labels.items() if date is not None and date < analysis_date]
+        compare_date = compare_labels[st.sidebar.selectbox(
+            '비교일', list(compare_labels), list(compare_labels).index(earlier[0]) if earlier else 0,
+            key=f'compare_date_{analysis_date}'
+        )]
+    historical = analysis_date != ANALYSIS_DATE
+
+    # 큰 데이터는 표본 근사값으로 먼저 그리고, 정확한 집계는 백그라운드에서 계산 후 다시 그림
+    progressive = (snapshot is None and data_source.supports_sampling
+                   and use_approximate(data_source.row_count()))
+    approximate = False
+    live_ctx = None
+    if not historical or compare_date == ANALYSIS_DATE:
+        if progressive:
+            exact_future = refine(fingerprint, lambda: exact_context(data_source))
+            approximate = not exact_future.done()
+            live_ctx = (load_approximate_context(fingerprint, _source=data_source) if approximate
+                        else exact_future.result())
+        else:
+            live_ctx = load_section_context(fingerprint, _source=data_source, _snapshot=snapshot)
+
+    base_ctx = load_period_context(analysis_date, periods) if historical else live_ctx
+    if base_ctx is None:
+        st.error(f'{display_date(analysis_date)} 기준일 데이터를 읽을 수 없습니다.')
+        st.stop()
+    # 비교일의 전체 큐브 (현재 원본이면 필터 전 큐브)
+    compare_cube = None
+    if compare_date == ANALYSIS_DATE:
+        compare_cube = live_ctx.cube
+    elif compare_date is not None:
+        compare_ctx = load_period_context(compare_date, periods)
+        compare_cube = compare_ctx.cube if compare_ctx is not None else None
+
+    # 사이드바 필터 (선택지는 전체 집계 큐브에서)
+    st.sidebar.header('필터')
+    if historical:
+        st.sidebar.info('과거 기준일은 저장된 집계로 표시되어 필터를 사용할 수 없습니다.')
+        section_ctx = base_ctx
+    elif not data_source.supports_filters:
+        st.sidebar.info('스트리밍 모드나 스냅샷 전용 배포에서는 필터를 사용할 수 없습니다.')
+        section_ctx = base_ctx
+    elif approximate:
+        st.sidebar.info('정확한 집계가 끝나면 필터를 사용할 수 있습니다.')
+        section_ctx = base_ctx
+    else:
+        base_cube = base_ctx.cube
+        selections = tuple(
+            (dim, tuple(st.sidebar.multiselect(dim, labels, key=f'filter_{dim}')))
+            for dim, labels in base_cube.labels.items()
         )
-    elif legend_position == 'bottom':
-        layout['legend'] = dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.2,
-            xanchor="center",
-            x=0.5
+        overall = base_cube.overall('총평가금액')
+        low, high = overall['min'], overall['max']
+        value_range = st.sidebar.slider(
+            '총평가금액 범위 (원)',
+            min_value=int(np.floor(low)),
+            max_value=int(np.ceil(high)),
+            value=(int(np.floor(low)), int(np.ceil(high))),
+            key='filter_value_range'
         )
-    
-    return layout
+        if value_range == (int(np.floor(low)), int(np.ceil(high))):
+            value_range = None
+        section_ctx = load_section_context(fingerprint, selections, value_range, _source=data_source,
+                                           _snapshot=snapshot)
 
-# 데이터 로드
-@st.cache_data
-def load_data():
-    data = pd.read_csv('random_dataset.csv')
-    return data
+    # 로드 단계의 스키마 검증 결과 (격리된 행은 분석에서 제외, 경고는 건수만 표시)
+    quarantine = data_source.quarantine()
+    if not historical and not quarantine.empty:
+        action_counts = quarantine.groupby('조치')['행 수'].sum()
+        with st.sidebar.expander(f"⚠️ 데이터 검증: 격리 {action_counts.get('격리', 0):,}건, "
+                                 f"경고 {action_counts.get('경고', 0):,}건"):
+            st.dataframe(quarantine, use_container_width=True, hide_index=True)
+            st.caption('해석할 수 없거나 범위를 벗어난 값이 있는 행은 분석에서 제외됩니다. '
+                       '코드표에 없는 범주는 그대로 분석에 포함됩니다.')
 
-data = load_data()
+cube = section_ctx.cube
+if cube.total_count() == 0:
+    st.warning('선택한 조건에 해당하는 고객이 없습니다.')
+    st.stop()
 
 # Streamlit 앱 시작
 st.title('고객 분석 종합 대시보드')
+# 근사 모드 안내 (정확한 집계가 끝나면 페이지를 다시 그림)
+refine_status = st.empty()
+if approximate:
+    refine_status.info(f'층화 표본 {len(section_ctx.sample.data):,}명 기반 근사값입니다. 정확한 값을 계산하는 중입니다.')
 
 # KPI 섹션 스타일
 st.markdown("""
@@ -122,488 +243,443 @@ st.markdown("""
         font-size: 24px;
         margin-bottom: 10px;
     }
+    .kpi-note {
+        font-size: 14px;
+        color: #7f8c8d;
+        margin-top: 6px;
+    }
 </style>
 """, unsafe_allow_html=True)
 
-# KPI 데이터 계산
-total_customers = len(data)
-avg_total_value = data['총평가금액'].mean()
-max_total_value = data['총평가금액'].max()
-min_total_value = data['총평가금액'].min()
-aggressive_investors_ratio = (data['투자성향'] == '5:공격투자형').mean()
-
-# 각 투자성향별 고객 수 계산
-investor_counts = data['투자성향'].value_counts()
-max_investor_type = investor_counts.idxmax()
-min_investor_type = investor_counts.idxmin()
-
-# 각 연령대별 고객 수 계산
-age_group_counts = data['연령대'].value_counts()
-max_age_group = age_group_counts.idxmax()
-min_age_group = age_group_counts.idxmin()
-
-# 각 지역별 고객 수 계산
-region_counts = data['지역명'].value_counts()
-max_region = region_counts.idxmax()
-min_region = region_counts.idxmin()
-
-# KPI 카드 생성
-st.markdown("<h2 style='text-align: left;'>1. 주요 고객 지표 (KPI)</h2>", unsafe_allow_html=True)
-st.markdown("<p style='text-align: left; font-size: 25px;'>분석일자 : 2024/09/30</p>", unsafe_allow_html=True)
-
-kpi_html = f"""
-<div class="kpi-container">
-    <div class="kpi-card">
-        <div class="kpi-icon">👥</div>
-        <div class="kpi-title">총 고객 수</div>
-        <div class="kpi-value">{total_customers:,}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">💰</div>
-        <div class="kpi-title">평균 총평가금액</div>
-        <div class="kpi-value">₩{avg_total_value:,.0f}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">📈</div>
-        <div class="kpi-title">최대 총평가금액</div>
-        <div class="kpi-value">₩{max_total_value:,.0f}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">📉</div>
-        <div class="kpi-title">최소 총평가금액</div>
-        <div class="kpi-value">₩{min_total_value:,.0f}</div>
-    </div>
-</div>
-<div class="kpi-container">
-    <div class="kpi-card">
-        <div class="kpi-icon">📊</div>
-        <div class="kpi-title">최다 투자성향</div>
-        <div class="kpi-value">{max_investor_type}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">📉</div>
-        <div class="kpi-title">최소 투자성향</div>
-        <div class="kpi-value">{min_investor_type}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">🧓</div>
-        <div class="kpi-title">최다 연령대</div>
-        <div class="kpi-value">{max_age_group}</div>
-    </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">👶</div>
-        <div class="kpi-title">최소 연령대</div>
-        <div class="kpi-value">{min_age_group}</div>
+with profiler.section('KPI'):
+    # KPI 데이터 계산 (집계 큐브 조회)
+    kpis = compute_kpis(cube)
+    # 근사값에는 95% 신뢰구간 (최대/최소는 표본 값)
+    kpi_notes = dict.fromkeys(['total_customers', 'avg_total_value', 'max_total_value', 'min_total_value'], '')
+    if section_ctx.sample is not None:
+        half_width = section_ctx.mean_interval(None, '총평가금액').iloc[0]
+        kpi_notes['avg_total_value'] = f"<div class='kpi-note'>± ₩{half_width:,.0f} (95% 신뢰구간)</div>"
+        kpi_notes['max_total_value'] = kpi_notes['min_total_value'] = "<div class='kpi-note'>표본 기준</div>"
+
+    # 비교일 대비 증감 (양쪽 큐브에 같은 범주 필터를 적용해 차감, 금액 범위 필터는 큐브로 적용할 수 없어 생략)
+    comparable = compare_cube is not None and value_range is None
+    if comparable:
+        current_cube = base_ctx.cube.select(dict(selections))
+        previous_cube = compare_cube.select(dict(selections))
+        changes = kpi_changes(current_cube, previous_cube)
+        for name, (_, delta) in changes.items():
+            if name == 'aggressive_investors_ratio':
+                continue
+            if name == 'total_customers':
+                text = f'{delta:+,}명'
+            else:
+                text = f"{'+' if delta >= 0 else '-'}₩{abs(delta):,.0f}"
+            color = '#d62728' if delta > 0 else '#1f77b4' if delta < 0 else '#7f8c8d'
+            kpi_notes[name] = (kpi_notes.get(name, '')
+                               + f"<div class='kpi-note' style='color: {color};'>{display_date(compare_date)} 대비 "
+                                 f"{text}</div>")
+
+    # KPI 카드 생성
+    st.markdown("<h2 style='text-align: left;'>1. 주요 고객 지표 (KPI)</h2>", unsafe_allow_html=True)
+    compare_text = f' (비교일 : {display_date(compare_date)})' if compare_date is not None else ''
+    st.markdown(f"<p style='text-align: left; font-size: 25px;'>분석일자 : {display_date(analysis_date)}{compare_text}</p>",
+                unsafe_allow_html=True)
+
+    kpi_html = f"""
+    <div class="kpi-container">
+        <div class="kpi-card">
+            <div class="kpi-icon">👥</div>
+            <div class="kpi-title">총 고객 수</div>
+            <div class="kpi-value">{kpis['total_customers']:,}</div>
+            {kpi_notes['total_customers']}
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">💰</div>
+            <div class="kpi-title">평균 총평가금액</div>
+            <div class="kpi-value">₩{kpis['avg_total_value']:,.0f}</div>
+            {kpi_notes['avg_total_value']}
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">📈</div>
+            <div class="kpi-title">최대 총평가금액</div>
+            <div class="kpi-value">₩{kpis['max_total_value']:,.0f}</div>
+            {kpi_notes['max_total_value']}
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">📉</div>
+            <div class="kpi-title">최소 총평가금액</div>
+            <div class="kpi-value">₩{kpis['min_total_value']:,.0f}</div>
+            {kpi_notes['min_total_value']}
+        </div>
     </div>
-</div>
-<div class="kpi-container">
-    <div class="kpi-card">
-        <div class="kpi-icon">📍</div>
-        <div class="kpi-title">최다 거주지역</div>
-        <div class="kpi-value">{max_region}</div>
+    <div class="kpi-container">
+        <div class="kpi-card">
+            <div class="kpi-icon">📊</div>
+            <div class="kpi-title">최다 투자성향</div>
+            <div class="kpi-value">{kpis['max_investor_type']}</div>
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">📉</div>
+            <div class="kpi-title">최소 투자성향</div>
+            <div class="kpi-value">{kpis['min_investor_type']}</div>
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">🧓</div>
+            <div class="kpi-title">최다 연령대</div>
+            <div class="kpi-value">{kpis['max_age_group']}</div>
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">👶</div>
+            <div class="kpi-title">최소 연령대</div>
+            <div class="kpi-value">{kpis['min_age_group']}</div>
+        </div>
     </div>
-    <div class="kpi-card">
-        <div class="kpi-icon">🗺️</div>
-        <div class="kpi-title">최소 거주지역</div>
-        <div class="kpi-value">{min_region}</div>
+    <div class="kpi-container">
+        <div class="kpi-card">
+            <div class="kpi-icon">📍</div>
+            <div class="kpi-title">최다 거주지역</div>
+            <div class="kpi-value">{kpis['max_region']}</div>
+        </div>
+        <div class="kpi-card">
+            <div class="kpi-icon">🗺️</div>
+            <div class="kpi-title">최소 거주지역</div>
+            <div class="kpi-value">{kpis['min_region']}</div>
+        </div>
     </div>
-</div>
-"""
+    """
+
+    st.markdown(kpi_html, unsafe_allow_html=True)
+
+# 기간 비교 (두 기준일 큐브의 차이만으로 계산, 원본 추출본은 다시 읽지 않음)
+if compare_date is not None:
+    with profiler.section('기간 비교'):
+        st.subheader(f'{display_date(compare_date)} 대비 변화')
+        if compare_cube is None:
+            st.warning(f'{display_date(compare_date)} 기준일 데이터를 읽을 수 없습니다.')
+        elif not comparable:
+            st.info('총평가금액 범위 필터는 저장된 집계에 적용할 수 없어 기간 비교를 표시하지 않습니다.')
+        else:
+            ratio_delta = changes['aggressive_investors_ratio'][1] * 100
+            st.caption(f'공격투자형 비율 {changes["aggressive_investors_ratio"][0]:.1%} '
+                       f'({ratio_delta:+.1f}%p)')
+            change_dim = st.selectbox('비교 기준', ['지역명', '투자성향', '연령대', '자산규모'], key='change_dim')
+            col1, col2 = st.columns(2)
+            with col1:
+                counts_delta = count_changes(current_cube, previous_cube, change_dim)['증감']
+                st.plotly_chart(change_bar_chart(counts_delta, f'{change_dim}별 고객 수 증감', change_dim,
+                                                 '증감 (명)', '%{y:+,}명'), use_container_width=True)
+            with col2:
+                means_delta = mean_changes(current_cube, previous_cube, change_dim, '총평가금액')
+                st.plotly_chart(change_bar_chart(means_delta, f'{change_dim}별 평균 총평가금액 증감', change_dim,
+                                                 '증감 (원)', '₩%{y:+,.0f}'), use_container_width=True)
+            style_shift = share_changes(current_cube, previous_cube, '지역명', '투자성향')
+            st.plotly_chart(change_heatmap_chart(style_shift, '지역별 투자성향 구성비 변화', '투자성향', '지역명'),
+                            use_container_width=True)
 
-st.markdown(kpi_html, unsafe_allow_html=True)
 # 고객 상세 분석
 st.header('2.고객 상세 분석')
 
-# 탭 생성
-tabs = st.tabs(['💰투자성향 분석', '👨연령대 분석', '🏙️지역 분석', '💵자산 분석'])
-
-# 투자성향 분석의 파이 차트 부분 수정
-with tabs[0]:
-    st.subheader('투자성향 분석')
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 투자성향 분포 (파이 차트)
-        investment_style = data['투자성향'].value_counts()
-        fig_style = px.pie(
-            values=investment_style.values,
-            names=investment_style.index,
-            color_discrete_sequence=COLOR_PALETTE,
-            title='투자성향 분포'
-        )
-        fig_style.update_layout(**get_chart_layout('투자성향 분포', 'bottom'))
-        st.plotly_chart(fig_style, use_container_width=True)
-    with col2:
-        # 투자성향별 안전자산 비율 분포
-        fig_style_safe = px.box(
-            data,
-            x='투자성향',
-            y='안전자산비율',
-            title='투자성향별 안전자산 비율 분포',
-            labels={'x': '투자성향', 'y': '안전자산비율 (%)'},
-            color='투자성향',
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_style_safe.update_layout(**get_chart_layout('투자성향별 안전자산 비율 분포'))
-        st.plotly_chart(fig_style_safe, use_container_width=True)
-    # 투자성향별 평균 자산
-    style_asset_avg = data.groupby('투자성향')['총평가금액'].mean().sort_values(ascending=False)
-    fig_style_asset = px.bar(
-        x=style_asset_avg.index,
-        y=style_asset_avg.values,
-        title='투자성향별 평균 자산',
-        labels={'x': '투자성향', 'y': '평균 총평가금액 (원)'},
-        color=style_asset_avg.index,
-        color_discrete_sequence=COLOR_PALETTE
-    )
-    fig_style_asset.update_layout(**get_chart_layout('투자성향별 평균 자산'))
-    fig_style_asset.update_traces(texttemplate='₩%{y:,.0f}', textposition='outside')
-    st.plotly_chart(fig_style_asset, use_container_width=True)
-
-with tabs[1]:
-    st.subheader('연령대 분석')
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 연령대별 평균 자산 규모
-        age_asset_avg = data.groupby('연령대')['총평가금액'].mean().sort_values(ascending=False)
-        fig_age_asset = px.bar(
-            x=age_asset_avg.index,
-            y=age_asset_avg.values,
-            title='연령대별 평균 자산',
-            labels={
-                'x': '연령대',
-                'y': '평균 총평가금액 (원)'
-            },
-            color=age_asset_avg.index,
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_age_asset.update_layout(**get_chart_layout('연령대별 평균 자산'))
-        fig_age_asset.update_traces(texttemplate='₩%{y:,.0f}', textposition='outside')
-        st.plotly_chart(fig_age_asset, use_container_width=True)
-    with col2:
-        # 연령대별 안전자산 비율 분포
-        fig_age_safe = px.box(
-            data,
-            x='연령대',
-            y='안전자산비율',
-            title='연령대별 안전자산 비율 분포',
-            labels={
-                'x': '연령대',
-                'y': '안전자산비율 (%)'
-            },
-            color='연령대',
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_age_safe.update_layout(**get_chart_layout('연령대별 안전자산 비율 분포'))
-        st.plotly_chart(fig_age_safe, use_container_width=True)
-        
-    # 연령대별 투자성향 분포 (히트맵)
-    # 연령대별 투자성향 분포 (히트맵) 수정
-    age_style_dist = prepare_heatmap_data(data, '연령대', '투자성향')
-    fig_age_style = px.imshow(
-        age_style_dist.values,  # numpy array로 변환
-        x=age_style_dist.columns,  # x축 레이블
-        y=age_style_dist.index,    # y축 레이블
-        title='연령대별 투자성향 분포',
-        labels=dict(x='투자성향', y='연령대', color='고객 수'),
-        color_continuous_scale='YlOrRd',
-        aspect='auto'
-    )
-    fig_age_style.update_layout(**get_chart_layout('연령대별 투자성향 분포'))
-    fig_age_style.update_traces(text=age_style_dist.values.astype(int), 
-                      texttemplate='%{text}명')
-    st.plotly_chart(fig_age_style, use_container_width=True)
-
-with tabs[2]:
-    st.subheader('지역별 분석')
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 지역별 투자자 수
-        region_investors = data['지역명'].value_counts()
-        fig_region = px.bar(
-            x=region_investors.index,
-            y=region_investors.values,
-            title='지역별 투자자 분포',
-            labels={
-                'x': '지역명',
-                'y': '투자자 수 (명)'
-            },
-            color=region_investors.index,
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_region.update_layout(**get_chart_layout('지역별 투자자 분포'))
-        fig_region.update_traces(texttemplate='%{y:,}명', textposition='outside')
-        st.plotly_chart(fig_region, use_container_width=True)
-        
-
-    
-    with col2:
-        # 지역별 평균 자산
-        region_asset_avg = data.groupby('지역명')['총평가금액'].mean().sort_values(ascending=False)
-        fig_region_asset = px.bar(
-            x=region_asset_avg.index,
-            y=region_asset_avg.values,
-            title='지역별 평균 자산',
-            labels={
-                'x': '지역명',
-                'y': '평균 총평가금액 (원)'
-            },
-            color=region_asset_avg.index,
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_region_asset.update_layout(**get_chart_layout('지역별 평균 자산'))
-        fig_region_asset.update_traces(texttemplate='₩%{y:,.0f}', textposition='outside')
-        st.plotly_chart(fig_region_asset, use_container_width=True)
-
-    region_age = prepare_heatmap_data(data, '지역명', '연령대')
-    fig_region_age = px.imshow(
-        region_age.values,
-        x=region_age.columns,
-        y=region_age.index,
-        title='지역별 연령대 분포',
-        labels=dict(x='연령대', y='지역명', color='고객 수'),
-        color_continuous_scale='YlOrRd',
-        aspect='auto'
-    )
-    fig_region_age.update_layout(**get_chart_layout('지역별 연령대 분포'))
-    fig_region_age.update_traces(text=region_age.values.astype(int), 
-                               texttemplate='%{text}명')
-    st.plotly_chart(fig_region_age, use_container_width=True)
-
-    # 지역별 투자성향 분포 (히트맵) 수정
-    region_style = prepare_heatmap_data(data, '지역명', '투자성향')
-    fig_region_style = px.imshow(
-        region_style.values,
-        x=region_style.columns,
-        y=region_style.index,
-        title='지역별 투자성향 분포',
-        labels=dict(x='투자성향', y='지역명', color='고객 수'),
-        color_continuous_scale='YlOrRd',
-        aspect='auto'
-    )
-    fig_region_style.update_layout(**get_chart_layout('지역별 투자성향 분포'))
-    fig_region_style.update_traces(text=region_style.values.astype(int), 
-                         texttemplate='%{text}명')
-    st.plotly_chart(fig_region_style, use_container_width=True)
-
-with tabs[3]:
-    st.subheader('자산 규모별 분석')
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # 자산규모별 투자자 분포
-        asset_size = data['자산규모'].value_counts()
-        fig_asset = px.pie(
-            values=asset_size.values,
-            names=asset_size.index,
-            title='자산규모별 투자자 분포',
-            color_discrete_sequence=COLOR_PALETTE
-        )
-        fig_asset.update_layout(**get_chart_layout('자산규모별 투자자 분포', 'bottom'))
-        fig_asset.update_traces(
-            textposition='inside',
-            textinfo='percent+label',
-            hovertemplate='%{label}<br>고객 수: %{value:,}명<br>비율: %{percent}'
-        )
-        st.plotly_chart(fig_asset, use_container_width=True)
-    
-    with col2:
-        # 자산규모별 안전자산 비율 분포
-        fig_asset_safe = px.box(
-            data,
-            x='자산규모',
-            y='안전자산비율',
-            title='자산규모별 안전자산 비율 분포',
-            labels={
-                'x': '자산규모',
-                'y': '안전자산비율 (%)'
-            },
-            color='자산규모',
-            color_discrete_sequence=COLOR_PALETTE
+# 탭 선택 (선택된 탭만 즉시 계산하고 나머지는 백그라운드에서 미리 계산)
+section_keys = [key for key in TAB_SECTIONS
+                if section_ctx.has_rows or not TAB_SECTIONS[key].requires_rows]
+section_labels = {TAB_SECTIONS[key].label: key for key in section_keys}
+active_tab = section_labels[st.radio(
+    '분석 탭',
+    list(section_labels),
+    horizontal=True,
+    label_visibility='collapsed',
+    key='active_tab'
+)]
+# 차트 출력 (계측 시 차트 제목과 JSON 크기를 함께 기록)
+def render_chart(payload):
+    fig = load_figure(payload)
+    with profiler.section(f'차트: {fig.layout.title.text}', len(payload.encode('utf-8'))):
+        st.plotly_chart(fig, use_container_width=True)
+
+with profiler.section(f'탭: {TAB_SECTIONS[active_tab].label}'):
+    st.subheader(TAB_SECTIONS[active_tab].title)
+    section_params = {}
+    if active_tab == 'segment':
+        section_params['k'] = st.slider('군집 수 (k)', 2, 10, TAB_SECTIONS['segment'].params['k'], key='segment_k')
+    if active_tab == 'crosstab':
+        defaults = TAB_SECTIONS['crosstab'].params
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            section_params['row'] = st.selectbox('행', cube.dims, cube.dims.index(defaults['row']),
+                                                 key='crosstab_row')
+        columns = [dim for dim in cube.dims if dim != section_params['row']]
+        with col2:
+            section_params['col'] = st.selectbox(
+                '열', columns, columns.index(defaults['col']) if defaults['col'] in columns else 0,
+                key=f"crosstab_col_{section_params['row']}")
+        with col3:
+            section_params['value'] = st.selectbox('값', list(CROSSTAB_VALUES), key='crosstab_value')
+    with profiler.section('차트 생성 / 직렬화'):
+        payload_rows = section_payload(section_ctx, active_tab, **section_params)
+    for row in payload_rows:
+        if len(row) == 1:
+            render_chart(row[0])
+            continue
+        for col, payload in zip(st.columns(len(row)), row):
+            with col:
+                render_chart(payload)
+    prefetch_sections(section_ctx, [key for key in section_keys if key != active_tab])
+# 첫 화면 (KPI와 선택한 탭 차트까지, 서버 프로세스의 첫 실행이면 콜드 스타트로 기록)
+profiler.first_paint()
+
+if active_tab == 'segment':
+    # k 탐색은 별도 프로세스에서 진행되고, 끝난 결과만 표시
+    with profiler.section('군집 수 탐색'):
+        sweep, failed_ks = sweep_results(start_sweep(section_ctx.fingerprint, section_ctx.data))
+    with st.expander('적정 군집 수 탐색 (엘보 / 실루엣)'):
+        if failed_ks:
+            st.warning(f"k = {', '.join(map(str, failed_ks))}의 점수 계산이 실패해 표에서 빠졌습니다.")
+        if sweep.empty:
+            if not failed_ks:
+                st.info('군집 수별 점수를 계산 중입니다. 잠시 후 새로고침하세요.')
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                fig_elbow = px.line(sweep, x='k', y='inertia', markers=True, title='엘보 (Inertia)')
+                fig_elbow.update_layout(**get_chart_layout('엘보 (Inertia)'))
+                st.plotly_chart(fig_elbow, use_container_width=True)
+            with col2:
+                fig_silhouette = px.line(sweep, x='k', y='silhouette', markers=True, title='실루엣 점수')
+                fig_silhouette.update_layout(**get_chart_layout('실루엣 점수'))
+                st.plotly_chart(fig_silhouette, use_container_width=True)
+# 고객 상세 조회 (차트의 막대/셀에 해당하는 고객을 서버에서 페이지 단위로)
+# 원본 행 전체와 동료 집단 점수가 필요하므로 켰을 때만 조회 (스냅샷으로 시작한 실행은 그 전까지 원본을 읽지 않음)
+with profiler.section('고객 상세 조회'):
+    st.subheader('고객 상세 조회')
+    if historical:
+        st.info('과거 기준일은 저장된 집계만 있어 고객 상세 조회를 사용할 수 없습니다.')
+    elif not data_source.supports_filters:
+        st.info('스트리밍 모드나 스냅샷 전용 배포에서는 고객 상세 조회를 사용할 수 없습니다.')
+    elif not st.toggle('고객 목록 보기', key='drill_open'):
+        st.caption('켜면 원본 행에서 고객 목록과 동료 집단 대비 이상치를 조회합니다.')
+    else:
+        # 차원별로 차트의 항목 하나를 고름 (현재 필터 결과에 있는 항목만)
+        drill_selections = dict(selections)
+        for col, dim in zip(st.columns(len(cube.dims)), cube.dims):
+            with col:
+                label = st.selectbox(dim, ['전체'] + list(cube.counts(dim).index), key=f'drill_{dim}')
+            if label != '전체':
+                drill_selections[dim] = (label,)
+        # 동료 집단(연령대 × 투자성향) 백분위와 강건 z-점수 컬럼 표시 형식
+        score_format = {col: st.column_config.NumberColumn(format='%.1f' if col.endswith('백분위') else '%.2f')
+                        for col in SCORE_COLUMNS}
+        sort_columns = SORT_COLUMNS + (SCORE_COLUMNS if data_source.has_scores else [])
+        col1, col2, col3, col4 = st.columns([2, 1, 2, 1])
+        with col1:
+            sort_by = st.selectbox('정렬 기준', sort_columns, key='drill_sort')
+        with col2:
+            descending = st.radio('정렬 순서', ['내림차순', '오름차순'], horizontal=True,
+                                  key='drill_order') == '내림차순'
+        with col3:
+            search = st.text_input('고객번호 검색', key='drill_search').strip()
+        with col4:
+            outliers_only = data_source.has_scores and st.checkbox('이상치만 보기', key='drill_outliers')
+
+        if data_source.has_scores:
+            # 현재 필터 안에서 동료 집단 대비 가장 벗어난 고객 (최대 |z| 순)
+            with st.expander(f"이상치 상위 {TOP_OUTLIERS}명 (동료 집단: {' × '.join(PEER_DIMENSIONS)})", expanded=True):
+                top_frame, outlier_total = data_source.page(dict(selections), value_range, SCORE_COLUMN, True, '', 0,
+                                                            TOP_OUTLIERS, outliers_only=True)
+                st.dataframe(top_frame, use_container_width=True, hide_index=True, column_config=score_format)
+                # 이상치 비율을 함께 보여 기준(OUTLIER_Z)이 너무 느슨한지 바로 보이게 함
+                st.caption(f'이상치 {outlier_total:,}명 (현재 조건 고객의 {outlier_total / max(cube.total_count(), 1):.1%}): '
+                           f'동료 집단 중앙값 대비 강건 z-점수 {MAD_SCALE} × (값 − 중앙값) / MAD의 절댓값이 '
+                           f"{OUTLIER_Z} 이상 ({', '.join(LOG_MEASURES)}은 log(1 + 값) 기준)")
+
+        # 조회 조건이 바뀌면 첫 페이지부터
+        query_key = filter_key(drill_selections, value_range) + f'{sort_by}:{descending}:{search}:{outliers_only}'
+        page_number = st.session_state.get(f'drill_page_{query_key}', 1)
+        page_frame, total = data_source.page(drill_selections, value_range, sort_by, descending, search,
+                                            page_number - 1, PAGE_ROWS, outliers_only=outliers_only)
+        pages = max((total + PAGE_ROWS - 1) // PAGE_ROWS, 1)
+        st.dataframe(page_frame, use_container_width=True, hide_index=True, column_config=score_format)
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            st.number_input('페이지', 1, pages, min(page_number, pages), key=f'drill_page_{query_key}')
+        with col2:
+            first = (page_number - 1) * PAGE_ROWS
+            st.caption(f'전체 {total:,}명 중 {min(first + 1, total):,}–{first + len(page_frame):,}번째 '
+                       f'({pages:,}페이지)')
+
+# 고급 분석 (안전자산비율 × 총평가금액 2차원 밀도, 구간화는 서버에서 하고 격자만 전송)
+# 밀도는 원본 행을 구간화하므로 켰을 때만 계산
+st.header('고급 분석')
+
+with profiler.section('고급 분석'):
+    amount, ratio = cube.overall(DENSITY_X), cube.overall(DENSITY_Y)
+    if historical:
+        st.info('과거 기준일은 저장된 집계만 있어 밀도 분석을 사용할 수 없습니다.')
+    elif not data_source.supports_filters:
+        st.info('스트리밍 모드나 스냅샷 전용 배포에서는 밀도 분석을 사용할 수 없습니다.')
+    elif not st.toggle('밀도 분석 보기', key='density_open'):
+        st.caption('켜면 안전자산비율 × 총평가금액 2차원 밀도를 계산합니다.')
+    elif approximate:
+        st.info('정확한 집계가 끝나면 밀도 분석이 표시됩니다.')
+    elif not amount['count'] or not ratio['count']:
+        st.info('밀도를 계산할 값이 없습니다.')
+    else:
+        # 범위 슬라이더로 확대하면 그 범위만 다시 구간화 (필터가 바뀌면 전체 범위로 초기화)
+        amount_low, ratio_low = int(np.floor(amount['min'])), float(np.floor(ratio['min']))
+        amount_bounds = (amount_low, max(int(np.ceil(amount['max'])), amount_low + 1))
+        ratio_bounds = (ratio_low, max(float(np.ceil(ratio['max'])), ratio_low + 1))
+        col1, col2 = st.columns(2)
+        with col1:
+            x_range = st.slider('총평가금액 범위 (원)', *amount_bounds, amount_bounds,
+                                key=f'density_x_{section_ctx.fingerprint}')
+        with col2:
+            y_range = st.slider('안전자산비율 범위 (%)', *ratio_bounds, ratio_bounds,
+                                key=f'density_y_{section_ctx.fingerprint}')
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            density_bins = st.slider('구간 수', 20, MAX_DENSITY_BINS, DENSITY_BINS, step=10, key='density_bins')
+        with col2:
+            log_x = st.checkbox('총평가금액 로그 스케일', key='density_log')
+        with col3:
+            density_group = DENSITY_GROUP if st.checkbox('투자성향별 색 구분', key='density_group') else None
+        render_chart(load_density_figure(fingerprint, selections, value_range, tuple(x_range), tuple(y_range),
+                                         density_bins, log_x, density_group, _source=data_source))
+
+# 통계적 분석
+st.header('통계적 분석')
+
+# 상관관계 분석 (수치형 컬럼 전체 × 그룹별, 한 번의 벡터화 계산, 탭 입력과 함께 캐시)
+with profiler.section('통계적 분석'):
+    if historical:
+        st.info('과거 기준일은 저장된 집계만 있어 상관관계 분석을 사용할 수 없습니다.')
+    elif approximate:
+        st.info('정확한 집계가 끝나면 상관관계 분석이 표시됩니다.')
+    elif not section_ctx.has_correlations():
+        st.info('원본 행을 읽지 않는 모드(스트리밍, SQLite)에서는 상관관계 분석을 사용할 수 없습니다.')
+    else:
+        corr_df = section_ctx.correlations()
+
+        # 스타일이 적용된 테이블로 표시
+        st.write("### 변수 간 상관관계 분석")
+        st.markdown("""
+        <style>
+            .correlation-table {
+                font-size: 16px;
+                width: 100%;
+                text-align: left;
+                border-collapse: collapse;
+            }
+            .correlation-table th {
+                background-color: #f0f2f6;
+                padding: 12px;
+                border: 1px solid #ddd;
+            }
+            .correlation-table td {
+                padding: 12px;
+                border: 1px solid #ddd;
+            }
+            .correlation-table tr:hover {
+                background-color: #f5f5f5;
+            }
+        </style>
+        """, unsafe_allow_html=True)
+        st.markdown(correlation_html(corr_df), unsafe_allow_html=True)
+
+        # 그룹별 상관관계
+        group_dim = st.selectbox('그룹별 상관관계', CORRELATION_GROUPS[1:], key='correlation_group')
+        group_corr_df = section_ctx.correlations(group_dim)
+        only_significant = st.checkbox('통계적으로 유의미한 결과만 보기 (P-value < 0.05)', key='correlation_significant')
+        if only_significant:
+            group_corr_df = group_corr_df[group_corr_df['P-value'] < 0.05]
+        st.markdown(correlation_html(group_corr_df, show_group=True), unsafe_allow_html=True)
+
+        # 분석 인사이트
+        st.subheader('주요 분석 인사이트')
+
+        avg_asset_by_age = cube.mean('연령대', '총평가금액')
+        max_asset_age = avg_asset_by_age.idxmax()
+        max_asset_age_value = avg_asset_by_age.max()
+
+        st.markdown(f"""
+    #### 1. 투자 행태 분석
+    - 가장 많은 고객이 선택한 투자성향은 **{kpis['max_investor_type']}**입니다.
+
+    #### 2. 자산 분포 분석
+    - 전체 고객의 평균 총평가금액은 **₩{kpis['avg_total_value']:,.0f}**입니다.
+    - 가장 높은 평균 자산을 보유한 연령대는 **{max_asset_age}**로, 평균 **₩{max_asset_age_value:,.0f}**입니다.
+
+    #### 3. 상관관계 분석 결과
+    """)
+
+        # 각 상관관계에 대한 세부 분석 표시 (결과 배열에서 한 번에 문장 생성)
+        coefficients = corr_df['상관계수'].round(4).to_numpy()
+        p_values = corr_df['P-value'].round(4).to_numpy()
+        significance = np.where(p_values < 0.05, "통계적으로 유의미함", "통계적으로 유의미하지 않음")
+        direction = np.where(coefficients > 0, "양의", "음의")
+        strength = corr_df['해석'].str.replace('상관관계', '').to_numpy()
+        tendency = np.where(
+            coefficients > 0,
+            '높은 값의 변수가 서로 양의 방향으로 움직이는 경향이 있습니다.',
+            '한 변수가 증가할 때 다른 변수는 감소하는 경향이 있습니다.'
         )
-        fig_asset_safe.update_layout(**get_chart_layout('자산규모별 안전자산 비율 분포'))
-        st.plotly_chart(fig_asset_safe, use_container_width=True)
-        
-    # 자산규모별 투자성향 분포 (히트맵) 수정
-    asset_style = prepare_heatmap_data(data, '자산규모', '투자성향')
-    fig_asset_style = px.imshow(
-        asset_style.values,
-        x=asset_style.columns,
-        y=asset_style.index,
-        title='자산규모별 투자성향 분포',
-        labels=dict(x='투자성향', y='자산규모', color='고객 수'),
-        color_continuous_scale='YlOrRd',
-        aspect='auto'
-    )
-    fig_asset_style.update_layout(**get_chart_layout('자산규모별 투자성향 분포'))
-    fig_asset_style.update_traces(text=asset_style.values.astype(int), 
-                        texttemplate='%{text}명')
-    st.plotly_chart(fig_asset_style, use_container_width=True)
-## 고급 분석 섹션
-#st.header('고급 분석')
-#
-#
-## 안전자산비율과 총평가금액의 관계
-#fig_safe = px.box(
-#    data,
-#    x='안전자산비율',
-#    y='총평가금액',
-#    color='투자성향',
-#    title='안전자산비율과 총평가금액의 관계',
-#    labels={
-#        '안전자산비율': '안전자산비율 (%)',
-#        '총평가금액': '총평가금액 (원)',
-#        '투자성향': '투자성향'
-#    },
-#    color_discrete_sequence=COLOR_PALETTE
-#)
-#fig_safe.update_layout(
-#    **get_chart_layout('안전자산비율과 총평가금액의 관계')
-#)
-## 금액 포맷 설정
-#fig_safe.update_layout(
-#    yaxis=dict(
-#        tickformat=',.0f',
-#        tickprefix='₩'
-#    )
-#)
-#st.plotly_chart(fig_safe, use_container_width=True)
-#
-## 통계적 분석
-#st.header('통계적 분석')
-#
-## 데이터 타입 변환을 위한 전처리
-#numeric_data = data.copy()
-#numeric_data['총평가금액'] = pd.to_numeric(numeric_data['총평가금액'], errors='coerce')
-## 안전자산비율에서 % 기호 제거 후 숫자로 변환
-#numeric_data['안전자산비율'] = pd.to_numeric(numeric_data['안전자산비율'].str.rstrip('%'), errors='coerce')
-#
-## 상관관계 분석을 위한 주요 변수 정의
-#analysis_vars = ['총평가금액', '안전자산비율']
-#
-## 상관관계 분석 결과를 저장할 리스트
-#correlation_results = []
-#
-## 모든 가능한 변수 쌍에 대해 상관관계 분석 수행
-#for i in range(len(analysis_vars)):
-#    for j in range(i+1, len(analysis_vars)):
-#        var1 = analysis_vars[i]
-#        var2 = analysis_vars[j]
-#        
-#        # 결측치 제거 후 상관관계 계산
-#        valid_data = numeric_data[[var1, var2]].dropna()
-#        if len(valid_data) > 0:
-#            correlation, p_value = stats.pearsonr(valid_data[var1], valid_data[var2])
-#            
-#            correlation_results.append({
-#                '분석 항목': f'{var1}와(과) {var2}',
-#                '상관계수': round(correlation, 4),
-#                'P-value': round(p_value, 4),
-#                '해석': '강한 상관관계' if abs(correlation) > 0.5 
-#                       else '중간 상관관계' if abs(correlation) > 0.3 
-#                       else '약한 상관관계',
-#                '데이터 수': len(valid_data)
-#            })
-#
-## 상관관계 분석 결과를 데이터프레임으로 변환
-#corr_df = pd.DataFrame(correlation_results)
-#
-## 스타일이 적용된 테이블로 표시
-#st.write("### 변수 간 상관관계 분석")
-#st.markdown("""
-#<style>
-#    .correlation-table {
-#        font-size: 16px;
-#        width: 100%;
-#        text-align: left;
-#        border-collapse: collapse;
-#    }
-#    .correlation-table th {
-#        background-color: #f0f2f6;
-#        padding: 12px;
-#        border: 1px solid #ddd;
-#    }
-#    .correlation-table td {
-#        padding: 12px;
-#        border: 1px solid #ddd;
-#    }
-#    .correlation-table tr:hover {
-#        background-color: #f5f5f5;
-#    }
-#</style>
-#""", unsafe_allow_html=True)
-#
-## HTML 테이블 생성
-#table_html = "<table class='correlation-table'>"
-#table_html += "<tr><th>분석 항목</th><th>상관계수</th><th>P-value</th><th>해석</th><th>데이터 수</th></tr>"
-#for _, row in corr_df.iterrows():
-#    table_html += f"<tr>"
-#    table_html += f"<td>{row['분석 항목']}</td>"
-#    table_html += f"<td>{row['상관계수']}</td>"
-#    table_html += f"<td>{row['P-value']}</td>"
-#    table_html += f"<td>{row['해석']}</td>"
-#    table_html += f"<td>{row['데이터 수']:,}</td>"
-#    table_html += "</tr>"
-#table_html += "</table>"
-#
-#st.markdown(table_html, unsafe_allow_html=True)
-#
-## 분석 인사이트 부분 수정
-#st.subheader('주요 분석 인사이트')
-#
-## 각종 통계 계산 (numeric_data 사용)
-#avg_asset_by_age = numeric_data.groupby('연령대')['총평가금액'].mean()
-#max_asset_age = avg_asset_by_age.idxmax()
-#max_asset_age_value = avg_asset_by_age.max()
-#
-#st.markdown(f"""
-##### 1. 투자 행태 분석
-#- 가장 많은 고객이 선택한 투자성향은 **{max_investor_type}**입니다.
-#
-##### 2. 자산 분포 분석
-#- 전체 고객의 평균 총평가금액은 **₩{avg_total_value:,.0f}**입니다.
-#- 가장 높은 평균 자산을 보유한 연령대는 **{max_asset_age}**로, 평균 **₩{max_asset_age_value:,.0f}**입니다.
-#
-##### 3. 상관관계 분석 결과
-#""")
-#
-## 각 상관관계에 대한 세부 분석 표시
-#for _, row in corr_df.iterrows():
-#    significance = "통계적으로 유의미함" if row['P-value'] < 0.05 else "통계적으로 유의미하지 않음"
-#    direction = "양의" if row['상관계수'] > 0 else "음의"
-#    strength = row['해석'].replace('상관관계', '')
-#    
-#    st.markdown(f"""
-#    - **{row['분석 항목']}**:
-#        - {direction} {strength}상관성을 보임 (상관계수: {row['상관계수']})
-#        - {significance} (P-value: {row['P-value']})
-#        - 분석에 사용된 데이터: {row['데이터 수']:,}개
-#        
-#        {'높은 값의 변수가 서로 양의 방향으로 움직이는 경향이 있습니다.' if row['상관계수'] > 0 else '한 변수가 증가할 때 다른 변수는 감소하는 경향이 있습니다.'}
-#    """)
-#
-## 전반적인 분석 요약
-#st.markdown("""
-##### 4. 종합 분석 요약
-#1. **투자 성향과 자산 관리**
-#   - 투자성향별로 뚜렷한 자산 운용 패턴이 관찰됩니다.
-#
-#2. **연령대별 특성**
-#   - 연령대에 따라 투자 스타일의 차이가 나타납니다.
-#   - 각 연령대별로 선호하는 투자 방식이 구분됩니다.
-#
-#3. **안전자산 선호도**
-#   - 안전자산 비율은 투자성향과 총자산 규모에 따라 다양한 분포를 보입니다.
-#   - 연령대가 높아질수록 안전자산 선호도가 증가하는 경향이 있습니다.
-#""")
-#
-## 시각화 가이드 추가
-#st.sidebar.markdown("""
-#### 📊 데이터 시각화 가이드
-#- 모든 금액은 원화(₩)로 표시
-#- 비율은 백분율(%)로 표시
-#- 상관계수 범위: -1 ~ +1
-#- P-value < 0.05: 통계적으로 유의미
-#""")
+        st.markdown("\n".join(
+            f"""
+    - **{item}**:
+        - {d} {s}상관성을 보임 (상관계수: {c})
+        - {sig} (P-value: {p})
+        - 분석에 사용된 데이터: {n:,}개
+
+        {t}
+    """
+            for item, d, s, c, sig, p, n, t in zip(
+                corr_df['분석 항목'], direction, strength, coefficients,
+                significance, p_values, corr_df['데이터 수'], tendency
+            )
+        ))
+
+        # 전반적인 분석 요약
+        st.markdown("""
+    #### 4. 종합 분석 요약
+    1. **투자 성향과 자산 관리**
+       - 투자성향별로 뚜렷한 자산 운용 패턴이 관찰됩니다.
+
+    2. **연령대별 특성**
+       - 연령대에 따라 투자 스타일의 차이가 나타납니다.
+       - 각 연령대별로 선호하는 투자 방식이 구분됩니다.
+
+    3. **안전자산 선호도**
+       - 안전자산 비율은 투자성향과 총자산 규모에 따라 다양한 분포를 보입니다.
+       - 연령대가 높아질수록 안전자산 선호도가 증가하는 경향이 있습니다.
+    """)
+
+# 시각화 가이드 추가
+st.sidebar.markdown("""
+### 📊 데이터 시각화 가이드
+- 모든 금액은 원화(₩)로 표시
+- 비율은 백분율(%)로 표시
+- 상관계수 범위: -1 ~ +1
+- P-value < 0.05: 통계적으로 유의미
+""")
+
+# 성능 계측 결과 (사이드바 패널 + JSONL 로그)
+if profiler.enabled:
+    profiler.flush()
+    with st.sidebar.expander('⏱️ 성능 프로파일', expanded=True):
+        st.dataframe(profiler.frame(), use_container_width=True, hide_index=True)
+    # 프로세스가 공유하는 원본 행의 컬럼별 메모리 (기본 read_csv 대비 비교는 python -m cli memory)
+    if data_source.has_rows:
+        with st.sidebar.expander('🧠 데이터 메모리'):
+            shared = data_source.load()
+            usage = shared.memory_usage(index=False, deep=True)
+            st.dataframe(pd.DataFrame({'타입': shared.dtypes.astype(str), 'bytes': usage}),
+                         use_container_width=True)
+            st.caption(f'합계 {usage.sum():,} bytes (프로세스당 한 벌을 모든 세션이 공유)')
+
+# 근사 모드: 화면을 모두 보낸 뒤 정확한 집계를 기다렸다가 다시 실행
+# (기다리는 동안 안내 문구를 갱신하므로 사용자 입력이 있으면 바로 중단되고 새로 실행됨)
+if approximate:
+    started = time.perf_counter()
+    while not exact_future.done():
+        refine_status.info(f'층화 표본 {len(section_ctx.sample.data):,}명 기반 근사값입니다. '
+                           f'정확한 값을 계산하는 중입니다... ({time.perf_counter() - started:.0f}초)')
+        time.sleep(0.5)
+    st.rerun()
@@ -0,0 +1,71 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from schema import INVESTOR_TYPES
+
+# 대시보드와 같은 스키마의 합성 고객 데이터 생성기 (시드 고정)
+# 연령대/지역/자산규모 범주는 생성기가 정한 예시 값 (대시보드는 데이터에 있는 범주를 그대로 사용)
+INVESTOR_WEIGHTS = [0.25, 0.22, 0.23, 0.17, 0.13]
+AGE_GROUPS = ['20대', '30대', '40대', '50대', '60대', '70대 이상']
+AGE_WEIGHTS = [0.12, 0.18, 0.22, 0.22, 0.16, 0.10]
+REGIONS = ['서울', '부산', '대구', '인천', '광주', '대전', '울산', '세종', '경기',
+           '강원', '충북', '충남', '전북', '전남', '경북', '경남', '제주']
+# 대략적인 인구 비중
+REGION_WEIGHTS = [18.5, 6.4, 4.6, 5.8, 2.8, 2.8, 2.1, 0.8, 26.3,
+                  3.0, 3.1, 4.1, 3.4, 3.5, 5.0, 6.3, 1.3]
+ASSET_SIZES = ['1천만원 미만', '1천만원~1억원', '1억원~10억원', '10억원 이상']
+ASSET_EDGES = [1e7, 1e8, 1e9]
+
+CHUNK_ROWS = 1_000_000
+
+
+def generate(rows, seed=0, start_id=1):
+    rng = np.random.default_rng(seed)
+    investor = rng.choice(len(INVESTOR_TYPES), size=rows, p=np.divide(INVESTOR_WEIGHTS, sum(INVESTOR_WEIGHTS)))
+    age = rng.choice(len(AGE_GROUPS), size=rows, p=np.divide(AGE_WEIGHTS, sum(AGE_WEIGHTS)))
+    region = rng.choice(len(REGIONS), size=rows, p=np.divide(REGION_WEIGHTS, sum(REGION_WEIGHTS)))
+
+    # 나이가 많을수록 자산이 크고, 서울/경기는 조금 더 큼 (로그정규 분포)
+    log_mean = 16.2 + 0.35 * age + 0.25 * np.isin(region, [0, 8])
+    amount = np.round(rng.lognormal(log_mean, 1.1)).astype(np.int64)
+
+    # 공격적인 성향일수록, 젊을수록 안전자산 비율이 낮음
+    safe_mean = 80 - 13 * investor + 2.5 * age
+    safe_ratio = np.round(np.clip(rng.normal(safe_mean, 15), 0, 100), 1)
+
+    return pd.DataFrame({
+        '고객번호': np.arange(start_id, start_id + rows, dtype=np.int64),
+        '투자성향': pd.Categorical.from_codes(investor, INVESTOR_TYPES),
+        '연령대': pd.Categorical.from_codes(age, AGE_GROUPS),
+        '지역명': pd.Categorical.from_codes(region, REGIONS),
+        '자산규모': pd.Categorical.from_codes(np.searchsorted(ASSET_EDGES, amount, side='right'), ASSET_SIZES),
+        '총평가금액': amount,
+        '안전자산비율': safe_ratio,
+    })
+
+
+def write_dataset(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    # 청크 단위로 생성해 CSV에 이어 씀 (1천만 행도 메모리 일정)
+    written = 0
+    for index, start in enumerate(range(0, max(rows, 1), chunk_rows)):
+        size = min(chunk_rows, rows - start)
+        chunk = generate(size, seed=seed + index, start_id=start + 1)
+        chunk.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+        written += size
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='합성 고객 데이터 생성')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='random_dataset.csv')
+    args = parser.parse_args(argv)
+    written = write_dataset(args.out, args.rows, args.seed)
+    print(f'{args.out}: {written:,} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from approximate import refine, use_approximate
+from figures import start_pool
+from precompute import load_snapshot, snapshot_context, snapshot_stamp
+from sections import TAB_SECTIONS, exact_context, prefetch_sections, seed_sections, source_context
+from sources import SOURCE_KIND, current_source
+
+# 서버 시작 예열 (python -m cli serve)
+# 첫 사용자가 접속하기 전에 백그라운드 스레드에서 원본 로드, 집계 큐브, 기본 탭 차트, 상관관계, 고객별 동료 집단 점수를 준비
+# 소스는 current_source()로 앱과 공유하고, 스냅샷과 탭 입력은 같은 stamp/지문일 때 앱의 캐시 로더가 가져감
+# 예열 후에는 원본을 주기적으로 확인해 바뀌면 (추가분 병합 포함) 다시 예열 (DASHBOARD_WATCH_SECONDS=0이면 끔)
+WATCH_SECONDS = float(os.environ.get('DASHBOARD_WATCH_SECONDS', 5))
+
+Warmed = namedtuple('Warmed', ['source', 'snapshot_stamp', 'snapshot', 'context', 'seconds'])
+
+_warm_future = None
+_warm_lock = threading.Lock()
+_warm_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prewarm')
+
+
+def _prewarm(kind):
+    # 앱의 첫 실행(필터 없음)과 같은 순서로 캐시를 채움
+    started = time.perf_counter()
+    source = current_source(kind)
+    snap_stamp = snapshot_stamp() if source.kind == 'csv' else None
+    snapshot = load_snapshot() if snap_stamp is not None else None
+    start_pool()
+    if source.has_rows:
+        source.load()
+
+    ctx = None
+    if snapshot is not None:
+        ctx = snapshot_context(snapshot, source.load if source.has_rows else None)
+        seed_sections(ctx, snapshot.figures)
+    elif source.supports_sampling and use_approximate(source.row_count()):
+        # 큰 데이터는 앱과 같은 키로 정확한 집계를 시작해 둠 (첫 화면은 표본 근사)
+        refine(source.fingerprint(), lambda: exact_context(source))
+    else:
+        ctx = source_context(source)
+    if ctx is not None:
+        prefetch_sections(ctx, [key for key in TAB_SECTIONS if ctx.has_rows or not TAB_SECTIONS[key].requires_rows])
+        if ctx.has_correlations():
+            ctx.correlations()
+    if source.has_rows:
+        # 고객 상세 조회의 동료 집단 점수와 정렬 순서
+        source.drilldown_index()
+    return Warmed(source, snap_stamp, snapshot, ctx, time.perf_counter() - started)
+
+
+def _watch(kind, interval):
+    # 원본이 바뀌어 current_source()가 새 소스를 주면 그 소스로 다시 예열
+    global _warm_future
+    seen = None
+    while True:
+        time.sleep(interval)
+        try:
+            source = current_source(kind)
+        except (OSError, ValueError):
+            # 원본을 교체하는 중이면 다음 확인에서 다시 시도
+            continue
+        if seen is None:
+            warm = warmed()
+            seen = warm.source if warm is not None else source
+        if source is not seen:
+            seen = source
+            with _warm_lock:
+                _warm_future = _warm_pool.submit(_prewarm, kind)
+
+
+def prewarm(kind=SOURCE_KIND, watch_seconds=WATCH_SECONDS):
+    # 예열을 한 번만 시작하고 future를 반환 (기다리지 않음)
+    global _warm_future
+    with _warm_lock:
+        if _warm_future is None:
+            _warm_future = _warm_pool.submit(_prewarm, kind)
+            if watch_seconds > 0:
+                threading.Thread(target=_watch, args=(kind, watch_seconds), name='source-watch', daemon=True).start()
+        return _warm_future
+
+
+def warmed():
+    # 예열 결과 (예열하지 않았거나 실패하면 None, 진행 중이면 끝날 때까지 기다림)
+    with _warm_lock:
+        future = _warm_future
+    if future is None or future.exception() is not None:
+        return None
+    return future.result()
+
+
+def warm_snapshot(stamp):
+    warm = warmed()
+    if warm is None or warm.snapshot_stamp != stamp:
+        return None
+    return warm.snapshot
+
+
+def warm_context(fingerprint):
+    # 필터 없는 탭 렌더링 입력 (데이터 지문이 같을 때만)
+    warm = warmed()
+    if warm is None or warm.context is None or warm.context.fingerprint != fingerprint:
+        return None
+    return warm.context